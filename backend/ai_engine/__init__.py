@@ -1,10 +1,12 @@
 """AI Engine package - AI/ML components"""
 from ai_engine.injury_detector import InjuryDetector
 from ai_engine.severity_scorer import SeverityScorer
+from ai_engine.trend_scorer import StreamingSeverityScorer
 from ai_engine.chatbot import MedicalChatbot
 
 __all__ = [
     'InjuryDetector',
     'SeverityScorer',
+    'StreamingSeverityScorer',
     'MedicalChatbot'
 ]
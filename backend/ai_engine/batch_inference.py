@@ -0,0 +1,144 @@
+"""
+Micro-batching for model inference
+Collects concurrent requests for a few milliseconds and runs them as one batch
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future
+import queue
+import threading
+import time
+import numpy as np
+from utils import log
+
+
+class MicroBatcher:
+    """Queue single inputs and execute them in batches on worker threads"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], np.ndarray],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "inference",
+        workers: int = 1
+    ):
+        """
+        Initialize micro-batcher
+
+        Args:
+            run_batch: Runs a list of N inputs and returns N outputs
+            max_batch_size: Largest batch handed to run_batch
+            max_wait_ms: How long the first request waits for company
+            name: Worker thread name
+            workers: Worker threads gathering batches in parallel
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.workers = max(1, workers)
+
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.batches_run = 0
+        self.items_run = 0
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue one input
+
+        Args:
+            item: Single input without batch dimension
+
+        Returns:
+            Future resolving to that input's output row
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def infer(self, item: Any, timeout: Optional[float] = None) -> np.ndarray:
+        """Queue one input and wait for its output"""
+        return self.submit(item).result(timeout=timeout)
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(
+                        target=self._worker,
+                        name=f"batcher-{self.name}-{i}",
+                        daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+
+    def _worker(self):
+        """Gather requests into batches until closed"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            closing = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+
+            self._execute(batch)
+            if closing:
+                return
+
+    def _execute(self, batch: List[Tuple[Any, Future]]):
+        """Run one batch and scatter outputs back to callers"""
+        try:
+            # Inputs are handed over as a list so run_batch can write them
+            # straight into its own batch buffer instead of np.stack copying
+            outputs = self.run_batch([item for item, _ in batch])
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
+            with self._stats_lock:
+                self.batches_run += 1
+                self.items_run += len(batch)
+        except Exception as e:
+            log.error(f"Batched {self.name} failed for {len(batch)} inputs: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "workers": self.workers,
+            "batches": self.batches_run,
+            "items": self.items_run,
+            "avg_batch_size": round(self.items_run / self.batches_run, 2) if self.batches_run else 0.0,
+            "queued": self._queue.qsize()
+        }
+
+    def close(self):
+        """Stop the workers after pending requests are served"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
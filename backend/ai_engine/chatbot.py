@@ -4,7 +4,11 @@ Provides medical consultation for non-emergency cases
 """
 from typing import Dict, Any, List, Optional
 import json
+import uuid
 from utils import log, config
+from utils.shared_state import shared_state
+
+CHAT_NAMESPACE = "chat"
 
 # Try to import ollama
 try:
@@ -26,7 +30,8 @@ class MedicalChatbot:
             model_name: Name of Ollama model to use
         """
         self.model_name = model_name or config.CHATBOT_MODEL_NAME
-        self.conversation_history: List[Dict[str, str]] = []
+        # Conversations live in the shared store so any API worker can continue them
+        self.store = shared_state
         self.is_available = HAS_OLLAMA
         
         if self.is_available:
@@ -47,36 +52,39 @@ class MedicalChatbot:
             log.error(f"Failed to check model availability: {e}")
             self.is_available = False
     
-    def chat(self, user_message: str, reset_history: bool = False) -> Dict[str, Any]:
+    def chat(self, user_message: str, reset_history: bool = False, rule_based: bool = False,
+             session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Send message to chatbot and get response
         
         Args:
             user_message: User's message/symptoms
             reset_history: Whether to reset conversation history
+            rule_based: Skip the LLM and answer from the built-in rules (cheap, used under load)
+            session_id: Conversation to continue (None starts a new one)
             
         Returns:
-            Dictionary with response and metadata
+            Dictionary with response and metadata, including the session_id
+            to send with the next message
         """
+        # Callers without a session get their own, never someone else's history
+        session_id = session_id or uuid.uuid4().hex
         if reset_history:
-            self.conversation_history = []
+            self.clear_history(session_id)
         
         try:
-            if self.is_available:
-                response = self._chat_with_ollama(user_message)
+            if self.is_available and not rule_based:
+                response = self._chat_with_ollama(user_message, self.get_conversation_history(session_id))
             else:
                 response = self._chat_rule_based(user_message)
             
             # Add to history
-            self.conversation_history.append({
-                "role": "user",
-                "content": user_message
-            })
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response["message"]
-            })
+            self.store.append(CHAT_NAMESPACE, session_id, [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": response["message"]}
+            ], max_items=config.CHAT_HISTORY_MAX, ttl=config.CHAT_SESSION_TTL)
             
+            response["session_id"] = session_id
             return response
             
         except Exception as e:
@@ -84,10 +92,11 @@ class MedicalChatbot:
             return {
                 "message": "عذراً، حدث خطأ في النظام. يرجى المحاولة مرة أخرى.",
                 "is_emergency": False,
+                "session_id": session_id,
                 "error": str(e)
             }
     
-    def _chat_with_ollama(self, user_message: str) -> Dict[str, Any]:
+    def _chat_with_ollama(self, user_message: str, history: List[Dict[str, str]]) -> Dict[str, Any]:
         """Chat using Ollama LLM"""
         try:
             # System prompt for medical context
@@ -100,7 +109,7 @@ class MedicalChatbot:
             
             # Build messages
             messages = [{"role": "system", "content": system_prompt}]
-            messages.extend(self.conversation_history)
+            messages.extend(history)
             messages.append({"role": "user", "content": user_message})
             
             # Call Ollama
@@ -180,11 +189,11 @@ class MedicalChatbot:
         combined = (user_msg + " " + bot_msg).lower()
         return any(indicator in combined for indicator in emergency_indicators)
     
-    def get_conversation_history(self) -> List[Dict[str, str]]:
+    def get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
         """Get conversation history"""
-        return self.conversation_history
+        return self.store.get(CHAT_NAMESPACE, session_id, [])
     
-    def clear_history(self):
+    def clear_history(self, session_id: str):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.store.delete(CHAT_NAMESPACE, session_id)
         log.info("Conversation history cleared")
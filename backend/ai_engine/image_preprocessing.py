@@ -0,0 +1,145 @@
+"""
+Image Preprocessing for Injury Detection
+Decodes photos close to the model input size and normalizes them straight
+into the interpreter's input tensor
+"""
+from typing import Optional, Tuple, Union
+import struct
+import cv2
+import numpy as np
+
+
+# JPEG start-of-frame markers carrying the image dimensions
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# libjpeg can scale by 1/2, 1/4 and 1/8 in the DCT domain while decoding
+_REDUCED_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+_INV_255 = np.float32(1.0 / 255.0)
+
+
+def read_jpeg_size(data: Union[bytes, memoryview]) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from a JPEG header without decoding it
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        (width, height), or None if the data is not a JPEG
+    """
+    view = memoryview(data)
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+
+    pos = 2
+    while pos + 4 <= len(view):
+        if view[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = view[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        length = struct.unpack(">H", view[pos + 2:pos + 4])[0]
+        if marker in _SOF_MARKERS:
+            if pos + 9 > len(view):
+                return None
+            height, width = struct.unpack(">HH", view[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+
+    return None
+
+
+def reduced_decode_flag(source_size: Optional[Tuple[int, int]], target_size: Tuple[int, int]) -> int:
+    """
+    Pick the strongest DCT-domain downscale that still covers the target size
+
+    Args:
+        source_size: (width, height) of the encoded image, if known
+        target_size: (width, height) the image will be resized to
+
+    Returns:
+        cv2.imread/imdecode flag
+    """
+    if source_size is None:
+        return cv2.IMREAD_COLOR
+
+    # Compare short side to long side so EXIF rotation cannot undershoot the target
+    short_side = min(source_size)
+    long_target = max(target_size)
+    for factor, flag in _REDUCED_FLAGS:
+        if short_side // factor >= long_target:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_image(data: Union[bytes, memoryview, np.ndarray], target_size: Optional[Tuple[int, int]] = None) -> Optional[np.ndarray]:
+    """
+    Decode encoded image bytes, downscaling during decode when possible
+
+    Args:
+        data: Encoded image (bytes, memoryview or uint8 array)
+        target_size: (width, height) the caller will resize to; None decodes full size
+
+    Returns:
+        BGR image, or None if decoding failed
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data
+    flag = cv2.IMREAD_COLOR
+    if target_size is not None:
+        flag = reduced_decode_flag(read_jpeg_size(buffer.data), target_size)
+    return cv2.imdecode(buffer, flag)
+
+
+def load_image(path: str, target_size: Optional[Tuple[int, int]] = None) -> Optional[np.ndarray]:
+    """
+    Read an image file, downscaling during decode when possible
+
+    Args:
+        path: Image file path
+        target_size: (width, height) the caller will resize to; None decodes full size
+
+    Returns:
+        BGR image, or None if reading failed
+    """
+    if target_size is None:
+        return cv2.imread(path)
+
+    with open(path, "rb") as f:
+        header = f.read(128 * 1024)  # Covers EXIF segments before the frame header
+    return cv2.imread(path, reduced_decode_flag(read_jpeg_size(header), target_size))
+
+
+def resize_for_model(image: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
+    """Resize a BGR image to (width, height) unless it already matches"""
+    width, height = target_size
+    if image.shape[1] == width and image.shape[0] == height:
+        return image
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def normalize_into(image: np.ndarray, out: np.ndarray):
+    """
+    Write a model-sized BGR uint8 image into an input tensor slot
+
+    BGR->RGB is a reversed-channel view, and for float inputs the scale to
+    [0, 1] and the cast happen in the same single pass that writes `out`.
+
+    Args:
+        image: BGR uint8 image of shape (H, W, 3)
+        out: Destination of shape (H, W, 3), typically a view of the interpreter input
+    """
+    rgb = image[..., ::-1]
+    if np.issubdtype(out.dtype, np.floating):
+        np.multiply(rgb, _INV_255, out=out, dtype=out.dtype, casting="unsafe")
+    else:
+        np.copyto(out, rgb, casting="unsafe")
@@ -0,0 +1,113 @@
+"""
+Interpreter Pool
+Preloads several TFLite interpreters and leases them to concurrent callers
+"""
+from typing import Any, Callable, Dict, Iterator, Optional
+from contextlib import contextmanager
+from pathlib import Path
+import queue
+import threading
+import time
+from utils import log
+
+
+class PooledInterpreter:
+    """One interpreter plus the per-instance state that must travel with it"""
+
+    def __init__(self, interpreter: Any, slot: int):
+        self.interpreter = interpreter
+        self.slot = slot
+        self.input_details = interpreter.get_input_details()
+        self.output_details = interpreter.get_output_details()
+        self.batch_size = int(self.input_details[0]['shape'][0])
+        self.supports_batching = True
+
+
+class InterpreterPool:
+    """
+    Fixed set of interpreters handed out one caller at a time
+
+    A TFLite interpreter is not thread-safe, so instead of sharing one
+    instance behind a lock each concurrent caller leases its own.
+    """
+
+    def __init__(
+        self,
+        model_path: Path,
+        interpreter_factory: Callable[..., Any],
+        size: int = 2,
+        num_threads: int = 1
+    ):
+        """
+        Initialize and preload the pool
+
+        Args:
+            model_path: Path to TFLite model file
+            interpreter_factory: Interpreter class (tflite_runtime or tf.lite)
+            size: Number of interpreters to preload
+            num_threads: Intra-op threads per interpreter
+        """
+        self.model_path = model_path
+        self.size = max(1, size)
+        self.num_threads = max(1, num_threads)
+
+        self._idle: "queue.Queue[PooledInterpreter]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._leases = 0
+        self._wait_total = 0.0
+
+        for slot in range(self.size):
+            interpreter = interpreter_factory(
+                model_path=str(model_path),
+                num_threads=self.num_threads
+            )
+            interpreter.allocate_tensors()
+            self._idle.put(PooledInterpreter(interpreter, slot))
+
+        log.info(f"Interpreter pool ready: {self.size} x {self.num_threads} threads ({model_path.name})")
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[PooledInterpreter]:
+        """
+        Borrow an interpreter for the duration of a with-block
+
+        Args:
+            timeout: Seconds to wait for a free interpreter (None waits forever)
+
+        Raises:
+            TimeoutError: If no interpreter became free in time
+        """
+        start = time.monotonic()
+        try:
+            pooled = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free interpreter within {timeout}s")
+
+        with self._stats_lock:
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._leases += 1
+            self._wait_total += time.monotonic() - start
+
+        try:
+            yield pooled
+        finally:
+            with self._stats_lock:
+                self._in_use -= 1
+            self._idle.put(pooled)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get pool utilization"""
+        with self._stats_lock:
+            return {
+                "size": self.size,
+                "num_threads": self.num_threads,
+                "in_use": self._in_use,
+                "available": self.size - self._in_use,
+                "utilization": round(self._in_use / self.size, 2),
+                "peak_in_use": self._peak_in_use,
+                "leases": self._leases,
+                "avg_wait_ms": round(self._wait_total / self._leases * 1000, 2) if self._leases else 0.0
+            }
@@ -4,6 +4,7 @@ AI-Powered Medical Analysis Engine
 """
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from utils.vital_rules import flags_for_readings
 
 
 class MedicalAIAnalyzer:
@@ -53,20 +54,19 @@ class MedicalAIAnalyzer:
         
         concerns = []
         severity_score = 0
+        flags = flags_for_readings(sensor_data)
         
         for injury in injuries:
             injury_type = injury.get('type', '')
             
             if injury_type == 'bleeding':
                 severity_score += 8
-                pulse = sensor_data.get('pulse', {}).get('value', 75)
-                if pulse > 100:
+                if 'hr_high' in flags:
                     concerns.append("نزيف + تسارع نبض = فقدان دم نشط")
             
             elif injury_type == 'burn':
                 severity_score += 7
-                temp = sensor_data.get('temperature', {}).get('value', 37)
-                if temp > 38:
+                if 'temp_elevated' in flags:
                     concerns.append("حروق + حمى = احتمال عدوى")
             
             elif injury_type == 'fracture':
@@ -85,23 +85,21 @@ class MedicalAIAnalyzer:
         """تحليل العلامات الحيوية"""
         concerns = []
         severity = 0
+        flags = flags_for_readings(sensor_data)
         
         # SpO2
-        spo2 = sensor_data.get('spo2', {}).get('value', 98)
-        if spo2 < 90:
-            concerns.append(f"نقص أكسجين حاد ({spo2}%) - تهديد للحياة")
+        if 'spo2_critical' in flags:
+            concerns.append(f"نقص أكسجين حاد ({sensor_data['spo2']['value']}%) - تهديد للحياة")
             severity += 5
         
         # Pulse
-        pulse = sensor_data.get('pulse', {}).get('value', 75)
-        if pulse > 120:
-            concerns.append(f"تسارع نبض ({pulse} bpm) - صدمة محتملة")
+        if 'hr_critical_high' in flags:
+            concerns.append(f"تسارع نبض ({sensor_data['pulse']['value']} bpm) - صدمة محتملة")
             severity += 3
         
         # Temperature
-        temp = sensor_data.get('temperature', {}).get('value', 37)
-        if temp > 38.5:
-            concerns.append(f"حمى ({temp}°C)")
+        if 'temp_fever' in flags:
+            concerns.append(f"حمى ({sensor_data['temperature']['value']}°C)")
             severity += 2
         
         return {
@@ -0,0 +1,185 @@
+"""
+Inference Result Cache
+Content-addressed LRU+TTL cache for detection results, with an optional
+SQLite tier on disk that survives restarts
+"""
+from typing import Any, Dict, Optional, Union
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from utils import log
+from utils.json_helpers import safe_json_dumps
+
+# Try to import xxhash, fall back to blake2b from the standard library
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+
+def content_hash(data: Union[bytes, memoryview]) -> str:
+    """Fast hex digest of image bytes"""
+    if HAS_XXHASH:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class InferenceCache:
+    """Two-tier cache of JSON-serializable results keyed by content hash"""
+
+    def __init__(
+        self,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl: float = 3600.0,
+        disk_path: Optional[Path] = None
+    ):
+        """
+        Initialize cache
+
+        Args:
+            max_bytes: Memory budget for serialized results
+            ttl: Seconds an entry stays valid
+            disk_path: SQLite file for the persistent tier (None disables it)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # key -> (created, serialized result, size in UTF-8 bytes)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if disk_path:
+            self._open_disk(Path(disk_path))
+
+    def _open_disk(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, created REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            self._db.commit()
+            log.info(f"Inference cache disk tier at {path}")
+        except Exception as e:
+            log.error(f"Failed to open inference cache on disk: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(data: Union[bytes, memoryview], model_version: str) -> str:
+        """Build a cache key from image bytes and model version"""
+        return f"{model_version}:{content_hash(data)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached result, or None on miss"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value, _ = entry
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return json.loads(value)
+                self._remove(key)
+                self._stats["expired"] += 1
+
+        row = self._disk_get(key)
+        if row is not None:
+            created, value = row
+            if now - created <= self.ttl:
+                with self._lock:
+                    self._insert(key, created, value)
+                    self._stats["disk_hits"] += 1
+                return json.loads(value)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, result: Any):
+        """Store a result in memory and, if enabled, on disk"""
+        value = safe_json_dumps(result)
+        created = time.time()
+
+        with self._lock:
+            self._insert(key, created, value)
+
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO results (key, created, value) VALUES (?, ?, ?)",
+                        (key, created, value)
+                    )
+                    self._db.commit()
+            except Exception as e:
+                log.warning(f"Inference cache disk write failed: {e}")
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                return self._db.execute(
+                    "SELECT created, value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+        except Exception as e:
+            log.warning(f"Inference cache disk read failed: {e}")
+            return None
+
+    def _insert(self, key: str, created: float, value: str):
+        """Insert into the memory tier and evict LRU entries over budget (lock held)"""
+        # Charge the budget in bytes - non-ASCII text is several bytes per character
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (created, value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and memory usage"""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "disk_tier": self._db is not None
+            }
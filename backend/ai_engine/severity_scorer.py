@@ -2,9 +2,10 @@
 Severity Scoring using Data Fusion
 Combines visual and vital signs data to calculate severity score
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Union
 import numpy as np
 from utils import log
+from utils.vital_rules import vital_rules, flags_for, LEVELS
 
 
 class SeverityScorer:
@@ -19,6 +20,39 @@ class SeverityScorer:
         "minimal": (0, 1.9)
     }
     
+    # Rhythm codes for batch scoring (index = code, -1 = not measured)
+    RHYTHM_CODES = [
+        "normal",
+        "sinus_tachycardia",
+        "sinus_bradycardia",
+        "irregular",
+        "atrial_fibrillation",
+        "ventricular_tachycardia",
+        "ventricular_fibrillation"
+    ]
+    # Score per rhythm code, aligned with RHYTHM_CODES
+    RHYTHM_SCORES = [0, 2, 2, 4, 6, 9, 10]
+    RHYTHM_SCORE_BY_NAME = dict(zip(RHYTHM_CODES, RHYTHM_SCORES))
+    UNKNOWN_RHYTHM_SCORE = 3
+    
+    # Score (0-10, higher is worse) per rule level, aligned with vital_rules.LEVELS.
+    # Where one level ends and the next begins comes from the rule table only.
+    LEVEL_SCORES = {
+        "heart_rate": [0, 3, 4, 6, 9],
+        "spo2": [0, 4, 5, 7, 10],
+        "body_temperature": [0, 2, 4, 5, 8]
+    }
+    
+    # Injury type severity weights
+    INJURY_WEIGHTS = {
+        "bleeding": 8,
+        "fracture": 7,
+        "burn": 7,
+        "cut": 5,
+        "swelling": 3,
+        "bruise": 2
+    }
+    
     def __init__(self):
         """Initialize severity scorer"""
         log.info("Severity scorer initialized")
@@ -104,15 +138,7 @@ class SeverityScorer:
         if not injuries:
             return 0.0
         
-        # Injury type severity weights
-        injury_weights = {
-            "bleeding": 8,
-            "fracture": 7,
-            "burn": 7,
-            "cut": 5,
-            "swelling": 3,
-            "bruise": 2
-        }
+        injury_weights = self.INJURY_WEIGHTS
         
         max_score = 0
         for injury in injuries:
@@ -135,78 +161,53 @@ class SeverityScorer:
         """
         scores = []
         
+        # A None value was not measured (like NaN in the batch path)
         # Heart rate scoring
-        if "heart_rate" in vital_signs:
-            hr = vital_signs["heart_rate"]
+        hr = vital_signs.get("heart_rate")
+        if hr is not None:
             hr_score = self._score_heart_rate(hr)
             scores.append(hr_score)
         
         # SpO2 scoring
-        if "spo2" in vital_signs:
-            spo2 = vital_signs["spo2"]
+        spo2 = vital_signs.get("spo2")
+        if spo2 is not None:
             spo2_score = self._score_spo2(spo2)
             scores.append(spo2_score)
         
         # Temperature scoring
-        if "body_temperature" in vital_signs:
-            temp = vital_signs["body_temperature"]
+        temp = vital_signs.get("body_temperature")
+        if temp is not None:
             temp_score = self._score_temperature(temp)
             scores.append(temp_score)
         
         # ECG rhythm scoring
-        if "rhythm" in vital_signs:
-            rhythm = vital_signs["rhythm"]
+        rhythm = vital_signs.get("rhythm")
+        if rhythm is not None:
             rhythm_score = self._score_rhythm(rhythm)
             scores.append(rhythm_score)
         
         # Return maximum score (worst case)
         return max(scores) if scores else 0.0
     
+    def _score_level(self, vital: str, value: float) -> float:
+        """Score a vital by the worst rule-table level it reaches"""
+        return self.LEVEL_SCORES[vital][LEVELS.index(vital_rules.level(vital, value))]
+    
     def _score_heart_rate(self, hr: int) -> float:
         """Score heart rate (0-10, higher is worse)"""
-        if 60 <= hr <= 100:
-            return 0  # Normal
-        elif 50 <= hr < 60 or 100 < hr <= 120:
-            return 3  # Mild abnormality
-        elif 40 <= hr < 50 or 120 < hr <= 150:
-            return 6  # Moderate abnormality
-        else:
-            return 9  # Severe abnormality
+        return self._score_level("heart_rate", hr)
     
     def _score_spo2(self, spo2: float) -> float:
         """Score SpO2 (0-10, higher is worse)"""
-        if spo2 >= 95:
-            return 0  # Normal
-        elif 90 <= spo2 < 95:
-            return 4  # Mild hypoxemia
-        elif 85 <= spo2 < 90:
-            return 7  # Moderate hypoxemia
-        else:
-            return 10  # Severe hypoxemia
+        return self._score_level("spo2", spo2)
     
     def _score_temperature(self, temp: float) -> float:
         """Score body temperature (0-10, higher is worse)"""
-        if 36.5 <= temp <= 37.5:
-            return 0  # Normal
-        elif 37.5 < temp <= 38.5 or 35.5 <= temp < 36.5:
-            return 2  # Mild abnormality
-        elif 38.5 < temp <= 39.5 or 34.5 <= temp < 35.5:
-            return 5  # Moderate abnormality
-        else:
-            return 8  # Severe abnormality
+        return self._score_level("body_temperature", temp)
     
     def _score_rhythm(self, rhythm: str) -> float:
         """Score ECG rhythm (0-10, higher is worse)"""
-        rhythm_scores = {
-            "normal": 0,
-            "sinus_tachycardia": 2,
-            "sinus_bradycardia": 2,
-            "irregular": 4,
-            "atrial_fibrillation": 6,
-            "ventricular_tachycardia": 9,
-            "ventricular_fibrillation": 10
-        }
-        return rhythm_scores.get(rhythm, 3)
+        return self.RHYTHM_SCORE_BY_NAME.get(rhythm, self.UNKNOWN_RHYTHM_SCORE)
     
     def _get_severity_level(self, score: float) -> str:
         """Convert numeric score to severity level"""
@@ -230,19 +231,183 @@ class SeverityScorer:
                 factors.append(f"Severe {injury['type']}")
         
         # Check vital signs
-        hr = vital_signs.get("heart_rate", 75)
-        if hr < 50 or hr > 120:
-            factors.append(f"Abnormal heart rate: {hr} bpm")
+        flags = flags_for(vital_signs)
+        if flags.any("hr_critical_low", "hr_critical_high"):
+            factors.append(f"Abnormal heart rate: {self._format_value(vital_signs['heart_rate'])} bpm")
         
-        spo2 = vital_signs.get("spo2", 98)
-        if spo2 < 90:
-            factors.append(f"Low oxygen: {spo2}%")
+        if "spo2_critical" in flags:
+            factors.append(f"Low oxygen: {self._format_value(vital_signs['spo2'])}%")
         
-        temp = vital_signs.get("body_temperature", 37)
-        if temp > 39 or temp < 35:
-            factors.append(f"Abnormal temperature: {temp}°C")
+        if flags.any("temp_critical_low", "temp_critical_high"):
+            factors.append(f"Abnormal temperature: {self._format_value(vital_signs['body_temperature'])}°C")
         
         if not conscious:
             factors.append("Patient unconscious")
         
         return factors
+    
+    def calculate_scores_batch(
+        self,
+        heart_rate: Sequence[float],
+        spo2: Optional[Sequence[float]] = None,
+        body_temperature: Optional[Sequence[float]] = None,
+        rhythm: Optional[Sequence[Union[int, str]]] = None,
+        injury_scores: Optional[Sequence[float]] = None,
+        patient_conscious: Optional[Sequence[bool]] = None,
+        injuries: Optional[Sequence[List[Dict[str, Any]]]] = None,
+        as_arrays: bool = False
+    ) -> Union[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+        """
+        Score many patients in one vectorized pass
+        
+        Columns are aligned by patient. NaN (or a missing column) means the
+        vital sign was not measured, like a missing key in calculate_score.
+        
+        Args:
+            heart_rate: Heart rate per patient (bpm)
+            spo2: SpO2 per patient (%)
+            body_temperature: Body temperature per patient (°C)
+            rhythm: Codes into RHYTHM_CODES (-1 = not measured) or rhythm names
+            injury_scores: Injury score per patient (0-10, as _score_injuries returns)
+            patient_conscious: Consciousness flag per patient (default True)
+            injuries: Per-patient injury lists; used for injury scores when
+                injury_scores is not given and for critical factors
+            as_arrays: Return columnar arrays instead of per-patient dicts
+            
+        Returns:
+            One calculate_score-style dict per patient, or a dict of arrays
+        """
+        hr = np.asarray(heart_rate, dtype=np.float64)
+        n = hr.shape[0]
+        missing = np.full(n, np.nan)
+        spo2 = missing if spo2 is None else np.asarray(spo2, dtype=np.float64)
+        temp = missing if body_temperature is None else np.asarray(body_temperature, dtype=np.float64)
+        conscious = np.ones(n, dtype=bool) if patient_conscious is None else np.asarray(patient_conscious, dtype=bool)
+        
+        if injury_scores is not None:
+            injury_score = np.nan_to_num(np.asarray(injury_scores, dtype=np.float64))
+        elif injuries is not None:
+            injury_score = np.array([self._score_injuries(items) for items in injuries], dtype=np.float64)
+        else:
+            injury_score = np.zeros(n)
+        
+        # Vital sign bands - the rule table's levels, as in the scalar scorers
+        hr_score, spo2_score, temp_score = (
+            np.asarray(self.LEVEL_SCORES[vital], dtype=np.float64)[vital_rules.level_ranks(vital, values)]
+            for vital, values in (("heart_rate", hr), ("spo2", spo2), ("body_temperature", temp))
+        )
+        rhythm_code = self._encode_rhythms(rhythm, n)
+        rhythm_table = np.array(self.RHYTHM_SCORES + [self.UNKNOWN_RHYTHM_SCORE], dtype=np.float64)
+        rhythm_score = rhythm_table[np.where(rhythm_code >= len(self.RHYTHM_CODES), len(self.RHYTHM_CODES), rhythm_code)]
+        
+        # Worst present component; unmeasured components do not count
+        components = np.stack([hr_score, spo2_score, temp_score, rhythm_score])
+        present = np.stack([~np.isnan(hr), ~np.isnan(spo2), ~np.isnan(temp), rhythm_code >= 0])
+        vital_score = np.where(present, components, 0.0).max(axis=0)
+        
+        consciousness_score = np.where(conscious, 0, 3)
+        total_score = np.clip(
+            injury_score * 0.4 + vital_score * 0.5 + consciousness_score * 0.1,
+            0, 10
+        )
+        
+        level_names = list(self.SEVERITY_LEVELS.keys())
+        severity_level = np.select(
+            [(total_score >= lo) & (total_score <= hi) for lo, hi in self.SEVERITY_LEVELS.values()],
+            level_names,
+            default="moderate"
+        )
+        
+        if as_arrays:
+            return {
+                "total_score": np.round(total_score, 2),
+                "severity_level": severity_level,
+                "injury_score": np.round(injury_score, 2),
+                "vital_signs_score": np.round(vital_score, 2),
+                "consciousness_score": consciousness_score,
+                "requires_immediate_attention": total_score >= 6
+            }
+        
+        critical_factors = self._critical_factors_batch(hr, spo2, temp, conscious, injuries)
+        
+        results = []
+        for i in range(n):
+            results.append({
+                "total_score": round(float(total_score[i]), 2),
+                "severity_level": str(severity_level[i]),
+                "breakdown": {
+                    "injury_score": round(float(injury_score[i]), 2),
+                    "vital_signs_score": round(float(vital_score[i]), 2),
+                    "consciousness_score": int(consciousness_score[i])
+                },
+                "critical_factors": critical_factors[i],
+                "requires_immediate_attention": bool(total_score[i] >= 6)
+            })
+        
+        log.info(f"Calculated {n} severity scores in batch")
+        return results
+    
+    def _encode_rhythms(self, rhythm: Optional[Sequence[Union[int, str]]], n: int) -> np.ndarray:
+        """Map rhythm names (or pass through codes) to RHYTHM_CODES indexes, -1 = missing"""
+        if rhythm is None:
+            return np.full(n, -1, dtype=np.int64)
+        
+        values = np.asarray(rhythm, dtype=object if not isinstance(rhythm, np.ndarray) else None)
+        if values.dtype.kind in "iu":
+            return values.astype(np.int64)
+        
+        # Map each distinct name once, then broadcast back to every patient
+        names, inverse = np.unique(values.astype(str), return_inverse=True)
+        lookup = {name: code for code, name in enumerate(self.RHYTHM_CODES)}
+        unknown = len(self.RHYTHM_CODES)
+        codes = np.array(
+            [-1 if name in ("", "None", "nan") else lookup.get(name, unknown) for name in names],
+            dtype=np.int64
+        )
+        return codes[inverse]
+    
+    def _critical_factors_batch(
+        self,
+        hr: np.ndarray,
+        spo2: np.ndarray,
+        temp: np.ndarray,
+        conscious: np.ndarray,
+        injuries: Optional[Sequence[List[Dict[str, Any]]]]
+    ) -> List[List[str]]:
+        """Critical factor strings per patient; masks are vectorized, strings built only where flagged"""
+        # Same rule table as the scalar path; unmeasured (NaN) values never fire
+        hr_masks = vital_rules.masks("heart_rate", hr)
+        temp_masks = vital_rules.masks("body_temperature", temp)
+        hr_flag = hr_masks["hr_critical_low"] | hr_masks["hr_critical_high"]
+        spo2_flag = vital_rules.masks("spo2", spo2)["spo2_critical"]
+        temp_flag = temp_masks["temp_critical_low"] | temp_masks["temp_critical_high"]
+        
+        factors: List[List[str]] = [[] for _ in range(hr.shape[0])]
+        
+        if injuries is not None:
+            for i, items in enumerate(injuries):
+                for injury in items:
+                    if injury.get("severity") == "high":
+                        factors[i].append(f"Severe {injury['type']}")
+        
+        for i in np.flatnonzero(hr_flag):
+            factors[i].append(f"Abnormal heart rate: {self._format_value(hr[i])} bpm")
+        for i in np.flatnonzero(spo2_flag):
+            factors[i].append(f"Low oxygen: {self._format_value(spo2[i])}%")
+        for i in np.flatnonzero(temp_flag):
+            factors[i].append(f"Abnormal temperature: {self._format_value(temp[i])}°C")
+        for i in np.flatnonzero(~conscious):
+            factors[i].append("Patient unconscious")
+        
+        return factors
+    
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """
+        Text for a vital sign in a critical factor
+        
+        Shared by the scalar and batch paths so the same reading reads the
+        same either way: whole numbers without a trailing .0 (85 and 85.0
+        both give "85"), anything else as a float.
+        """
+        return str(int(value)) if float(value).is_integer() else str(float(value))
@@ -0,0 +1,268 @@
+"""
+Streaming Early-Warning Scoring
+Keeps sliding windows over sampled vitals and scores where they are heading,
+so a slow decline shows up before it crosses a severity band
+"""
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from collections import deque
+import math
+import threading
+import time
+from ai_engine.severity_scorer import SeverityScorer
+from utils import log
+
+
+class SlidingWindowStats:
+    """
+    Running mean, variance and least-squares slope over a time window
+
+    Sums are kept incrementally, so adding a sample and evicting the
+    oldest ones are both O(1) (amortized over evictions).
+    """
+
+    # Re-center timestamps once they drift this far from the origin (seconds)
+    REBASE_AFTER = 3600.0
+
+    def __init__(self, span: float, max_samples: int):
+        """
+        Initialize window
+
+        Args:
+            span: Seconds of history kept
+            max_samples: Upper bound on samples kept
+        """
+        self.span = span
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+        self._origin: Optional[float] = None
+        self._n = 0
+        self._sum_t = 0.0
+        self._sum_x = 0.0
+        self._sum_tt = 0.0
+        self._sum_tx = 0.0
+        self._sum_xx = 0.0
+
+    def add(self, timestamp: float, value: float):
+        """Add one sample and drop those that fell out of the window"""
+        if self._origin is None:
+            self._origin = timestamp
+
+        if len(self._samples) == self._samples.maxlen:
+            self._remove(*self._samples[0])
+
+        t = timestamp - self._origin
+        self._samples.append((t, value))
+        self._n += 1
+        self._sum_t += t
+        self._sum_x += value
+        self._sum_tt += t * t
+        self._sum_tx += t * value
+        self._sum_xx += value * value
+
+        while self._samples and t - self._samples[0][0] > self.span:
+            self._remove(*self._samples[0])
+            self._samples.popleft()
+
+        if t > max(self.REBASE_AFTER, 2 * self.span):
+            self._rebase(self._samples[0][0])
+
+    def _remove(self, t: float, value: float):
+        """Subtract a sample from the running sums (caller pops it)"""
+        self._n -= 1
+        self._sum_t -= t
+        self._sum_x -= value
+        self._sum_tt -= t * t
+        self._sum_tx -= t * value
+        self._sum_xx -= value * value
+
+    def _rebase(self, shift: float):
+        """Move the time origin forward; O(n) but only once per REBASE_AFTER seconds"""
+        self._origin += shift
+        self._samples = deque(((t - shift, x) for t, x in self._samples), maxlen=self._samples.maxlen)
+        self._sum_tt -= 2 * shift * self._sum_t - self._n * shift * shift
+        self._sum_tx -= shift * self._sum_x
+        self._sum_t -= self._n * shift
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp of the newest sample, as passed to add()"""
+        return self._samples[-1][0] + self._origin if self._samples else None
+
+    @property
+    def count(self) -> int:
+        return self._n
+
+    @property
+    def latest(self) -> Optional[float]:
+        return self._samples[-1][1] if self._samples else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum_x / self._n if self._n else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self._n:
+            return None
+        mean = self._sum_x / self._n
+        return math.sqrt(max(0.0, self._sum_xx / self._n - mean * mean))
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope in value units per second (0 when undefined)"""
+        denominator = self._n * self._sum_tt - self._sum_t * self._sum_t
+        if self._n < 2 or denominator <= 1e-9:
+            return 0.0
+        return (self._n * self._sum_tx - self._sum_t * self._sum_x) / denominator
+
+
+class StreamingSeverityScorer:
+    """Trend-aware deterioration score per patient, updated one sample at a time"""
+
+    # Sensor a vital comes from when vital_signs carries no reading_sources
+    VITAL_SENSORS = {
+        "heart_rate": "ECG",
+        "spo2": "SpO2",
+        "body_temperature": "Temperature"
+    }
+
+    def __init__(
+        self,
+        severity_scorer: Optional[SeverityScorer] = None,
+        window: float = 120.0,
+        horizon: float = 300.0,
+        min_samples: int = 5,
+        max_samples: int = 256
+    ):
+        """
+        Initialize streaming scorer
+
+        Args:
+            severity_scorer: Scorer whose vital sign bands are reused
+            window: Seconds of history per vital
+            horizon: Seconds ahead the trend is projected
+            min_samples: Samples needed before the trend counts
+            max_samples: Upper bound on samples per window
+        """
+        self.severity_scorer = severity_scorer or SeverityScorer()
+        self.window = window
+        self.horizon = horizon
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+
+        # Vital -> band scoring function
+        self.band_scorers: Dict[str, Callable[[float], float]] = {
+            "heart_rate": self.severity_scorer._score_heart_rate,
+            "spo2": self.severity_scorer._score_spo2,
+            "body_temperature": self.severity_scorer._score_temperature
+        }
+
+        # patient id -> vital -> window
+        self._windows: Dict[str, Dict[str, SlidingWindowStats]] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        log.info(f"Streaming severity scorer initialized ({window}s window, {horizon}s horizon)")
+
+    def update(
+        self,
+        vital_signs: Dict[str, Any],
+        patient_id: str = "default",
+        timestamp: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Add one vitals sample and return the updated trend score
+
+        Args:
+            vital_signs: Vital signs from DataFusionEngine
+            patient_id: Patient the sample belongs to
+            timestamp: Sample time in seconds for vitals without a reading
+                time in reading_sources (defaults to now)
+
+        Returns:
+            Trend score with per-vital mean, slope, spread and projection
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        sources = vital_signs.get("reading_sources") or {}
+        stale_sensors = set(vital_signs.get("stale_sensors") or ())
+
+        with self._lock:
+            windows = self._windows.setdefault(patient_id, {})
+
+            for vital in self.band_scorers:
+                value = vital_signs.get(vital)
+                if value is None:
+                    continue
+                source = sources.get(vital) or {}
+                # A stale sensor's value repeats an older reading; other vitals still count
+                if source.get("sensor", self.VITAL_SENSORS[vital]) in stale_sensors:
+                    continue
+                sample_time = source.get("timestamp") or timestamp
+                window = windows.get(vital)
+                if window is None:
+                    window = windows[vital] = SlidingWindowStats(self.window, self.max_samples)
+                elif window.last_timestamp is not None and sample_time <= window.last_timestamp:
+                    continue  # Same reading collected again
+                window.add(sample_time, float(value))
+
+            result = self._score(windows)
+            self._latest[patient_id] = result
+            return result
+
+    def _score(self, windows: Dict[str, SlidingWindowStats]) -> Dict[str, Any]:
+        """Score each vital on its window mean and on where its trend leads"""
+        vitals = {}
+        worst = 0.0
+        deteriorating = False
+
+        for vital, window in windows.items():
+            if not window.count:
+                continue
+
+            score_band = self.band_scorers[vital]
+            mean = window.mean
+            current_score = score_band(mean)
+
+            slope = window.slope if window.count >= self.min_samples else 0.0
+            projected = window.latest + slope * self.horizon
+            projected_score = score_band(projected)
+
+            # Only a worsening trend adds to the score, at half the band step
+            score = min(10.0, current_score + max(0.0, projected_score - current_score) * 0.5)
+
+            if projected_score > current_score:
+                trend = "worsening"
+                deteriorating = True
+            elif projected_score < current_score:
+                trend = "improving"
+            else:
+                trend = "stable"
+
+            vitals[vital] = {
+                "mean": round(mean, 2),
+                "std": round(window.std, 2),
+                "slope_per_min": round(slope * 60, 3),
+                "projected": round(projected, 2),
+                "score": round(score, 2),
+                "trend": trend,
+                "samples": window.count
+            }
+            worst = max(worst, score)
+
+        return {
+            "score": round(worst, 2),
+            "level": self.severity_scorer._get_severity_level(worst),
+            "deteriorating": deteriorating,
+            "horizon_seconds": self.horizon,
+            "vitals": vitals
+        }
+
+    def get_latest(self, patient_id: str = "default") -> Optional[Dict[str, Any]]:
+        """Get the last computed trend score without adding a sample"""
+        return self._latest.get(patient_id)
+
+    def reset(self, patient_id: str = "default"):
+        """Forget a patient's history"""
+        with self._lock:
+            self._windows.pop(patient_id, None)
+            self._latest.pop(patient_id, None)
+
@@ -1,13 +1,19 @@
 """
 FastAPI application - Main entry point
 """
-from typing import Optional
+from typing import Optional, Dict, List
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import os
+import tempfile
 import time
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+import uuid
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from pathlib import Path
-import shutil
 
 import sys
 from pathlib import Path
@@ -17,25 +23,34 @@ backend_dir = Path(__file__).resolve().parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
+from api.responses import NumpyJSONResponse
 from api.models import (
     EmergencyAssessmentRequest,
     EmergencyAssessmentResponse,
     ChatMessage,
     ChatResponse,
-    SystemStatus
+    SystemStatus,
+    TriagePatient
 )
 from core import DataFusionEngine, ReportGenerator, EmergencyDispatcher
 from core.pdf_report_generator import PDFReportGenerator
+from core.live_stream import VitalsBroadcaster
+from sensors.gps_track import gps_tracks
 from ai_engine import MedicalChatbot
+from ai_engine.result_cache import content_hash
 from utils import log, config
-from utils.json_helpers import convert_numpy_types
+from utils.admission import Overloaded
+from utils.json_helpers import dumps_bytes, safe_json_dumps
+from utils.offload import offload
+from utils.shared_state import shared_state
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Smart Rescuer API",
     description="Emergency medical response system with offline AI",
-    version=config.APP_VERSION
+    version=config.APP_VERSION,
+    default_response_class=NumpyJSONResponse
 )
 
 # CORS middleware
@@ -53,12 +68,86 @@ report_generator = ReportGenerator()
 pdf_generator = PDFReportGenerator()
 dispatcher = EmergencyDispatcher()
 chatbot = MedicalChatbot()
+live_broadcaster = VitalsBroadcaster(data_fusion)
 
 # Upload directory
 UPLOAD_DIR = Path("./uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 
+@app.on_event("startup")
+async def start_background_services():
+    """Start background sensor sampling and the EMS sender"""
+    if config.ENABLE_BACKGROUND_SAMPLER or data_fusion.shared_sensors:
+        data_fusion.start_sampling()
+    dispatcher.start()
+    shared_state.purge_expired()
+
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    """Stop background sensor sampling, EMS sender and worker pools"""
+    from sensors.advanced_sensors import advanced_sensors
+    
+    await dispatcher.stop()
+    data_fusion.stop_sampling()
+    advanced_sensors.stop()
+    offload.shutdown()
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Shed requests get 503 so clients back off and retry"""
+    log.warning(f"Shed {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "stage": exc.stage},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
+
+# Uploaded images still being written to disk, by path
+_pending_image_writes: Dict[str, asyncio.Task] = {}
+
+
+def _write_file_atomic(path: Path, data: bytes):
+    """Write to a temporary name and rename, so no reader sees a partial file"""
+    # A unique temp file per write, so concurrent writers never share one
+    fd, partial = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o644)  # mkstemp creates 0600
+            f.write(data)
+        os.replace(partial, path)
+    except Exception:
+        try:
+            os.unlink(partial)
+        except OSError:
+            pass
+        raise
+
+
+def _persist_image_later(data: bytes, path: Path) -> str:
+    """
+    Write an uploaded image to disk in the background
+    
+    Detection works on the in-memory bytes; the file is only needed later
+    for the PDF report, so the request does not wait for the write. The PDF
+    request may reach another worker, which only sees the finished file.
+    """
+    key = str(path)
+    task = asyncio.create_task(offload.run("io", _write_file_atomic, path, data))
+    _pending_image_writes[key] = task
+    
+    def _forget(finished: asyncio.Task):
+        # A newer write to the same path replaced this entry; keep it
+        if _pending_image_writes.get(key) is finished:
+            del _pending_image_writes[key]
+    
+    task.add_done_callback(_forget)
+    return key
+
+
 @app.get("/")
 async def root():
     """API root endpoint"""
@@ -68,6 +157,7 @@ async def root():
         "status": "running",
         "endpoints": {
             "emergency": "/api/emergency/assess",
+            "triage": "/api/emergency/triage",
             "chat": "/api/chat",
             "status": "/api/status",
             "docs": "/docs"
@@ -101,7 +191,11 @@ async def get_status():
         return SystemStatus(
             sensors=sensor_status,
             version=config.APP_VERSION,
-            debug_mode=config.DEBUG
+            debug_mode=config.DEBUG,
+            inference=data_fusion.injury_detector.get_status(),
+            dispatch=dispatcher.get_status(),
+            admission=offload.get_status(),
+            sensor_owner=data_fusion.get_owner_status()
         )
     except Exception as e:
         log.error(f"Failed to get status: {e}")
@@ -122,45 +216,126 @@ async def assess_emergency(
     try:
         log.info("Emergency assessment requested")
         
-        # Handle image upload
+        # Handle image upload - decoded from memory, saved for the PDF in the background
+        image_data = await image.read() if image else None
         image_path = None
-        if image:
-            image_path = UPLOAD_DIR / f"injury_{int(time.time())}.jpg"
-            with open(image_path, "wb") as buffer:
-                shutil.copyfileobj(image.file, buffer)
-            log.info(f"Image uploaded: {image_path}")
+        if image_data:
+            image_path = _persist_image_later(image_data, UPLOAD_DIR / f"injury_{uuid.uuid4().hex}.jpg")
+            log.info(f"Image uploaded: {image_path} ({len(image_data)} bytes)")
         
         # Perform assessment
-        assessment = data_fusion.perform_emergency_assessment(
-            image_path=str(image_path) if image_path else None,
+        assessment = await offload.run(
+            "assessment",
+            data_fusion.perform_emergency_assessment,
+            image_data=image_data,
             patient_conscious=patient_conscious
         )
         
         # Generate report
-        report = report_generator.generate_ems_report(assessment)
+        report = await offload.run("assessment", report_generator.generate_ems_report, assessment)
         
-        # Dispatch to EMS if critical
+        # Queue for EMS if critical (a local insert; the sender delivers it).
+        # The insert can wait on other workers' SQLite writes - keep it off the loop
         if assessment.get("requires_ems"):
-            dispatch_result = dispatcher.dispatch_report(report)
+            dispatch_result = await offload.run("io", dispatcher.dispatch_report, report)
             log.info(f"EMS dispatch result: {dispatch_result['status']}")
         
-        # Convert numpy types to native Python types
-        assessment = convert_numpy_types(assessment)
-        report = convert_numpy_types(report)
-        
-        # Return assessment
-        return JSONResponse(content={
+        # Serialized in one pass; numpy types need no conversion first
+        return NumpyJSONResponse(content={
             "assessment": assessment,
             "report": report,
             "text_summary": report_generator.generate_text_summary(assessment),
-            "patient_image_path": str(image_path) if image_path else None
+            "patient_image_path": image_path
         })
         
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Emergency assessment failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+_triage_patients = TypeAdapter(List[TriagePatient])
+
+
+@app.post("/api/emergency/triage")
+async def triage_patients(
+    patients: str = Form(...),
+    images: Optional[List[UploadFile]] = File(None)
+):
+    """
+    Triage many patients in one request (mass-casualty incidents)
+    
+    - **patients**: JSON list of {patient_id, patient_conscious, vital_signs, image_index}
+    - **images**: Injury photos, referenced by each patient's image_index
+    """
+    try:
+        entries = _triage_patients.validate_json(patients)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    images = images or []
+    if not entries:
+        raise HTTPException(status_code=422, detail="No patients given")
+    if len(entries) > config.TRIAGE_MAX_PATIENTS:
+        raise HTTPException(status_code=413, detail=f"At most {config.TRIAGE_MAX_PATIENTS} patients per request")
+    for entry in entries:
+        if entry.image_index is not None and entry.image_index >= len(images):
+            raise HTTPException(status_code=422, detail=f"image_index {entry.image_index} out of range ({len(images)} images)")
+    
+    try:
+        log.info(f"Batch triage requested for {len(entries)} patients ({len(images)} images)")
+        image_data = [await image.read() for image in images]
+        
+        batch = [
+            {
+                "patient_id": entry.patient_id,
+                "patient_conscious": entry.patient_conscious,
+                "vital_signs": entry.vital_signs.model_dump() if entry.vital_signs else None,
+                "image_data": image_data[entry.image_index] if entry.image_index is not None else None
+            }
+            for entry in entries
+        ]
+        triage = await offload.run("assessment", data_fusion.perform_batch_triage, batch)
+        assessments = triage["assessments"]
+        reports = await offload.run("assessment", report_generator.generate_batch_reports, assessments)
+        
+        for assessment, report in zip(assessments, reports):
+            if assessment.get("requires_ems"):
+                await offload.run("io", dispatcher.dispatch_report, report)
+        
+        ranked = []
+        for rank, i in enumerate(triage["order"], start=1):
+            severity = assessments[i]["severity"]
+            ranked.append({
+                "rank": rank,
+                "index": i,
+                "patient_id": assessments[i]["patient_id"],
+                "priority": reports[i].get("priority"),
+                "severity_level": severity.get("severity_level"),
+                "total_score": severity.get("total_score"),
+                "critical_factors": severity.get("critical_factors", []),
+                "requires_ems": assessments[i]["requires_ems"],
+                "report_id": reports[i].get("report_id")
+            })
+        
+        return NumpyJSONResponse(content={
+            "timestamp": triage["timestamp"],
+            "location": triage["location"],
+            "count": len(assessments),
+            "triage": ranked,
+            "patients": [
+                {"assessment": assessment, "report": report}
+                for assessment, report in zip(assessments, reports)
+            ]
+        })
+        
+    except Overloaded:
+        raise
+    except Exception as e:
+        log.error(f"Batch triage failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(message: ChatMessage):
     """
@@ -168,15 +343,40 @@ async def chat(message: ChatMessage):
     
     - **message**: User's message/symptoms
     - **reset_history**: Reset conversation history
+    - **session_id**: Conversation to continue (shared by all workers); omit it
+      to start a new conversation and send back the session_id in the response
     """
     try:
-        response = chatbot.chat(
-            user_message=message.message,
-            reset_history=message.reset_history
-        )
+        response = None
+        if not offload.under_pressure("chat"):
+            try:
+                response = await offload.run(
+                    "chat",
+                    chatbot.chat,
+                    user_message=message.message,
+                    reset_history=message.reset_history,
+                    session_id=message.session_id
+                )
+            except Overloaded:
+                pass
+        
+        if response is None:
+            # Saturated: answer from the rules and leave the CPU to emergencies.
+            # Still off the event loop - the history append waits on SQLite.
+            offload.record_degraded("chat")
+            response = await offload.run(
+                "io",
+                chatbot.chat,
+                message.message,
+                reset_history=message.reset_history,
+                rule_based=True,
+                session_id=message.session_id
+            )
         
         return ChatResponse(**response)
         
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Chat failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -186,8 +386,10 @@ async def chat(message: ChatMessage):
 async def calibrate_sensors():
     """Calibrate all sensors"""
     try:
-        results = data_fusion.calibrate_all_sensors()
+        results = await offload.run("sensors", data_fusion.calibrate_all_sensors)
         return {"calibration_results": results}
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Calibration failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -197,8 +399,10 @@ async def calibrate_sensors():
 async def get_vital_signs():
     """Get current vital signs reading"""
     try:
-        vital_signs = data_fusion._collect_vital_signs()
+        vital_signs = await offload.run("sensors", data_fusion._collect_vital_signs)
         return {"vital_signs": vital_signs}
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Failed to read vital signs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -209,87 +413,107 @@ async def live_stream_vitals():
     """
     Live stream endpoint - Real-time vital signs with instant analysis
     Returns current sensor readings + instant health assessment
+    
+    Prefer the push endpoints (/api/live/ws, /api/live/events) for dashboards.
     """
     try:
-        from ai_engine.severity_scorer import SeverityScorer
-        
-        # Collect real-time vital signs
-        vital_signs = data_fusion._collect_vital_signs()
-        
-        # Get GPS location
-        location = data_fusion.gps_module.read()
-        
-        # Calculate instant severity score
-        scorer = SeverityScorer()
-        severity = scorer.calculate_score(
-            vital_signs=vital_signs,
-            injuries=[],
-            patient_conscious=True
-        )
-        
-        # Instant analysis
-        analysis = {
-            "timestamp": datetime.now().isoformat(),
-            "vital_signs": vital_signs,
-            "location": location,
-            "severity": severity,
-            "instant_alerts": []
-        }
-        
-        # Check for critical conditions
-        if vital_signs.get('heart_rate'):
-            hr = vital_signs['heart_rate']
-            if hr > 120:
-                analysis['instant_alerts'].append({
-                    "type": "warning",
-                    "message": "High heart rate detected",
-                    "value": hr
-                })
-            elif hr < 50:
-                analysis['instant_alerts'].append({
-                    "type": "critical",
-                    "message": "Low heart rate detected",
-                    "value": hr
-                })
-        
-        if vital_signs.get('spo2'):
-            spo2 = vital_signs['spo2']
-            if spo2 < 90:
-                analysis['instant_alerts'].append({
-                    "type": "critical",
-                    "message": "Critical oxygen level",
-                    "value": spo2
-                })
-        
-        if vital_signs.get('body_temperature'):
-            temp = vital_signs['body_temperature']
-            if temp > 38.5:
-                analysis['instant_alerts'].append({
-                    "type": "warning",
-                    "message": "High temperature detected",
-                    "value": temp
-                })
+        # Reuse the broadcaster's newest sample when it is already running
+        analysis = live_broadcaster.get_latest()
+        if analysis is None:
+            analysis = await live_broadcaster.sample()
         
         return analysis
         
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Live stream failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/api/live/ws")
+async def live_stream_websocket(websocket: WebSocket):
+    """
+    Push live vitals over WebSocket
+    
+    First frame is a full snapshot, later frames are deltas carrying only
+    changed vitals, severity, location and raised/cleared alerts.
+    """
+    await websocket.accept()
+    subscription = live_broadcaster.subscribe()
+    try:
+        async for frame in live_broadcaster.frames(subscription):
+            # Text frame for the browser's JSON.parse; numpy values serialize too
+            await websocket.send_text(dumps_bytes(frame).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        log.warning(f"Live WebSocket closed: {e}")
+    finally:
+        live_broadcaster.unsubscribe(subscription)
+
+
+@app.get("/api/live/events")
+async def live_stream_events(request: Request):
+    """Push live vitals as Server-Sent Events (same frames as /api/live/ws)"""
+    async def event_stream():
+        subscription = live_broadcaster.subscribe()
+        try:
+            async for frame in live_broadcaster.frames(subscription):
+                if await request.is_disconnected():
+                    break
+                yield f"event: {frame['type']}\nid: {frame['seq']}\ndata: ".encode() + dumps_bytes(frame) + b"\n\n"
+        finally:
+            live_broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/location")
 async def get_location():
     """Get current GPS location"""
     try:
-        location = data_fusion.gps_module.read()
+        location = await offload.run("sensors", data_fusion.get_location)
         if location:
             location["maps_url"] = data_fusion.gps_module.get_google_maps_url()
         return {"location": location}
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Failed to read location: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/location/track")
+async def get_location_track(
+    since: Optional[float] = None,
+    tolerance: Optional[float] = None,
+    unit_id: Optional[str] = None,
+    encoding: str = "points"
+):
+    """
+    Get a unit's smoothed GPS breadcrumb trail
+    
+    Args:
+        since: Only points after this epoch time (seconds)
+        tolerance: Simplification tolerance in meters (0 = every point)
+        unit_id: Unit to query (defaults to this unit)
+        encoding: "points" or "delta" (integer deltas, smallest payload)
+    """
+    if encoding not in ("points", "delta"):
+        raise HTTPException(status_code=400, detail="encoding must be 'points' or 'delta'")
+    
+    unit_id = unit_id or config.UNIT_ID
+    track = await offload.run("io", gps_tracks.get_track, unit_id, since, tolerance, encoding)
+    if track is None:
+        raise HTTPException(status_code=404, detail=f"No track for unit {unit_id}")
+    return track
+
+
 @app.get("/api/sensors/advanced")
 async def read_advanced_sensors():
     """قراءة جميع الحساسات المتقدمة (9 حساسات)"""
@@ -297,7 +521,7 @@ async def read_advanced_sensors():
         from sensors.advanced_sensors import advanced_sensors
         
         # قراءة الحساسات
-        readings = advanced_sensors.read_all_sensors()
+        readings = await offload.run("sensors", advanced_sensors.read_all_sensors)
         
         # تحليل الحالة
         health_summary = advanced_sensors.get_health_summary(readings)
@@ -308,6 +532,8 @@ async def read_advanced_sensors():
             "health_summary": health_summary,
             "timestamp": readings['timestamp']
         }
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Failed to read advanced sensors: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -348,44 +574,37 @@ async def complete_emergency_assessment(
         from core.first_aid import first_aid
         from ai_engine.medical_analyzer import medical_ai
         
-        # 1. Computer Vision Analysis
-        if image:
-            temp_file = Path(config.UPLOAD_DIR) / f"temp_{time.time()}.jpg"
-            with open(temp_file, "wb") as buffer:
-                shutil.copyfileobj(image.file, buffer)
-            
-            assessment = data_fusion.assess_emergency(
-                patient_conscious=request.patient_conscious,
-                image_path=str(temp_file)
-            )
-            temp_file.unlink(missing_ok=True)
-        else:
-            assessment = data_fusion.assess_emergency(
-                patient_conscious=request.patient_conscious
-            )
+        # 1. Computer Vision Analysis (decoded in memory, no temp file)
+        image_data = await image.read() if image else None
+        assessment = await offload.run(
+            "assessment",
+            data_fusion.perform_emergency_assessment,
+            image_data=image_data,
+            patient_conscious=request.patient_conscious
+        )
         
         # 2. Read All Sensors
-        sensor_readings = advanced_sensors.read_all_sensors()
+        sensor_readings = await offload.run("sensors", advanced_sensors.read_all_sensors)
         health_summary = advanced_sensors.get_health_summary(sensor_readings)
         
         # 3. AI Medical Analysis (الجديد - تحليل ذكي مو ردود ثابتة)
         ai_analysis = medical_ai.analyze_complete_case(
-            vision_data={'injuries': assessment.get('detected_injuries', [])},
+            vision_data={'injuries': assessment.get('injuries', [])},
             sensor_data=sensor_readings
         )
         
         # 4. Get First Aid Instructions
         instructions = first_aid.get_instructions(
             condition="emergency",
-            injuries=assessment.get('detected_injuries', []),
+            injuries=assessment.get('injuries', []),
             vital_signs=sensor_readings
         )
         
         # 5. Generate Complete Report
         complete_report = {
             "vision_analysis": {
-                "injuries": assessment.get('detected_injuries', []),
-                "severity": assessment.get('severity_assessment', {})
+                "injuries": assessment.get('injuries', []),
+                "severity": assessment.get('severity', {})
             },
             "sensor_readings": sensor_readings,
             "health_summary": health_summary,
@@ -394,18 +613,21 @@ async def complete_emergency_assessment(
             "overall_severity": ai_analysis['diagnosis']['severity'],
             "critical_alerts": health_summary['critical_alerts'],
             "warnings": health_summary['warnings'],
-            "gps_location": sensor_readings['gps']['maps_link'],
+            # Absent while the first GPS read is pending
+            "gps_location": sensor_readings['gps'].get('maps_link'),
             "timestamp": sensor_readings['timestamp']
         }
         
         # 6. Generate EMS Report
-        ems_report = report_generator.generate_report(assessment, sensor_readings)
-        complete_report['ems_report_path'] = str(ems_report)
+        ems_report = await offload.run("assessment", report_generator.generate_ems_report, assessment)
+        complete_report['ems_report_path'] = ems_report.get('report_file')
         
         log.info(f"Complete AI assessment: {ai_analysis['diagnosis']['severity']}")
         
         return {"success": True, **complete_report}
         
+    except Overloaded:
+        raise
     except Exception as e:
         log.error(f"Complete assessment failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -415,6 +637,23 @@ async def complete_emergency_assessment(
 
 
 
+# Recently rendered PDFs by report content, reused when the PDF stage is saturated
+_pdf_cache: "OrderedDict[str, Path]" = OrderedDict()
+PDF_CACHE_SIZE = 32
+
+
+def _pdf_cache_key(assessment: dict, patient_image_path: Optional[str]) -> str:
+    content = safe_json_dumps({"assessment": assessment, "image": patient_image_path}, sort_keys=True)
+    return content_hash(content.encode("utf-8"))
+
+
+def _remember_pdf(key: str, pdf_path: Path):
+    _pdf_cache[key] = pdf_path
+    _pdf_cache.move_to_end(key)
+    while len(_pdf_cache) > PDF_CACHE_SIZE:
+        _pdf_cache.popitem(last=False)
+
+
 @app.post("/api/emergency/download-report")
 async def download_pdf_report(data: dict):
     """
@@ -432,25 +671,60 @@ async def download_pdf_report(data: dict):
         assessment = data.get('assessment', {})
         patient_image_path = data.get('patient_image_path')
         
+        # Wait for the uploaded photo if it is still being written
+        pending_write = _pending_image_writes.get(patient_image_path) if patient_image_path else None
+        if pending_write is not None:
+            try:
+                await asyncio.shield(pending_write)
+            except Exception as e:
+                log.warning(f"Patient photo was not saved: {e}")
+        elif patient_image_path and not Path(patient_image_path).exists():
+            # Uploaded through another worker, whose write may still be finishing
+            for _ in range(10):
+                await asyncio.sleep(0.1)
+                if Path(patient_image_path).exists():
+                    break
+        
         # Validate assessment data
         if not assessment:
             log.error("No assessment data provided")
             raise HTTPException(status_code=400, detail="Assessment data is required")
         
-        # Add GPS location to assessment if available
-        if 'location' not in assessment or not assessment['location']:
-            try:
-                location_data = data_fusion.gps_module.read()
-                if location_data:
-                    assessment['location'] = location_data
-            except Exception as e:
-                log.warning(f"Could not get GPS location: {e}")
+        # Under load, the same report downloaded again is served from the last render
+        cache_key = _pdf_cache_key(assessment, patient_image_path)
+        cached_pdf = _pdf_cache.get(cache_key)
+        if cached_pdf is not None and not cached_pdf.exists():
+            cached_pdf = None
         
-        # Generate PDF with patient photo and location
-        pdf_path = pdf_generator.generate_pdf_report(
-            assessment=assessment,
-            patient_image_path=patient_image_path
-        )
+        if cached_pdf is not None and offload.under_pressure("pdf"):
+            offload.record_degraded("pdf")
+            pdf_path = cached_pdf
+        else:
+            # Add GPS location to assessment if available
+            if 'location' not in assessment or not assessment['location']:
+                try:
+                    location_data = await offload.run("sensors", data_fusion.get_location)
+                    if location_data:
+                        assessment['location'] = location_data
+                except Exception as e:
+                    log.warning(f"Could not get GPS location: {e}")
+            
+            # Generate PDF with patient photo and location
+            # ReportLab rendering is CPU-bound - keep it off the worker's threads
+            try:
+                pdf_path = await offload.run(
+                    "pdf",
+                    pdf_generator.generate_pdf_report,
+                    assessment=assessment,
+                    patient_image_path=patient_image_path,
+                    use_process=True
+                )
+            except Overloaded:
+                if cached_pdf is None:
+                    raise
+                offload.record_degraded("pdf")
+                pdf_path = cached_pdf
+            _remember_pdf(cache_key, pdf_path)
         
         if not pdf_path.exists():
             log.error("PDF file was not created")
@@ -469,7 +743,7 @@ async def download_pdf_report(data: dict):
             }
         )
         
-    except HTTPException:
+    except (HTTPException, Overloaded):
         raise
     except Exception as e:
         log.error(f"PDF generation failed: {e}", exc_info=True)
@@ -43,6 +43,14 @@ class EmergencyAssessmentRequest(BaseModel):
     image_path: Optional[str] = None
 
 
+class TriagePatient(BaseModel):
+    """One patient of a batch triage request"""
+    patient_id: Optional[str] = Field(None, description="Tag or label given at the scene")
+    patient_conscious: bool = True
+    vital_signs: Optional[VitalSigns] = None
+    image_index: Optional[int] = Field(None, ge=0, description="Index into the uploaded images")
+
+
 class EmergencyAssessmentResponse(BaseModel):
     """Emergency assessment result"""
     timestamp: str
@@ -59,6 +67,7 @@ class ChatMessage(BaseModel):
     """Chat message"""
     message: str
     reset_history: bool = False
+    session_id: Optional[str] = None  # conversation to continue; any API worker can serve it, None starts a new one
 
 
 class ChatResponse(BaseModel):
@@ -66,6 +75,7 @@ class ChatResponse(BaseModel):
     message: str
     is_emergency: bool
     model: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class SensorStatus(BaseModel):
@@ -74,6 +84,8 @@ class SensorStatus(BaseModel):
     ready: bool
     simulated: bool = False
     has_fix: Optional[bool] = None
+    acquisition: Optional[Dict[str, Any]] = None  # ECG sample rate and drops (None when simulated)
+    reader: Optional[Dict[str, Any]] = None  # GPS NMEA reader counters (None when simulated)
 
 
 class SystemStatus(BaseModel):
@@ -81,3 +93,7 @@ class SystemStatus(BaseModel):
     sensors: Dict[str, SensorStatus]
     version: str
     debug_mode: bool
+    inference: Optional[Dict[str, Any]] = None
+    dispatch: Optional[Dict[str, Any]] = None
+    admission: Optional[Dict[str, Any]] = None
+    sensor_owner: Optional[Dict[str, Any]] = None
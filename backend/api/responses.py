@@ -0,0 +1,18 @@
+"""
+Response classes for the API
+"""
+from typing import Any
+from fastapi.responses import JSONResponse
+from utils.json_helpers import dumps_bytes
+
+
+class NumpyJSONResponse(JSONResponse):
+    """
+    JSON response serialized in one pass with numpy support
+    
+    Return it directly from an endpoint to skip FastAPI's jsonable_encoder
+    walk as well; numpy scalars and arrays need no prior conversion.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
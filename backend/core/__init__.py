@@ -3,10 +3,14 @@ from core.data_fusion import DataFusionEngine
 from core.report_generator import ReportGenerator
 from core.pdf_report_generator import PDFReportGenerator
 from core.emergency_dispatcher import EmergencyDispatcher
+from core.dispatch_outbox import DispatchOutbox
+from core.live_stream import VitalsBroadcaster
 
 __all__ = [
     'DataFusionEngine',
     'ReportGenerator',
     'PDFReportGenerator',
-    'EmergencyDispatcher'
+    'EmergencyDispatcher',
+    'DispatchOutbox',
+    'VitalsBroadcaster'
 ]
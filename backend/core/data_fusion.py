@@ -2,13 +2,21 @@
 Data Fusion Engine
 Combines sensor data, AI analysis, and generates comprehensive assessment
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+import threading
+import time
 import cv2
 import numpy as np
-from sensors import ECGSensor, SpO2Sensor, TemperatureSensor, GPSModule
-from ai_engine import InjuryDetector, SeverityScorer
-from utils import log
+from sensors import BaseSensor, ECGSensor, SpO2Sensor, TemperatureSensor, GPSModule, SensorSampler
+from sensors.session_recorder import SessionPlayer, session_recorder
+from sensors.shared_ring import SharedRingReader
+from sensors.sensor_owner import OWNER_NAMESPACE, describe_sensors, request_calibration, segment_name, shared_sensor_views
+from ai_engine import InjuryDetector, SeverityScorer, StreamingSeverityScorer
+from utils import log, config
+from utils.vital_rules import vital_rules, FLAGS_KEY
+from utils.shared_state import shared_state
 
 
 class DataFusionEngine:
@@ -16,22 +24,60 @@ class DataFusionEngine:
     
     def __init__(self):
         """Initialize data fusion engine"""
-        # Initialize sensors
-        self.ecg_sensor = ECGSensor()
-        self.spo2_sensor = SpO2Sensor()
-        self.temp_sensor = TemperatureSensor()
-        self.gps_module = GPSModule()
+        # Initialize sensors - or, next to other API workers, views of the
+        # readings the sensor owner process publishes
+        self.shared_sensors = config.SENSOR_MODE == "shared"
+        self.session_player: Optional[SessionPlayer] = None
+        if self.shared_sensors:
+            from sensors.advanced_sensors import advanced_sensors
+            
+            self.ecg_sensor, self.spo2_sensor, self.temp_sensor, self.gps_module = shared_sensor_views()
+            advanced_sensors.shared = SharedRingReader(segment_name(advanced_sensors.name), config.SENSOR_BUFFER_SIZE)
+        else:
+            self.ecg_sensor = ECGSensor()
+            self.spo2_sensor = SpO2Sensor()
+            self.temp_sensor = TemperatureSensor()
+            self.gps_module = GPSModule()
+            
+            # A recorded session can stand in for every sensor
+            if config.SESSION_REPLAY_PATH:
+                self._attach_replay(config.SESSION_REPLAY_PATH)
+        
+        # Concurrent acquisition: one worker per vital sign sensor
+        self.concurrent_reads = config.CONCURRENT_SENSOR_READS
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=3,
+            thread_name_prefix="sensor-read"
+        )
+        self._pending_reads: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        
+        # Background sampling keeps each sensor's ring buffer fresh
+        self.sampler = SensorSampler([
+            self.ecg_sensor,
+            self.spo2_sensor,
+            self.temp_sensor,
+            self.gps_module
+        ])
         
         # Initialize AI components
         self.injury_detector = InjuryDetector()
         self.severity_scorer = SeverityScorer()
+        self.trend_scorer = StreamingSeverityScorer(
+            self.severity_scorer,
+            window=config.TREND_WINDOW,
+            horizon=config.TREND_HORIZON,
+            min_samples=config.TREND_MIN_SAMPLES,
+            max_samples=config.SENSOR_BUFFER_SIZE
+        )
         
         log.info("Data Fusion Engine initialized")
     
     def perform_emergency_assessment(
         self,
         image_path: Optional[str] = None,
-        patient_conscious: bool = True
+        patient_conscious: bool = True,
+        image_data: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """
         Perform complete emergency assessment
@@ -39,6 +85,7 @@ class DataFusionEngine:
         Args:
             image_path: Path to injury image (optional)
             patient_conscious: Whether patient is conscious
+            image_data: Encoded injury image held in memory (optional, preferred over image_path)
             
         Returns:
             Complete assessment report
@@ -57,16 +104,19 @@ class DataFusionEngine:
             
             # Step 2: Detect injuries (if image provided)
             injuries = []
-            if image_path:
+            if image_data or image_path:
                 step_start = time.time()
                 log.info("Analyzing injuries from image...")
-                injuries = self.injury_detector.detect_from_image(image_path)
+                if image_data:
+                    injuries = self.injury_detector.detect_from_bytes(memoryview(image_data))
+                else:
+                    injuries = self.injury_detector.detect_from_image(image_path)
                 log.info(f"✓ Injury detection completed in {time.time() - step_start:.2f}s")
             
             # Step 3: Get location
             step_start = time.time()
             log.info("Getting GPS location...")
-            location = self.gps_module.read()
+            location = self.get_location()
             log.info(f"✓ GPS location obtained in {time.time() - step_start:.2f}s")
             
             # Step 4: Calculate severity score
@@ -104,40 +154,275 @@ class DataFusionEngine:
                 "status": "failed"
             }
     
+    def perform_batch_triage(self, patients: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Assess many patients at one scene in a single pass
+        
+        The unit's own sensors belong to at most one patient, so vitals come
+        from what each medic supplies. Photos go through batched detection,
+        every patient is scored in one vectorized severity pass, and the
+        scene location is read once.
+        
+        Args:
+            patients: Dicts with optional patient_id, patient_conscious,
+                vital_signs (heart_rate, spo2, body_temperature, rhythm)
+                and image_data (encoded photo bytes)
+            
+        Returns:
+            Per-patient assessments (input order) and the triage order
+        """
+        start_time = time.time()
+        assessment_time = datetime.now().isoformat()
+        log.info(f"Starting batch triage of {len(patients)} patients...")
+        
+        injuries = self.injury_detector.detect_batch([p.get("image_data") for p in patients])
+        location = self.get_location()
+        
+        vitals = []
+        for patient in patients:
+            supplied = {k: v for k, v in (patient.get("vital_signs") or {}).items() if v is not None}
+            supplied[FLAGS_KEY] = vital_rules.evaluate(supplied).to_list()
+            vitals.append(supplied)
+        
+        def column(key):
+            return [v.get(key, np.nan) for v in vitals]
+        
+        conscious = [patient.get("patient_conscious", True) for patient in patients]
+        severities = self.severity_scorer.calculate_scores_batch(
+            heart_rate=column("heart_rate"),
+            spo2=column("spo2"),
+            body_temperature=column("body_temperature"),
+            rhythm=[v.get("rhythm") for v in vitals],
+            patient_conscious=conscious,
+            injuries=injuries
+        )
+        
+        assessments = []
+        for i, patient in enumerate(patients):
+            assessments.append({
+                "patient_id": patient.get("patient_id") or f"P{i + 1:02d}",
+                "timestamp": assessment_time,
+                "vital_signs": vitals[i],
+                "injuries": injuries[i],
+                "injury_summary": self.injury_detector.get_injury_summary(injuries[i]),
+                "location": location,
+                "severity": severities[i],
+                "patient_conscious": conscious[i],
+                "requires_ems": severities[i]["requires_immediate_attention"]
+            })
+        
+        # Highest score first; unconscious patients break ties, then arrival order
+        order = sorted(
+            range(len(assessments)),
+            key=lambda i: (-severities[i]["total_score"], conscious[i], i)
+        )
+        
+        log.info(f"✅ Batch triage of {len(patients)} patients complete in {time.time() - start_time:.2f}s")
+        return {
+            "timestamp": assessment_time,
+            "location": location,
+            "assessments": assessments,
+            "order": order
+        }
+    
     def _collect_vital_signs(self) -> Dict[str, Any]:
         """Collect data from all vital sign sensors"""
         vital_signs = {}
+        stale_sensors = []
+        sources: Dict[str, BaseSensor] = {}
         
         try:
+            sensors = [self.ecg_sensor, self.spo2_sensor, self.temp_sensor]
+            if self.shared_sensors or self.sampler.is_running:
+                readings, stale_sensors = self._read_sampled(sensors)
+            elif self.concurrent_reads:
+                readings, stale_sensors = self._read_sensors_concurrently(sensors)
+            else:
+                readings = {sensor.name: sensor.read() for sensor in sensors}
+            
             # ECG
-            ecg_data = self.ecg_sensor.read()
+            ecg_data = readings.get(self.ecg_sensor.name)
             if ecg_data:
                 vital_signs.update({
                     "heart_rate": ecg_data.get("heart_rate"),
                     "rhythm": ecg_data.get("rhythm")
                 })
+                sources["heart_rate"] = sources["rhythm"] = self.ecg_sensor
             
             # SpO2
-            spo2_data = self.spo2_sensor.read()
+            spo2_data = readings.get(self.spo2_sensor.name)
             if spo2_data:
                 vital_signs["spo2"] = spo2_data.get("spo2")
-                # Use SpO2 heart rate if ECG not available
-                if "heart_rate" not in vital_signs:
-                    vital_signs["heart_rate"] = spo2_data.get("heart_rate")
+                sources["spo2"] = self.spo2_sensor
+                # Use SpO2 heart rate if ECG not available (None until enough beats)
+                if vital_signs.get("heart_rate") is None and spo2_data.get("heart_rate") is not None:
+                    vital_signs["heart_rate"] = spo2_data["heart_rate"]
+                    sources["heart_rate"] = self.spo2_sensor
             
             # Temperature
-            temp_data = self.temp_sensor.read()
+            temp_data = readings.get(self.temp_sensor.name)
             if temp_data:
                 vital_signs["body_temperature"] = temp_data.get("body_temperature")
                 vital_signs["ambient_temperature"] = temp_data.get("ambient_temperature")
+                sources["body_temperature"] = self.temp_sensor
+            
+            vital_signs["reading_sources"] = self._describe_sources(sources)
             
         except Exception as e:
             log.error(f"Error collecting vital signs: {e}")
         
+        if stale_sensors:
+            vital_signs["stale"] = True
+            vital_signs["stale_sensors"] = stale_sensors
+        
+        # Evaluated once here; scorer, alerts and reports reuse these flags
+        vital_signs[FLAGS_KEY] = vital_rules.evaluate(vital_signs).to_list()
+        
         return vital_signs
     
+    @staticmethod
+    def _describe_sources(sources: Dict[str, BaseSensor]) -> Dict[str, Dict[str, Any]]:
+        """
+        Sensor and reading time behind each vital
+        
+        Lets the trend scorer skip vitals from stale sensors and count each
+        reading once, however often it is collected.
+        
+        Returns:
+            Vital -> {"sensor": name, "timestamp": unix seconds or None}
+        """
+        described = {}
+        for vital, sensor in sources.items():
+            taken = sensor.last_reading_time
+            described[vital] = {
+                "sensor": sensor.name,
+                "timestamp": taken.timestamp() if taken is not None else None
+            }
+        return described
+    
+    def _read_sampled(
+        self,
+        sensors: List[BaseSensor]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], List[str]]:
+        """
+        Read the latest buffered values written by the background sampler
+        
+        A sensor is stale when its newest value is older than one sampling
+        period plus its read deadline. Disabled or never-sampled sensors are
+        absent, not stale.
+        
+        Args:
+            sensors: Sensors to read
+            
+        Returns:
+            Tuple of (readings by sensor name, names of stale sensors)
+        """
+        readings = {}
+        stale_sensors = []
+        for sensor in sensors:
+            readings[sensor.name] = sensor.last_reading
+            age = sensor.get_reading_age()
+            if sensor.enabled and age is not None and age > sensor.sample_interval + sensor.read_timeout:
+                stale_sensors.append(sensor.name)
+        return readings, stale_sensors
+    
+    def _read_sensors_concurrently(
+        self,
+        sensors: List[BaseSensor]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], List[str]]:
+        """
+        Read sensors in parallel, each bounded by its own deadline
+        
+        A sensor that misses its deadline contributes its last known reading
+        (or nothing) and is reported as stale. Its read keeps running in the
+        background and is reused by the next call instead of starting a
+        second hardware read.
+        
+        Args:
+            sensors: Sensors to read
+            
+        Returns:
+            Tuple of (readings by sensor name, names of stale sensors)
+        """
+        start = time.monotonic()
+        futures = {}
+        
+        with self._pending_lock:
+            for sensor in sensors:
+                future = self._pending_reads.get(sensor.name)
+                if future is None or future.done():
+                    future = self._read_executor.submit(sensor.read)
+                    self._pending_reads[sensor.name] = future
+                futures[sensor.name] = (sensor, future)
+        
+        readings = {}
+        stale_sensors = []
+        for name, (sensor, future) in futures.items():
+            remaining = sensor.read_timeout - (time.monotonic() - start)
+            try:
+                readings[name] = future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                log.warning(f"{name} sensor missed its {sensor.read_timeout:.1f}s deadline - using last reading")
+                last = sensor.get_last_reading()
+                readings[name] = last["value"] if last else None
+                stale_sensors.append(name)
+            except Exception as e:
+                log.error(f"Failed to read {name} sensor: {e}")
+                readings[name] = None
+        
+        return readings, stale_sensors
+    
+    def get_location(self) -> Optional[Dict[str, Any]]:
+        """Get current GPS location, from the sampler buffer when running"""
+        if self.shared_sensors or self.sampler.is_running:
+            location = self.gps_module.last_reading
+            # Copy so callers can annotate it without touching the buffer
+            return dict(location) if location else None
+        return self.gps_module.read()
+    
+    def _attach_replay(self, path: str):
+        """Replay a recorded session behind every sensor's read()"""
+        try:
+            from sensors.advanced_sensors import advanced_sensors
+            
+            self.session_player = SessionPlayer.open(
+                path, speed=config.SESSION_REPLAY_SPEED, loop=config.SESSION_REPLAY_LOOP
+            )
+            for sensor in (self.ecg_sensor, self.spo2_sensor, self.temp_sensor, self.gps_module, advanced_sensors):
+                self.session_player.attach(sensor)
+            log.info(f"Replaying sensor session {path}: {self.session_player.reader.summary()['streams']}")
+        except Exception as e:
+            log.error(f"Failed to open sensor session {path}: {e}")
+            self.session_player = None
+    
+    def start_sampling(self):
+        """Start background sensor sampling (and session recording if configured)"""
+        if self.shared_sensors:
+            self.gps_module.start_following()
+            return
+        if config.SESSION_RECORD_PATH and self.session_player is None:
+            session_recorder.start(config.SESSION_RECORD_PATH)
+        if self.session_player is not None:
+            self.session_player.restart()
+        self.sampler.start()
+    
+    def stop_sampling(self):
+        """Stop background sensor sampling"""
+        if self.shared_sensors:
+            self.gps_module.stop_following()
+            self._read_executor.shutdown(wait=False)
+            return
+        self.sampler.stop()
+        session_recorder.stop()
+        self.ecg_sensor.stop_acquisition()
+        self.gps_module.stop_reader()
+        self._read_executor.shutdown(wait=False)
+    
     def calibrate_all_sensors(self) -> Dict[str, bool]:
         """Calibrate all sensors"""
+        if self.shared_sensors:
+            return request_calibration()
+        
         log.info("Calibrating all sensors...")
         
         results = {
@@ -152,26 +437,39 @@ class DataFusionEngine:
     
     def get_sensor_status(self) -> Dict[str, Any]:
         """Get status of all sensors"""
+        if not self.shared_sensors:
+            return describe_sensors(self.ecg_sensor, self.spo2_sensor, self.temp_sensor, self.gps_module)
+        
+        owner = self._fresh_owner_status()
+        if owner is not None:
+            return owner["sensors"]
+        # No owner running: nothing is being published
         return {
-            "ecg": {
-                "enabled": self.ecg_sensor.enabled,
-                "ready": self.ecg_sensor.is_ready(),
-                "simulated": getattr(self.ecg_sensor, 'is_simulated', False)
-            },
-            "spo2": {
-                "enabled": self.spo2_sensor.enabled,
-                "ready": self.spo2_sensor.is_ready(),
-                "simulated": getattr(self.spo2_sensor, 'is_simulated', False)
-            },
-            "temperature": {
-                "enabled": self.temp_sensor.enabled,
-                "ready": self.temp_sensor.is_ready(),
-                "simulated": getattr(self.temp_sensor, 'is_simulated', False)
-            },
-            "gps": {
-                "enabled": self.gps_module.enabled,
-                "ready": self.gps_module.is_ready(),
-                "has_fix": self.gps_module.has_fix(),
-                "simulated": getattr(self.gps_module, 'is_simulated', False)
-            }
+            key: {"enabled": sensor.enabled, "ready": False, "simulated": False}
+            for key, sensor in (("ecg", self.ecg_sensor), ("spo2", self.spo2_sensor),
+                                ("temperature", self.temp_sensor), ("gps", self.gps_module))
+        }
+    
+    def get_owner_status(self) -> Dict[str, Any]:
+        """Which process owns the sensor hardware, and how fresh its data is"""
+        if not self.shared_sensors:
+            return {"mode": "local", "sampling": self.sampler.is_running}
+        
+        owner = self._fresh_owner_status()
+        updated = shared_state.updated_at(OWNER_NAMESPACE, "status")
+        return {
+            "mode": "shared",
+            "pid": owner["pid"] if owner else None,
+            "running": owner is not None,
+            "status_age_seconds": round(time.time() - updated, 1) if updated else None,
+            "sampler": owner["sampler"] if owner else None,
+            "reading_ages": {sensor.name: sensor.get_reading_age() for sensor in
+                             (self.ecg_sensor, self.spo2_sensor, self.temp_sensor, self.gps_module)}
         }
+    
+    def _fresh_owner_status(self) -> Optional[Dict[str, Any]]:
+        """The sensor owner's last published status, None if it stopped publishing"""
+        updated = shared_state.updated_at(OWNER_NAMESPACE, "status")
+        if updated is None or time.time() - updated > 3 * config.SENSOR_OWNER_STATUS_INTERVAL:
+            return None
+        return shared_state.get(OWNER_NAMESPACE, "status")
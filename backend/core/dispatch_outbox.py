@@ -0,0 +1,192 @@
+"""
+Dispatch Outbox
+Durable SQLite (WAL) queue of EMS messages waiting to be delivered, so a
+report survives lost connectivity and restarts until the EMS accepts it
+"""
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import random
+import sqlite3
+import threading
+import time
+from utils import log, config
+from utils.json_helpers import dumps_bytes
+
+
+class OutboxMessage:
+    """One queued message as claimed by the sender"""
+
+    __slots__ = ("id", "kind", "report_id", "payload", "attempts", "created")
+
+    def __init__(self, id: int, kind: str, report_id: str, payload: bytes, attempts: int, created: float):
+        self.id = id
+        self.kind = kind
+        self.report_id = report_id
+        self.payload = payload
+        self.attempts = attempts
+        self.created = created
+
+
+class DispatchOutbox:
+    """
+    Persistent queue of pending EMS messages
+
+    Rows stay 'pending' until delivered (then deleted) or rejected by the
+    EMS (then kept as 'failed' for inspection). Nothing is marked in-flight
+    on disk, so a crash mid-send only means the message is sent again; the
+    outbox id travels as an idempotency key for the EMS to drop duplicates.
+    """
+
+    def __init__(self, path: str = None, retry_base: float = None, retry_max: float = None):
+        """
+        Open (or create) the outbox
+
+        Args:
+            path: SQLite file
+            retry_base: First retry delay in seconds, doubled per attempt
+            retry_max: Longest retry delay in seconds
+        """
+        self.path = Path(path or config.DISPATCH_OUTBOX_PATH)
+        self.retry_base = retry_base or config.DISPATCH_RETRY_BASE
+        self.retry_max = retry_max or config.DISPATCH_RETRY_MAX
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._last_sent: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        # WAL + NORMAL: a commit is an append to the log without an fsync, and
+        # still survives the process dying (only power loss can drop the tail)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "kind TEXT NOT NULL, "
+            "report_id TEXT, "
+            "payload BLOB NOT NULL, "
+            "created REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt REAL NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', "
+            "last_error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt)")
+
+        pending = self.depth()
+        log.info(f"Dispatch outbox at {self.path} ({pending} pending)")
+
+    def enqueue(self, kind: str, message: Dict[str, Any], report_id: str = None) -> int:
+        """
+        Queue a message for delivery
+
+        Args:
+            kind: "report" or "location"
+            message: JSON-serializable body (numpy types allowed)
+            report_id: Report the message belongs to
+
+        Returns:
+            Outbox id
+        """
+        now = time.time()
+        payload = dumps_bytes(message)
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (kind, report_id, payload, created, next_attempt) VALUES (?, ?, ?, ?, ?)",
+                (kind, report_id, payload, now, now)
+            )
+            return cursor.lastrowid
+
+    def due(self, limit: int) -> List[OutboxMessage]:
+        """Get up to `limit` of the oldest pending messages whose retry time has come"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, kind, report_id, payload, attempts, created FROM outbox "
+                "WHERE status = 'pending' AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [OutboxMessage(*row) for row in rows]
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending message is due (None when empty)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter after `attempts` failures"""
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def complete(self, delivered: List[int], retry: Dict[int, str], rejected: Dict[int, str]):
+        """
+        Record the outcome of one sending pass in a single transaction
+
+        Args:
+            delivered: Ids the EMS accepted (removed)
+            retry: id -> error for transient failures (rescheduled with backoff)
+            rejected: id -> error for messages the EMS refused (kept as failed)
+        """
+        now = time.time()
+        with self._lock:
+            attempts = {}
+            if retry:
+                marks = ",".join("?" * len(retry))
+                attempts = dict(self._db.execute(
+                    f"SELECT id, attempts FROM outbox WHERE id IN ({marks})", list(retry)
+                ).fetchall())
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in delivered])
+                self._db.executemany(
+                    "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                    [
+                        (attempts.get(i, 0) + 1, now + self.retry_delay(attempts.get(i, 0) + 1), error, i)
+                        for i, error in retry.items()
+                    ]
+                )
+                self._db.executemany(
+                    "UPDATE outbox SET attempts = attempts + 1, status = 'failed', last_error = ? WHERE id = ?",
+                    [(error, i) for i, error in rejected.items()]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+            self._sent += len(delivered)
+            if delivered:
+                self._last_sent = now
+            errors = list(retry.values()) + list(rejected.values())
+            if errors:
+                self._last_error = errors[-1]
+
+    def depth(self) -> int:
+        """Number of messages waiting to be delivered"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get queue depth, lag and delivery counters"""
+        now = time.time()
+        with self._lock:
+            pending, oldest, retrying = self._db.execute(
+                "SELECT COUNT(*), MIN(created), SUM(attempts > 0) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+            failed = self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'failed'").fetchone()[0]
+            return {
+                "depth": pending,
+                "lag_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+                "retrying": retrying or 0,
+                "failed": failed,
+                "sent": self._sent,
+                "last_sent_seconds_ago": round(now - self._last_sent, 1) if self._last_sent else None,
+                "last_error": self._last_error
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
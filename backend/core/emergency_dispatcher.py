@@ -1,39 +1,75 @@
 """
 Emergency Dispatcher
-Sends reports to EMS services
+Sends reports to EMS services through a durable outbox
 """
-from typing import Dict, Any, Optional
-import requests
+from typing import Dict, Any, Optional, Tuple
+import asyncio
 from utils import log, config
+from utils.offload import offload
+from core.dispatch_outbox import DispatchOutbox, OutboxMessage
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+    log.warning("aiohttp not available - queued EMS reports will not be sent")
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False  # Every worker sends; the EMS drops duplicates by idempotency key
+
+# HTTP statuses worth retrying; any other 4xx means the EMS refused the message
+RETRY_STATUSES = {408, 425, 429}
+SENDER_LOCK_RETRY = 5.0  # seconds between attempts to take over sending
 
 
 class EmergencyDispatcher:
     """Send emergency reports to EMS"""
-    
-    def __init__(self, api_endpoint: str = None, api_key: str = None):
+
+    def __init__(self, api_endpoint: str = None, api_key: str = None, outbox: DispatchOutbox = None):
         """
         Initialize dispatcher
-        
+
         Args:
             api_endpoint: EMS API endpoint
             api_key: API authentication key
+            outbox: Queue to use (default: opened from config)
         """
         self.api_endpoint = api_endpoint or config.EMS_API_ENDPOINT
         self.api_key = api_key or config.EMS_API_KEY
         self.enabled = bool(self.api_endpoint and self.api_key)
-        
+        self.outbox: Optional[DispatchOutbox] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock_file = None
+        self.is_sender = False
+
         if not self.enabled:
             log.warning("EMS dispatcher not configured - reports will be saved locally only")
-        else:
+            return
+
+        try:
+            self.outbox = outbox or DispatchOutbox()
             log.info(f"EMS dispatcher initialized (endpoint: {self.api_endpoint})")
-    
+        except Exception as e:
+            log.error(f"Failed to open dispatch outbox: {e}")
+
     def dispatch_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Send report to EMS
-        
+        Queue report for delivery to EMS
+
+        Only a local database insert; the background sender delivers it and
+        retries until accepted. The insert may wait on other workers' writes
+        (SQLite busy timeout), so async callers run it through offload.
+
         Args:
             report: Emergency report from ReportGenerator
-            
+
         Returns:
             Dispatch result with status
         """
@@ -44,99 +80,199 @@ class EmergencyDispatcher:
                 "reason": "EMS API not configured",
                 "local_only": True
             }
-        
-        try:
-            log.info(f"Dispatching report {report.get('report_id')} to EMS...")
-            
-            # Prepare request
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-                "User-Agent": f"SmartRescuer/{config.APP_VERSION}"
-            }
-            
-            # Send report
-            response = requests.post(
-                self.api_endpoint,
-                json=report,
-                headers=headers,
-                timeout=10
-            )
-            
-            # Check response
-            if response.status_code == 200 or response.status_code == 201:
-                result = response.json()
-                log.info(f"Report dispatched successfully: {result}")
-                return {
-                    "status": "sent",
-                    "ems_response": result,
-                    "status_code": response.status_code
-                }
-            else:
-                log.error(f"EMS dispatch failed: {response.status_code} - {response.text}")
-                return {
-                    "status": "failed",
-                    "error": f"HTTP {response.status_code}",
-                    "details": response.text
-                }
-                
-        except requests.ConnectionError:
-            log.error("EMS dispatch failed: Connection error (no internet?)")
+        if self.outbox is None:
             return {
                 "status": "failed",
-                "error": "connection_error",
+                "error": "outbox_unavailable",
                 "local_only": True
             }
-        except requests.Timeout:
-            log.error("EMS dispatch failed: Request timeout")
+
+        try:
+            outbox_id = self.outbox.enqueue("report", report, report.get("report_id"))
+            self._notify()
+            log.info(f"Report {report.get('report_id')} queued for EMS (outbox #{outbox_id})")
             return {
-                "status": "failed",
-                "error": "timeout"
+                "status": "queued",
+                "outbox_id": outbox_id
             }
         except Exception as e:
             log.error(f"EMS dispatch failed: {e}")
             return {
                 "status": "failed",
-                "error": str(e)
+                "error": str(e),
+                "local_only": True
             }
-    
+
     def send_location_update(self, location: Dict[str, Any], report_id: str) -> bool:
         """
-        Send location update for ongoing emergency
-        
+        Queue location update for ongoing emergency
+
         Args:
             location: GPS location data
             report_id: Original report ID
-            
+
         Returns:
-            True if successful
+            True if queued
         """
-        if not self.enabled:
+        if not self.enabled or self.outbox is None:
             return False
-        
+
         try:
-            update_endpoint = f"{self.api_endpoint}/location"
-            
             payload = {
                 "report_id": report_id,
                 "location": location,
                 "timestamp": location.get("timestamp")
             }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
-            response = requests.post(
-                update_endpoint,
-                json=payload,
-                headers=headers,
-                timeout=5
-            )
-            
-            return response.status_code in [200, 201]
-            
+            self.outbox.enqueue("location", payload, report_id)
+            self._notify()
+            return True
+
         except Exception as e:
             log.error(f"Location update failed: {e}")
             return False
+
+    def _notify(self):
+        """Wake the sender (callable from any thread)"""
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background sender on the running event loop"""
+        if self.is_running or self.outbox is None:
+            return
+        if not HAS_AIOHTTP:
+            log.warning("EMS sender not started (aiohttp missing) - reports stay queued")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._lead())
+
+    async def stop(self):
+        """Stop the sender; undelivered messages stay in the outbox"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_sender = False
+        log.info("EMS sender stopped")
+    
+    def _take_sender_lock(self) -> bool:
+        """Become the one process sending for this outbox (others keep enqueueing)"""
+        if not HAS_FCNTL:
+            return True
+        try:
+            if self._lock_file is None:
+                self._lock_file = open(f"{self.outbox.path}.sender.lock", "a")
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+        except OSError as e:
+            log.error(f"Sender lock unavailable, sending from this worker too: {e}")
+            return True
+    
+    async def _lead(self):
+        """Send from this worker once it holds the sender lock; the lock frees when its holder exits"""
+        while not self._take_sender_lock():
+            await asyncio.sleep(SENDER_LOCK_RETRY)
+        self.is_sender = True
+        log.info(f"EMS sender started ({self.outbox.depth()} queued)")
+        await self._run()
+
+    async def _run(self):
+        """Drain the outbox in batches over one keep-alive connection pool"""
+        connector = aiohttp.TCPConnector(limit=config.DISPATCH_CONCURRENCY, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=config.DISPATCH_TIMEOUT)
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+            "User-Agent": f"SmartRescuer/{config.APP_VERSION}"
+        }
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            while True:
+                try:
+                    # Outbox queries share the WAL database with every worker
+                    batch = await offload.run("io", self.outbox.due, config.DISPATCH_BATCH_SIZE)
+                    if batch:
+                        results = await asyncio.gather(*(self._send(session, message) for message in batch))
+                        delivered, retry, rejected = [], {}, {}
+                        for message, (outcome, error) in zip(batch, results):
+                            if outcome == "delivered":
+                                delivered.append(message.id)
+                            elif outcome == "rejected":
+                                rejected[message.id] = error
+                            else:
+                                retry[message.id] = error
+                        await offload.run("io", self.outbox.complete, delivered, retry, rejected)
+                        if delivered:
+                            log.info(f"Delivered {len(delivered)} EMS message(s)")
+                        if retry:
+                            log.warning(f"{len(retry)} EMS message(s) will be retried ({list(retry.values())[-1]})")
+                        if len(batch) == config.DISPATCH_BATCH_SIZE and delivered:
+                            continue  # More may be waiting
+
+                    self._wake.clear()
+                    # Polls too: other worker processes enqueue without waking us
+                    wait = await offload.run("io", self.outbox.next_due_in)
+                    poll = config.DISPATCH_POLL_INTERVAL
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=min(wait if wait is not None else poll, poll))
+                    except asyncio.TimeoutError:
+                        pass
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.error(f"EMS sender error: {e}")
+                    await asyncio.sleep(1.0)
+
+    async def _send(self, session: "aiohttp.ClientSession", message: OutboxMessage) -> Tuple[str, Optional[str]]:
+        """
+        POST one message
+
+        Returns:
+            ("delivered" | "retry" | "rejected", error)
+        """
+        url = self.api_endpoint if message.kind == "report" else f"{self.api_endpoint}/{message.kind}"
+        # Resends after a crash carry the same key, so the EMS can drop duplicates
+        headers = {"Idempotency-Key": f"{config.UNIT_ID}-{message.id}"}
+        try:
+            async with session.post(url, data=message.payload, headers=headers) as response:
+                # Read the body even when unused; an unread response closes the pooled connection
+                body = await response.read()
+                if response.status in (200, 201, 202):
+                    return "delivered", None
+                error = f"HTTP {response.status}: {body[:200].decode('utf-8', 'replace')}"
+                if response.status >= 500 or response.status in RETRY_STATUSES:
+                    return "retry", error
+                log.error(f"EMS rejected {message.kind} for {message.report_id}: {error}")
+                return "rejected", error
+        except asyncio.TimeoutError:
+            return "retry", "timeout"
+        except aiohttp.ClientError as e:
+            return "retry", f"connection_error: {e}"
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get sender state and outbox depth/lag"""
+        status = {"enabled": self.enabled, "sender_running": self.is_running and self.is_sender}
+        if self.outbox is not None:
+            try:
+                status.update(self.outbox.get_status())
+            except Exception as e:
+                log.error(f"Failed to read outbox status: {e}")
+        return status
@@ -3,6 +3,7 @@ First Aid Instructions Generator
 مولد إرشادات الإسعافات الأولية
 """
 from typing import List, Dict, Any
+from utils.vital_rules import flags_for_readings
 
 
 class FirstAidInstructions:
@@ -163,18 +164,19 @@ class FirstAidInstructions:
         
         # من العلامات الحيوية (Sensors)
         if vital_signs:
+            flags = flags_for_readings(vital_signs)
+            
             # نقص أكسجين
-            if vital_signs.get('spo2', {}).get('status') == 'critical':
+            if 'spo2_critical' in flags:
                 instructions.append(cls.INSTRUCTIONS_DB['low_oxygen'])
             
             # نبض غير طبيعي جداً - قد يشير لنوبة قلبية
-            pulse = vital_signs.get('pulse', {}).get('value', 0)
-            if pulse > 140 or pulse < 40:
+            if flags.any('hr_extreme_low', 'hr_extreme_high'):
                 instructions.append(cls.INSTRUCTIONS_DB['heart_attack'])
             
             # علامات الصدمة
             bp_status = vital_signs.get('blood_pressure', {}).get('status')
-            if bp_status == 'high' and pulse > 100:
+            if bp_status == 'high' and 'hr_high' in flags:
                 instructions.append(cls.INSTRUCTIONS_DB['shock'])
         
         # إذا لم نجد أي إرشادات محددة، نرجع إرشادات عامة
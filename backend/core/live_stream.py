@@ -0,0 +1,238 @@
+"""
+Live Vitals Broadcaster
+One shared sampling loop fanned out to many WebSocket/SSE subscribers
+"""
+from typing import Dict, Any, Optional, List, Set, AsyncIterator
+from datetime import datetime
+import asyncio
+from utils import log, config
+from utils.offload import offload
+from utils.vital_rules import flags_for
+
+
+# Live alert raised per vital rule: (rule, vital, alert type, message)
+INSTANT_ALERT_RULES = [
+    ("hr_critical_high", "heart_rate", "warning", "High heart rate detected"),
+    ("hr_critical_low", "heart_rate", "critical", "Low heart rate detected"),
+    ("spo2_critical", "spo2", "critical", "Critical oxygen level"),
+    ("temp_fever", "body_temperature", "warning", "High temperature detected"),
+]
+
+
+def derive_instant_alerts(vital_signs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Build instant alerts for live monitoring
+
+    Args:
+        vital_signs: Vital signs from DataFusionEngine
+
+    Returns:
+        List of alerts with type, message and value
+    """
+    flags = flags_for(vital_signs)
+    return [
+        {"type": alert_type, "message": message, "value": vital_signs[vital]}
+        for rule, vital, alert_type, message in INSTANT_ALERT_RULES
+        if rule in flags
+    ]
+
+
+def _source_sensors(sources: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+    """Vital -> sensor name from vital_signs' reading_sources, without reading times"""
+    return {vital: source.get("sensor") for vital, source in (sources or {}).items()}
+
+
+class LiveSubscription:
+    """Per-client stream state: a wake-up flag and what the client last received"""
+
+    def __init__(self):
+        self.wakeup = asyncio.Event()
+        self.last_seq = 0
+        self.last_vitals: Optional[Dict[str, Any]] = None
+        self.last_alerts: Dict[str, Dict[str, Any]] = {}
+        self.last_severity: Optional[Dict[str, Any]] = None
+        self.last_trend: Optional[Dict[str, Any]] = None
+        self.last_location: Optional[Dict[str, Any]] = None
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+
+
+class VitalsBroadcaster:
+    """
+    Sample vitals once per tick and push delta frames to every subscriber
+
+    The producer only stores the newest state and wakes subscribers; each
+    subscriber diffs that state against what its own client last received.
+    A slow client therefore never blocks the loop or other clients - it
+    simply skips intermediate ticks and gets one coalesced delta.
+    """
+
+    def __init__(self, data_fusion, interval: float = None):
+        """
+        Initialize broadcaster
+
+        Args:
+            data_fusion: DataFusionEngine providing sensors and scorer
+            interval: Seconds between samples
+        """
+        self.data_fusion = data_fusion
+        self.interval = interval or config.LIVE_STREAM_INTERVAL
+        self._subscribers: Set[LiveSubscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._latest: Optional[Dict[str, Any]] = None
+        self._seq = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> LiveSubscription:
+        """Register a client, starting the sampling loop if needed"""
+        subscription = LiveSubscription()
+        self._subscribers.add(subscription)
+        if self._latest is not None:
+            subscription.wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            log.info("Live vitals broadcaster started")
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription):
+        """Remove a client, stopping the sampling loop when none remain"""
+        self._subscribers.discard(subscription)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            log.info("Live vitals broadcaster stopped (no subscribers)")
+
+    def get_latest(self) -> Optional[Dict[str, Any]]:
+        """Get the newest full state, if the loop is running"""
+        return self._latest if self._task is not None else None
+
+    async def sample(self) -> Dict[str, Any]:
+        """Collect vitals, location, severity, trend and alerts once"""
+        vital_signs = await offload.run("sensors", self.data_fusion._collect_vital_signs)
+        location = await offload.run("sensors", self.data_fusion.get_location)
+        severity = self.data_fusion.severity_scorer.calculate_score(
+            vital_signs=vital_signs,
+            injuries=[],
+            patient_conscious=True
+        )
+        # O(1) per sample: the trend windows carry history between ticks
+        trend = self.data_fusion.trend_scorer.update(vital_signs)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "vital_signs": vital_signs,
+            "location": location,
+            "severity": severity,
+            "trend": trend,
+            "instant_alerts": derive_instant_alerts(vital_signs)
+        }
+
+    async def _run(self):
+        """Sampling loop shared by all subscribers"""
+        while True:
+            try:
+                state = await self.sample()
+                self._seq += 1
+                state["seq"] = self._seq
+                self._latest = state
+                for subscription in self._subscribers:
+                    subscription.wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Live vitals sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def frames(self, subscription: LiveSubscription) -> AsyncIterator[Dict[str, Any]]:
+        """Yield frames for one subscriber as fast as its client consumes them"""
+        while True:
+            await subscription.wakeup.wait()
+            subscription.wakeup.clear()
+            state = self._latest
+            if state is None or state["seq"] == subscription.last_seq:
+                continue
+            yield self._encode(subscription, state)
+
+    def _encode(self, subscription: LiveSubscription, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a snapshot or delta frame and advance the subscriber's baseline"""
+        alerts = {alert["message"]: alert for alert in state["instant_alerts"]}
+
+        if subscription.last_vitals is None:
+            frame = {
+                "type": "snapshot",
+                "seq": state["seq"],
+                "timestamp": state["timestamp"],
+                "vital_signs": state["vital_signs"],
+                "location": state["location"],
+                "severity": state["severity"],
+                "trend": state["trend"],
+                "instant_alerts": state["instant_alerts"]
+            }
+        else:
+            skipped = state["seq"] - subscription.last_seq - 1
+            subscription.frames_coalesced += skipped
+            frame = {
+                "type": "delta",
+                "seq": state["seq"],
+                "timestamp": state["timestamp"],
+                "skipped": skipped
+            }
+
+            previous = subscription.last_vitals
+            changed = {
+                key: value for key, value in state["vital_signs"].items()
+                if previous.get(key) != value
+            }
+            # Reading times move every tick; resend sources only when a vital switches sensor
+            if "reading_sources" in changed and (
+                _source_sensors(changed["reading_sources"]) == _source_sensors(previous.get("reading_sources"))
+            ):
+                del changed["reading_sources"]
+            removed = [key for key in previous if key not in state["vital_signs"]]
+            if changed:
+                frame["vital_signs"] = changed
+            if removed:
+                frame["removed"] = removed
+
+            if state["severity"] != subscription.last_severity:
+                frame["severity"] = state["severity"]
+            if state["trend"] != subscription.last_trend:
+                frame["trend"] = state["trend"]
+            if state["location"] != subscription.last_location:
+                frame["location"] = state["location"]
+
+            # A persisting alert is raised once; later value changes only update it
+            last_alerts = subscription.last_alerts
+            raised = [
+                alert for key, alert in alerts.items()
+                if key not in last_alerts or last_alerts[key]["type"] != alert["type"]
+            ]
+            updated = [
+                alert for key, alert in alerts.items()
+                if key in last_alerts and last_alerts[key]["type"] == alert["type"] and last_alerts[key] != alert
+            ]
+            cleared = [key for key in last_alerts if key not in alerts]
+            if raised or updated or cleared:
+                frame["alerts"] = {"raised": raised, "updated": updated, "cleared": cleared}
+
+        subscription.last_seq = state["seq"]
+        subscription.last_vitals = state["vital_signs"]
+        subscription.last_severity = state["severity"]
+        subscription.last_trend = state["trend"]
+        subscription.last_location = state["location"]
+        subscription.last_alerts = alerts
+        subscription.frames_sent += 1
+
+        return frame
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get broadcaster statistics"""
+        return {
+            "running": self._task is not None,
+            "subscribers": len(self._subscribers),
+            "seq": self._seq,
+            "interval": self.interval,
+            "frames_coalesced": sum(s.frames_coalesced for s in self._subscribers)
+        }
@@ -5,6 +5,7 @@ Creates professional medical reports in PDF format matching the design
 from typing import Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
+import uuid
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -50,9 +51,10 @@ class PDFReportGenerator:
             Path to generated PDF file
         """
         try:
-            # Generate report ID if not provided
+            # Generate report ID if not provided; renders in the same second
+            # must not share (and overwrite) one file while it is being served
             if not report_id:
-                report_id = f"SR-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+                report_id = f"SR-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
             
             # Create PDF path
             pdf_path = self.reports_dir / f"{report_id}.pdf"
@@ -2,12 +2,13 @@
 Emergency Report Generator
 Creates structured reports for EMS
 """
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 from pathlib import Path
-import json
+import uuid
 from utils import log
-from utils.json_helpers import NumpyEncoder
+from utils.json_helpers import dumps_bytes
+from utils.vital_rules import flags_for
 
 
 
@@ -25,12 +26,13 @@ class ReportGenerator:
         self.reports_dir.mkdir(parents=True, exist_ok=True)
         log.info(f"Report generator initialized (dir: {self.reports_dir})")
     
-    def generate_ems_report(self, assessment: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_ems_report(self, assessment: Dict[str, Any], report_id: str = None) -> Dict[str, Any]:
         """
         Generate EMS-formatted report
         
         Args:
             assessment: Assessment data from DataFusionEngine
+            report_id: Report ID to use (default: generated from the time)
             
         Returns:
             EMS report dictionary
@@ -44,12 +46,13 @@ class ReportGenerator:
             
             # Build EMS report
             report = {
-                "report_id": self._generate_report_id(),
+                "report_id": report_id or self._generate_report_id(),
                 "timestamp": timestamp,
                 "priority": self._map_severity_to_priority(severity.get("severity_level")),
                 
                 # Patient Status
                 "patient": {
+                    "id": assessment.get("patient_id"),
                     "conscious": assessment.get("patient_conscious", True),
                     "vital_signs": {
                         "heart_rate": vital_signs.get("heart_rate"),
@@ -98,6 +101,27 @@ class ReportGenerator:
             log.error(f"Failed to generate EMS report: {e}")
             return {"error": str(e)}
     
+    def generate_batch_reports(self, assessments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Generate one EMS report per patient of a batch triage
+        
+        Reports share the incident's ID with a per-patient suffix, so
+        patients assessed in the same second do not overwrite each other.
+        Like every report ID, the incident ID carries a random part, so two
+        batches in the same second do not either.
+        
+        Args:
+            assessments: Assessments from DataFusionEngine.perform_batch_triage
+            
+        Returns:
+            EMS reports in the same order
+        """
+        incident_id = self._generate_report_id()
+        return [
+            self.generate_ems_report(assessment, report_id=f"{incident_id}-P{i + 1:02d}")
+            for i, assessment in enumerate(assessments)
+        ]
+    
     def generate_text_summary(self, assessment: Dict[str, Any]) -> str:
         """Generate human-readable text summary"""
         try:
@@ -150,7 +174,8 @@ class ReportGenerator:
     
     def _generate_report_id(self) -> str:
         """Generate unique report ID"""
-        return f"SR-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        # Second resolution alone collides across concurrent workers
+        return f"SR-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
     
     def _map_severity_to_priority(self, severity_level: str) -> str:
         """Map severity level to EMS priority"""
@@ -183,14 +208,13 @@ class ReportGenerator:
             recommendations.append("لا تحرك المصاب إلا إذا كان في خطر مباشر")
         
         # Vital signs-based recommendations
-        spo2 = vital_signs.get("spo2", 100)
-        if spo2 < 90:
+        flags = flags_for(vital_signs)
+        if "spo2_critical" in flags:
             recommendations.append("أعط الأكسجين إن توفر")
         
-        hr = vital_signs.get("heart_rate", 75)
-        if hr < 50:
+        if "hr_critical_low" in flags:
             recommendations.append("راقب معدل القلب البطيء")
-        elif hr > 120:
+        elif "hr_critical_high" in flags:
             recommendations.append("حاول تهدئة المريض")
         
         # Injuries-based recommendations
@@ -209,8 +233,7 @@ class ReportGenerator:
             report_id = report.get("report_id", "unknown")
             report_file = self.reports_dir / f"{report_id}.json"
             
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2, cls=NumpyEncoder)
+            report_file.write_bytes(dumps_bytes(report, indent=True))
             
             log.info(f"Report saved: {report_file}")
             return report_file
@@ -4,11 +4,17 @@ from sensors.ecg_sensor import ECGSensor
 from sensors.spo2_sensor import SpO2Sensor
 from sensors.temp_sensor import TemperatureSensor
 from sensors.gps_module import GPSModule
+from sensors.sampler import ReadingRingBuffer, SensorSampler
+from sensors.shared_ring import SharedReadingRing, SharedRingReader
 
 __all__ = [
     'BaseSensor',
     'ECGSensor',
     'SpO2Sensor',
     'TemperatureSensor',
-    'GPSModule'
+    'GPSModule',
+    'ReadingRingBuffer',
+    'SensorSampler',
+    'SharedReadingRing',
+    'SharedRingReader'
 ]
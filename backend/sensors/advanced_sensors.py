@@ -5,7 +5,27 @@ Advanced Sensor Suite - All 9 Sensors
 from typing import Dict, Any, Optional
 from datetime import datetime
 import random
-from utils import log
+from utils import log, config
+from utils.vital_rules import vital_rules, readings_to_vitals, flags_for_readings, FLAGS_KEY
+from sensors.session_recorder import session_recorder
+from sensors.refresh_scheduler import RefreshScheduler, SensorSchedule
+
+
+# Refresh cadence and typical read cost (seconds) per sensor. Slow-changing
+# or slow-to-read sensors (cuff inflation, gas heater, NDIR CO2, GPS) refresh
+# rarely; fast vitals and motion refresh often.
+SENSOR_SCHEDULE = {
+    'temperature': SensorSchedule('_read_temperature', 2.0, 0.05),
+    'spo2': SensorSchedule('_read_spo2', 1.0, 0.1),
+    'pulse': SensorSchedule('_read_pulse', 1.0, 0.05),
+    'motion': SensorSchedule('_read_motion', 0.2, 0.005),
+    'ecg': SensorSchedule('_read_ecg', 1.0, 0.1),
+    'gsr': SensorSchedule('_read_gsr', 1.0, 0.02),
+    'blood_pressure': SensorSchedule('_read_blood_pressure', 60.0, 30.0),
+    'gas': SensorSchedule('_read_gas', 10.0, 0.5),
+    'co2': SensorSchedule('_read_co2', 15.0, 1.0),
+    'gps': SensorSchedule('_read_gps', 5.0, 0.5),
+}
 
 
 class AdvancedSensorSuite:
@@ -15,26 +35,102 @@ class AdvancedSensorSuite:
         """Initialize all 9 sensors"""
         self.sensors_enabled = True
         self.simulation_mode = True  # سيتم تبديله عند توصيل الجهاز
+        self.name = "advanced"
+        self.enabled = True
+        self.replay = None  # ReplayCursor standing in for the hardware
+        self.shared = None  # SharedRingReader of the sensor owner's snapshots (API workers)
+        self.scheduler = RefreshScheduler(
+            {key: (getattr(self, schedule.reader), schedule) for key, schedule in SENSOR_SCHEDULE.items()},
+            workers=config.ADVANCED_SENSOR_WORKERS,
+            name="advanced-sensors"
+        )
         
         log.info("Advanced Sensor Suite initialized with 9 sensors")
     
     def read_all_sensors(self) -> Dict[str, Any]:
         """قراءة جميع الحساسات دفعة واحدة"""
-        readings = {}
+        if self.shared is not None:
+            return self._read_shared()
+        
+        recorded = self.replay.next() if self.replay is not None else None
+        if recorded is not None:
+            return self._finish_readings(recorded, simulation_mode=False)
         
-        readings['temperature'] = self._read_temperature()
-        readings['spo2'] = self._read_spo2()
-        readings['pulse'] = self._read_pulse()
-        readings['motion'] = self._read_motion()
-        readings['ecg'] = self._read_ecg()
-        readings['gsr'] = self._read_gsr()
-        readings['blood_pressure'] = self._read_blood_pressure()
-        readings['gas'] = self._read_gas()
-        readings['co2'] = self._read_co2()
-        readings['gps'] = self._read_gps()
+        if not config.ENABLE_ADVANCED_SCHEDULER:
+            readings = {key: getattr(self, schedule.reader)() for key, schedule in SENSOR_SCHEDULE.items()}
+            if session_recorder.active:
+                session_recorder.record(self.name, readings)
+            return self._finish_readings(readings, self.simulation_mode)
+        
+        readings = self._cached_readings()
+        if session_recorder.active:
+            session_recorder.record(self.name, {key: value for key, (value, _) in readings.items()})
+        
+        # Copies, so annotating with the age never touches the cache
+        snapshot = {}
+        stale = []
+        for key, (value, age) in readings.items():
+            snapshot[key] = dict(value, age_seconds=round(age, 3) if age is not None else None)
+            if age is not None and self.scheduler.is_stale(key, age):
+                stale.append(key)
+        if stale:
+            snapshot['stale_sensors'] = stale
+        return self._finish_readings(snapshot, self.simulation_mode)
+    
+    def _cached_readings(self) -> Dict[str, Any]:
+        """
+        Snapshot of every sensor's latest scheduled read
+        
+        The first call starts the scheduler and waits for its initial round;
+        any sensor still missing after SENSOR_READ_TIMEOUT is read inline
+        unless its first read is still running.
+        
+        Returns:
+            key -> (reading, age in seconds or None while pending)
+        """
+        if not self.scheduler.is_running:
+            self.scheduler.start()
+        missing = self.scheduler.wait_filled(config.SENSOR_READ_TIMEOUT)
+        for key in missing:
+            if self.scheduler.read_now(key) is None:
+                log.debug(f"Advanced sensor {key}: no first reading yet")
+        
+        snapshot = self.scheduler.snapshot()
+        # A first read still running (e.g. the cuff inflating) reports as pending
+        return {
+            key: snapshot.get(key, ({'value': None, 'unit': None, 'status': 'unknown', 'pending': True}, None))
+            for key in SENSOR_SCHEDULE
+        }
+    
+    def _read_shared(self) -> Dict[str, Any]:
+        """Newest snapshot published by the sensor owner process"""
+        latest = self.shared.latest()
+        if latest is None:
+            pending = {key: {'value': None, 'unit': None, 'status': 'unknown', 'pending': True} for key in SENSOR_SCHEDULE}
+            return self._finish_readings(pending, self.simulation_mode)
+        
+        published, snapshot = latest
+        snapshot = dict(snapshot)  # The reader keeps the decoded value for reuse
+        age = (datetime.now() - published).total_seconds()
+        if age > config.SHARED_ADVANCED_INTERVAL + config.SENSOR_READ_TIMEOUT:
+            snapshot['stale_sensors'] = list(SENSOR_SCHEDULE)
+        return snapshot
+    
+    def stop(self):
+        """Stop the refresh scheduler"""
+        self.scheduler.stop()
+    
+    def get_schedule_status(self) -> Dict[str, Any]:
+        """Get per-sensor refresh interval, cost, reads and age"""
+        return self.scheduler.get_status()
+    
+    def _finish_readings(self, readings: Dict[str, Any], simulation_mode: bool) -> Dict[str, Any]:
+        """Attach flags and metadata to a set of live or replayed readings"""
+        # Evaluated once here; health summary, analyzer and first aid reuse these flags
+        readings[FLAGS_KEY] = vital_rules.evaluate(readings_to_vitals(readings)).to_list()
         
         readings['timestamp'] = datetime.now().isoformat()
-        readings['simulation_mode'] = self.simulation_mode
+        readings['simulation_mode'] = simulation_mode
         
         return readings
     
@@ -42,7 +138,7 @@ class AdvancedSensorSuite:
         """قراءة درجة الحرارة"""
         if self.simulation_mode:
             value = round(random.uniform(36.0, 38.5), 1)
-            status = 'normal' if 36.1 <= value <= 37.5 else ('high' if value > 37.5 else 'low')
+            status = vital_rules.status('body_temperature', value)
         else:
             value = 0
             status = 'unknown'
@@ -58,7 +154,7 @@ class AdvancedSensorSuite:
         """قراءة تشبع الأكسجين"""
         if self.simulation_mode:
             value = round(random.uniform(92.0, 100.0), 1)
-            status = 'normal' if value >= 95 else ('low' if value >= 90 else 'critical')
+            status = vital_rules.status('spo2', value)
         else:
             value = 0
             status = 'unknown'
@@ -74,7 +170,7 @@ class AdvancedSensorSuite:
         """قراءة معدل النبض"""
         if self.simulation_mode:
             value = random.randint(55, 110)
-            status = 'normal' if 60 <= value <= 100 else ('high' if value > 100 else 'low')
+            status = vital_rules.status('heart_rate', value)
         else:
             value = 0
             status = 'unknown'
@@ -221,30 +317,20 @@ class AdvancedSensorSuite:
         
         warnings = []
         critical = []
+        flags = flags_for_readings(readings)
         
-        # Temperature
-        if readings['temperature']['status'] != 'normal':
-            msg = f"حرارة {readings['temperature']['value']}°C"
-            if readings['temperature']['value'] > 39:
-                critical.append(msg)
-            else:
-                warnings.append(msg)
-        
-        # SpO2
-        if readings['spo2']['status'] != 'normal':
-            msg = f"أكسجين {readings['spo2']['value']}%"
-            if readings['spo2']['status'] == 'critical':
-                critical.append(msg)
-            else:
-                warnings.append(msg)
-        
-        # Pulse
-        if readings['pulse']['status'] != 'normal':
-            msg = f"نبض {readings['pulse']['value']} bpm"
-            if readings['pulse']['value'] > 120 or readings['pulse']['value'] < 50:
-                critical.append(msg)
-            else:
-                warnings.append(msg)
+        # Temperature, SpO2, Pulse
+        for vital, field, template in (
+            ('body_temperature', 'temperature', "حرارة {}°C"),
+            ('spo2', 'spo2', "أكسجين {}%"),
+            ('heart_rate', 'pulse', "نبض {} bpm")
+        ):
+            if flags.level(vital) != 'normal':
+                msg = template.format(readings[field]['value'])
+                if flags.is_critical(vital):
+                    critical.append(msg)
+                else:
+                    warnings.append(msg)
         
         # Blood Pressure
         if readings['blood_pressure']['status'] == 'high':
@@ -281,7 +367,7 @@ class AdvancedSensorSuite:
             'critical_alerts': critical,
             'warnings': warnings,
             'total_issues': len(critical) + len(warnings),
-            'gps_location': readings['gps']['maps_link']
+            'gps_location': readings['gps'].get('maps_link')
         }
 
 
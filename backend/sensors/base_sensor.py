@@ -2,9 +2,11 @@
 Base sensor class for all medical sensors
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from datetime import datetime
-from utils import log
+from sensors.sampler import ReadingRingBuffer
+from sensors.session_recorder import session_recorder
+from utils import log, config
 
 
 class BaseSensor(ABC):
@@ -13,8 +15,10 @@ class BaseSensor(ABC):
     def __init__(self, name: str, enabled: bool = True):
         self.name = name
         self.enabled = enabled
-        self.last_reading = None
-        self.last_reading_time = None
+        self.buffer = ReadingRingBuffer(config.SENSOR_BUFFER_SIZE)
+        self.read_timeout = config.SENSOR_READ_TIMEOUT  # Deadline for one read() in seconds
+        self.sample_interval = config.SENSOR_SAMPLE_INTERVAL  # Background polling period in seconds
+        self.replay = None  # ReplayCursor standing in for the hardware (see session_recorder)
         log.info(f"Initialized {name} sensor (enabled={enabled})")
     
     @abstractmethod
@@ -31,15 +35,50 @@ class BaseSensor(ABC):
         """Check if sensor is ready to read"""
         return self.enabled
     
+    @property
+    def last_reading(self) -> Optional[Dict[str, Any]]:
+        """Newest value in the reading buffer"""
+        latest = self.buffer.latest()
+        return latest[1] if latest else None
+    
+    @property
+    def last_reading_time(self) -> Optional[datetime]:
+        """Timestamp of the newest value in the reading buffer"""
+        latest = self.buffer.latest()
+        return latest[0] if latest else None
+    
+    def get_reading_age(self) -> Optional[float]:
+        """Seconds since the last reading, or None if never read"""
+        latest = self.buffer.latest()
+        if latest is None:
+            return None
+        return (datetime.now() - latest[0]).total_seconds()
+    
+    def get_readings_window(self, size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the newest buffered readings, oldest first"""
+        return [
+            {"value": value, "timestamp": timestamp, "sensor": self.name}
+            for timestamp, value in self.buffer.window(size)
+        ]
+    
     def get_last_reading(self) -> Optional[Dict[str, Any]]:
         """Get the last reading"""
+        latest = self.buffer.latest()
         return {
-            "value": self.last_reading,
-            "timestamp": self.last_reading_time,
+            "value": latest[1],
+            "timestamp": latest[0],
             "sensor": self.name
-        } if self.last_reading is not None else None
+        } if latest is not None else None
+    
+    def _read_replay(self) -> Optional[Dict[str, Any]]:
+        """Return the recorded reading for the current replay time"""
+        reading = self.replay.next()
+        if reading is not None:
+            self._update_reading(reading)
+        return reading
     
     def _update_reading(self, value: Any):
         """Update the last reading"""
-        self.last_reading = value
-        self.last_reading_time = datetime.now()
+        self.buffer.append(value, datetime.now())
+        if self.replay is None and session_recorder.active:
+            session_recorder.record(self.name, value)
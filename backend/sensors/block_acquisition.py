@@ -0,0 +1,200 @@
+"""
+Hardware-Timed Block Acquisition
+A dedicated thread samples at a fixed rate on absolute deadlines into
+preallocated blocks; consumers read completed blocks as zero-copy views
+"""
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import threading
+import time
+import numpy as np
+from utils import log
+
+
+class BlockAcquisition:
+    """
+    Fixed-rate sampler filling a ring of preallocated int16 blocks
+
+    While the thread fills one block, completed blocks stay readable. With
+    `buffers=2` this is classic double buffering; more buffers let a consumer
+    that polls less often than once per block catch up without losing data.
+    """
+
+    def __init__(
+        self,
+        read_sample: Optional[Callable[[], int]] = None,
+        sample_rate: int = 200,
+        block_size: int = 40,
+        buffers: int = 2,
+        read_burst: Optional[Callable[[np.ndarray], int]] = None,
+        name: str = "acquisition"
+    ):
+        """
+        Initialize acquisition (not started)
+
+        Args:
+            read_sample: Returns one sample; called on each deadline
+            sample_rate: Samples per second
+            block_size: Samples per block
+            buffers: Blocks in the ring (2 = double buffering)
+            read_burst: Fills a whole block from a paced ADC FIFO and returns
+                the samples written; used instead of read_sample when given
+            name: Thread name
+        """
+        if read_sample is None and read_burst is None:
+            raise ValueError("Block acquisition needs read_sample or read_burst")
+
+        self.read_sample = read_sample
+        self.read_burst = read_burst
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.buffers = max(2, buffers)
+        self.name = name
+
+        self._blocks = np.zeros((self.buffers, block_size), dtype=np.int16)
+        # Per slot: (block seq, wall-clock start, samples lost inside the block)
+        self._meta = [(0, 0.0, 0)] * self.buffers
+        self._completed = 0
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._samples = 0
+        self._dropped = 0
+        self._max_lateness = 0.0
+        self._started_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def completed(self) -> int:
+        """Sequence number of the newest completed block (0 = none yet)"""
+        return self._completed
+
+    def start(self):
+        """Start the acquisition thread"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-acquisition", daemon=True)
+        self._thread.start()
+        log.info(f"{self.name} acquisition started: {self.sample_rate} Hz, "
+                 f"{self.block_size}-sample blocks x {self.buffers}")
+
+    def stop(self):
+        """Stop the acquisition thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self):
+        """Fill blocks on absolute deadlines until stopped"""
+        period = 1.0 / self.sample_rate
+        next_deadline = time.perf_counter()
+        self._started_at = next_deadline
+
+        try:
+            while not self._stop_event.is_set():
+                slot = self._completed % self.buffers
+                block = self._blocks[slot]
+                block_start = time.time()
+
+                if self.read_burst is not None:
+                    written = self.read_burst(block)
+                    lost = self.block_size - written
+                    self._samples += written
+                else:
+                    lost = 0
+                    for i in range(self.block_size):
+                        now = time.perf_counter()
+                        if now < next_deadline:
+                            time.sleep(next_deadline - now)
+                        else:
+                            lateness = now - next_deadline
+                            self._max_lateness = max(self._max_lateness, lateness)
+                            if lateness >= period:
+                                # Missed whole sample slots; skip them instead of bunching reads
+                                missed = int(lateness / period)
+                                lost += missed
+                                next_deadline += missed * period
+                        block[i] = self.read_sample()
+                        next_deadline += period
+                    self._samples += self.block_size
+
+                self._dropped += lost
+                with self._cond:
+                    self._meta[slot] = (self._completed + 1, block_start, lost)
+                    self._completed += 1
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = str(e)
+            log.error(f"{self.name} acquisition stopped: {e}")
+
+    def wait(self, after_seq: int, timeout: Optional[float] = None) -> bool:
+        """Wait until a block newer than after_seq completes"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._completed > after_seq or self._stop_event.is_set(),
+                timeout=timeout
+            ) and self._completed > after_seq
+
+    def is_intact(self, seq: int) -> bool:
+        """True while block `seq` has not been reused for newer samples"""
+        # The slot being filled now held block completed + 1 - buffers
+        return 0 < seq <= self._completed and seq > self._completed + 1 - self.buffers
+
+    def block(self, seq: int) -> Optional[Tuple[np.ndarray, float, int]]:
+        """
+        Get a completed block without copying
+
+        Args:
+            seq: Block sequence number (1-based)
+
+        Returns:
+            (read-only view, wall-clock start, samples lost inside it),
+            or None if the block was already overwritten
+        """
+        if not self.is_intact(seq):
+            return None
+        slot = (seq - 1) % self.buffers
+        meta_seq, started, lost = self._meta[slot]
+        if meta_seq != seq:
+            return None
+        view = self._blocks[slot].view()
+        view.flags.writeable = False
+        return view, started, lost
+
+    def blocks_since(self, after_seq: int) -> Iterator[Tuple[int, Optional[np.ndarray], int]]:
+        """
+        Iterate completed blocks newer than after_seq
+
+        Yields:
+            (seq, read-only view or None if overrun, samples lost before/inside it)
+        """
+        for seq in range(after_seq + 1, self._completed + 1):
+            entry = self.block(seq)
+            if entry is None:
+                yield seq, None, self.block_size
+            else:
+                yield seq, entry[0], entry[2]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get achieved sample rate and drop counters"""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "running": self.is_running,
+            "target_rate": self.sample_rate,
+            "achieved_rate": round(self._samples / elapsed, 1) if elapsed > 0 else 0.0,
+            "samples": self._samples,
+            "dropped": self._dropped,
+            "blocks": self._completed,
+            "block_size": self.block_size,
+            "buffers": self.buffers,
+            "max_lateness_ms": round(self._max_lateness * 1000, 2),
+            "error": self.error
+        }
@@ -6,6 +6,8 @@ from typing import Dict, Any, Optional
 import time
 import random  # For simulation on non-RPi systems
 from sensors.base_sensor import BaseSensor
+from sensors.block_acquisition import BlockAcquisition
+from sensors.qrs_detector import QRSDetector
 from utils import log, config
 
 # Try to import GPIO, use simulation if not available
@@ -36,8 +38,22 @@ class ECGSensor(BaseSensor):
         self.sample_rate = 200  # Hz
         self.is_simulated = not HAS_GPIO
         
+        # Keeps learned thresholds and RR history across reads
+        self.qrs_detector = QRSDetector(self.sample_rate)
+        
+        # Samples are acquired continuously; read() consumes completed blocks
+        self.acquisition: Optional[BlockAcquisition] = None
+        self._last_block = 0
+        
         if self.enabled and HAS_GPIO:
             self._setup_gpio()
+            self.acquisition = BlockAcquisition(
+                read_sample=lambda: GPIO.input(self.pin),  # Would need ADC like MCP3008
+                sample_rate=self.sample_rate,
+                block_size=config.ECG_BLOCK_SIZE,
+                buffers=config.ECG_ACQUISITION_BUFFERS,
+                name="ECG"
+            )
     
     def _setup_gpio(self):
         """Setup GPIO pins"""
@@ -58,19 +74,51 @@ class ECGSensor(BaseSensor):
         """
         if not self.is_ready():
             return None
+        if self.replay is not None:
+            return self._read_replay()
         
         try:
+            hrv = None
+            acquisition = None
             if self.is_simulated:
                 # Simulate ECG data
                 heart_rate = random.randint(60, 100)  # Normal range
                 rhythm = "normal" if random.random() > 0.1 else "irregular"
                 signal_quality = random.uniform(0.7, 1.0)
             else:
-                # Read from actual sensor
-                samples = self._collect_samples(duration=5)  # 5 second reading
-                heart_rate = self._calculate_heart_rate(samples)
-                rhythm = self._analyze_rhythm(samples)
-                signal_quality = self._assess_signal_quality(samples)
+                # Read from actual sensor: analyze the blocks acquired since last read
+                self._process_new_blocks()
+                metrics = self.qrs_detector.get_metrics()
+                status = self.acquisition.get_status()
+                acquisition = {
+                    "achieved_rate": status["achieved_rate"],
+                    "dropped": status["dropped"]
+                }
+                
+                heart_rate = metrics["heart_rate"]
+                if metrics["no_beat"] and self.qrs_detector.beats:
+                    # Beats stopped (asystole or lead-off): replace the last rate, don't keep it
+                    log.warning(f"ECG: no QRS for {metrics['seconds_since_beat']}s")
+                    reading = {
+                        "heart_rate": None,
+                        "rhythm": "unknown",
+                        "no_beat": True,
+                        "signal_quality": metrics["signal_quality"],
+                        "unit": "bpm",
+                        "acquisition": acquisition
+                    }
+                    self._update_reading(reading)
+                    return reading
+                if heart_rate is None:
+                    log.debug("ECG: not enough QRS complexes detected for heart rate yet")
+                    return None
+                rhythm = metrics["rhythm"]
+                signal_quality = metrics["signal_quality"]
+                hrv = {
+                    "rr_mean_ms": metrics["rr_mean_ms"],
+                    "sdnn_ms": metrics["sdnn_ms"],
+                    "rmssd_ms": metrics["rmssd_ms"]
+                }
             
             reading = {
                 "heart_rate": heart_rate,
@@ -78,6 +126,9 @@ class ECGSensor(BaseSensor):
                 "signal_quality": signal_quality,
                 "unit": "bpm"
             }
+            if hrv is not None:
+                reading["hrv"] = hrv
+                reading["acquisition"] = acquisition
             
             self._update_reading(reading)
             log.debug(f"ECG reading: HR={heart_rate} bpm, rhythm={rhythm}")
@@ -88,35 +139,29 @@ class ECGSensor(BaseSensor):
             log.error(f"Failed to read ECG sensor: {e}")
             return None
     
-    def _collect_samples(self, duration: int = 5) -> list:
-        """Collect ECG samples for specified duration"""
-        samples = []
-        sample_count = self.sample_rate * duration
+    def _process_new_blocks(self):
+        """Feed completed acquisition blocks to the QRS detector (zero-copy)"""
+        if not self.acquisition.is_running:
+            self.acquisition.start()
         
-        for _ in range(sample_count):
-            if HAS_GPIO:
-                # Read analog value (would need ADC like MCP3008)
-                value = GPIO.input(self.pin)
-                samples.append(value)
-            time.sleep(1 / self.sample_rate)
-        
-        return samples
-    
-    def _calculate_heart_rate(self, samples: list) -> int:
-        """Calculate heart rate from samples"""
-        # Simplified: count peaks and calculate BPM
-        # In production, use proper ECG analysis algorithms
-        return random.randint(60, 100)  # Placeholder
+        gap = False
+        for seq, block, lost in self.acquisition.blocks_since(self._last_block):
+            if block is None:
+                gap = True  # Overwritten before this read got to it
+            else:
+                self.qrs_detector.process(block, gap=gap or lost > 0)
+                # If the slot was reused mid-analysis, don't trust continuity
+                gap = not self.acquisition.is_intact(seq)
+            self._last_block = seq
     
-    def _analyze_rhythm(self, samples: list) -> str:
-        """Analyze heart rhythm"""
-        # Simplified rhythm analysis
-        # In production, detect AFib, VTach, etc.
-        return "normal"  # Placeholder
+    def get_acquisition_status(self) -> Optional[Dict[str, Any]]:
+        """Get achieved sample rate and dropped samples (None when simulated)"""
+        return self.acquisition.get_status() if self.acquisition is not None else None
     
-    def _assess_signal_quality(self, samples: list) -> float:
-        """Assess ECG signal quality (0-1)"""
-        return 0.9  # Placeholder
+    def stop_acquisition(self):
+        """Stop the acquisition thread"""
+        if self.acquisition is not None:
+            self.acquisition.stop()
     
     def calibrate(self) -> bool:
         """Calibrate ECG sensor"""
@@ -135,9 +180,12 @@ class ECGSensor(BaseSensor):
         Returns:
             True if emergency detected
         """
-        hr = reading.get("heart_rate", 0)
+        if reading.get("no_beat"):
+            return True  # No QRS complexes: asystole or lead-off
+
+        hr = reading.get("heart_rate") or 0
         rhythm = reading.get("rhythm", "normal")
-        
+
         # Emergency conditions
         if hr < 40 or hr > 150:  # Severe bradycardia or tachycardia
             return True
@@ -148,6 +196,7 @@ class ECGSensor(BaseSensor):
     
     def __del__(self):
         """Cleanup GPIO on deletion"""
+        self.stop_acquisition()
         if HAS_GPIO and self.enabled:
             try:
                 GPIO.cleanup(self.pin)
@@ -6,12 +6,13 @@ from typing import Dict, Any, Optional
 import time
 import random
 from sensors.base_sensor import BaseSensor
+from sensors.nmea_reader import NMEAReader
+from sensors.gps_track import gps_tracks
 from utils import log, config
 
 # Try to import GPS libraries
 try:
     import serial
-    import pynmea2
     HAS_GPS = True
 except ImportError:
     HAS_GPS = False
@@ -37,20 +38,20 @@ class GPSModule(BaseSensor):
         
         self.port = port or config.GPS_PORT
         self.baudrate = baudrate or config.GPS_BAUDRATE
-        self.serial = None
+        self.reader: Optional[NMEAReader] = None
         self.is_simulated = not HAS_GPS
         
         if self.enabled and HAS_GPS:
             self._init_gps()
     
     def _init_gps(self):
-        """Initialize serial connection to GPS"""
+        """Initialize serial connection to GPS and start the reader thread"""
         try:
-            self.serial = serial.Serial(
-                port=self.port,
-                baudrate=self.baudrate,
-                timeout=1
+            self.reader = NMEAReader(
+                lambda: serial.Serial(port=self.port, baudrate=self.baudrate, timeout=1),
+                name="GPS"
             )
+            self.reader.start()
             log.info(f"GPS module initialized on {self.port} at {self.baudrate} baud")
         except Exception as e:
             log.error(f"Failed to initialize GPS: {e}")
@@ -61,11 +62,16 @@ class GPSModule(BaseSensor):
         """
         Read GPS location data
         
+        Never blocks on the serial port: the reader thread keeps the newest
+        fix and this returns a snapshot of it.
+        
         Returns:
             Dictionary with latitude, longitude, altitude, speed, etc.
         """
         if not self.is_ready():
             return None
+        if self.replay is not None:
+            return self._read_replay()
         
         try:
             if self.is_simulated:
@@ -76,18 +82,28 @@ class GPSModule(BaseSensor):
                 speed = random.uniform(0, 20)
                 satellites = random.randint(6, 12)
                 fix_quality = 1  # GPS fix
+                fix_time = time.time()
+                extra = {}
             else:
-                # Read from actual GPS
-                gps_data = self._read_gps_sentence()
-                if not gps_data:
+                # Snapshot of the reader thread's state
+                gps_data = self.reader.snapshot()
+                fix_age = gps_data["fix_age"]
+                if fix_age is None or fix_age > config.GPS_FIX_TIMEOUT:
                     return None
                 
-                latitude = gps_data.get("latitude")
-                longitude = gps_data.get("longitude")
-                altitude = gps_data.get("altitude", 0)
-                speed = gps_data.get("speed", 0)
-                satellites = gps_data.get("satellites", 0)
-                fix_quality = gps_data.get("fix_quality", 0)
+                latitude = gps_data["latitude"]
+                longitude = gps_data["longitude"]
+                altitude = gps_data["altitude"] or 0
+                speed = gps_data["speed"] or 0
+                satellites = gps_data["satellites"]
+                fix_quality = gps_data["fix_quality"]
+                fix_time = gps_data["fix_time"]
+                extra = {
+                    "hdop": gps_data["hdop"],
+                    "course": gps_data["course"],
+                    "fix_type": gps_data["fix_type"],
+                    "fix_age": round(fix_age, 2)
+                }
             
             reading = {
                 "latitude": round(latitude, 6),
@@ -96,10 +112,14 @@ class GPSModule(BaseSensor):
                 "speed": round(speed, 1),
                 "satellites": satellites,
                 "fix_quality": fix_quality,
-                "timestamp": time.time()
+                "timestamp": fix_time,
+                **extra
             }
             
             self._update_reading(reading)
+            if not self.is_simulated:
+                # Random simulated positions would only draw noise as a trail
+                gps_tracks.add_fix(config.UNIT_ID, latitude, longitude, fix_time, extra.get("hdop"))
             log.debug(f"GPS reading: {latitude:.6f}, {longitude:.6f}")
             
             return reading
@@ -108,37 +128,6 @@ class GPSModule(BaseSensor):
             log.error(f"Failed to read GPS: {e}")
             return None
     
-    def _read_gps_sentence(self) -> Optional[Dict[str, Any]]:
-        """Read and parse NMEA sentence from GPS"""
-        try:
-            # Read lines until we get a valid GGA or RMC sentence
-            for _ in range(10):
-                line = self.serial.readline().decode('ascii', errors='ignore')
-                
-                if line.startswith('$GPGGA') or line.startswith('$GNGGA'):
-                    msg = pynmea2.parse(line)
-                    return {
-                        "latitude": msg.latitude,
-                        "longitude": msg.longitude,
-                        "altitude": msg.altitude,
-                        "satellites": msg.num_sats,
-                        "fix_quality": msg.gps_qual
-                    }
-                elif line.startswith('$GPRMC') or line.startswith('$GNRMC'):
-                    msg = pynmea2.parse(line)
-                    return {
-                        "latitude": msg.latitude,
-                        "longitude": msg.longitude,
-                        "speed": msg.spd_over_grnd if hasattr(msg, 'spd_over_grnd') else 0,
-                        "fix_quality": 1 if msg.status == 'A' else 0
-                    }
-            
-            return None
-            
-        except Exception as e:
-            log.error(f"Failed to parse GPS sentence: {e}")
-            return None
-    
     def get_location_string(self) -> str:
         """Get human-readable location string"""
         reading = self.get_last_reading()
@@ -183,10 +172,19 @@ class GPSModule(BaseSensor):
         
         return reading["value"].get("fix_quality", 0) > 0
     
+    def get_reader_status(self) -> Optional[Dict[str, Any]]:
+        """Get NMEA reader counters (None when simulated)"""
+        return self.reader.get_status() if self.reader is not None else None
+    
+    def stop_reader(self):
+        """Stop the reader thread and close the serial port"""
+        if self.reader is not None:
+            self.reader.stop()
+    
     def __del__(self):
         """Cleanup serial connection on deletion"""
-        if self.serial and not self.is_simulated:
+        if self.reader is not None:
             try:
-                self.serial.close()
+                self.reader.stop()
             except:
                 pass
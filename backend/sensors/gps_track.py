@@ -0,0 +1,323 @@
+"""
+GPS Track Store
+Kalman-smoothed breadcrumb trails per unit, kept as delta-encoded int32
+microdegrees and millisecond timestamps, with Douglas-Peucker simplification
+for sending trails over cellular links
+"""
+from typing import Any, Dict, List, Optional
+import math
+import threading
+import numpy as np
+from utils import log, config
+
+EARTH_RADIUS_M = 6371000.0
+MICRODEGREES = 1_000_000
+UERE_M = 5.0  # Receiver position error per unit of HDOP
+
+
+def _meters_per_degree(latitude: float):
+    """(meters per degree latitude, meters per degree longitude) near latitude"""
+    per_lat = math.pi * EARTH_RADIUS_M / 180.0
+    return per_lat, per_lat * math.cos(math.radians(latitude))
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification
+
+    Args:
+        points: (N, 2) planar coordinates in meters
+        tolerance: Maximum distance in meters a dropped point may lie off the line
+
+    Returns:
+        Sorted indices of the points to keep (always includes both ends)
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = points[first + 1:last] - start
+        direction = end - start
+        length = math.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0], segment[:, 1])
+        else:
+            distances = np.abs(segment[:, 0] * direction[1] - segment[:, 1] * direction[0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+
+class PositionKalman:
+    """
+    Constant-velocity Kalman filter on a local east/north plane in meters
+
+    The two axes are independent, so each is a 2-state (position, velocity)
+    filter updated with scalar arithmetic.
+    """
+
+    ACCEL_NOISE = 2.0      # m/s^2, ambulance manoeuvring
+    GATE_SIGMA = 6.0       # Fixes further than this many sigmas are outliers
+    MAX_GAP_SECONDS = 30.0  # Restart after losing the fix this long
+
+    def __init__(self):
+        self.origin: Optional[tuple] = None
+        self.timestamp: Optional[float] = None
+        self.rejected = 0
+
+    def reset(self, latitude: float, longitude: float, timestamp: float, sigma: float):
+        self.origin = (latitude, longitude)
+        self._scale = _meters_per_degree(latitude)
+        self.timestamp = timestamp
+        # Per axis: state [position, velocity], covariance [[pp, pv], [pv, vv]]
+        self.x = [[0.0, 0.0], [0.0, 0.0]]
+        self.p = [[sigma * sigma, 0.0, 25.0], [sigma * sigma, 0.0, 25.0]]
+
+    def update(self, latitude: float, longitude: float, timestamp: float,
+               hdop: Optional[float] = None) -> Optional[tuple]:
+        """
+        Fold in one fix
+
+        Returns:
+            Smoothed (latitude, longitude), or None if the fix was rejected
+        """
+        sigma = UERE_M * (hdop if hdop else 1.0)
+        if self.origin is None or timestamp - self.timestamp > self.MAX_GAP_SECONDS:
+            self.reset(latitude, longitude, timestamp, sigma)
+            return latitude, longitude
+
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return None
+
+        per_lat, per_lon = self._scale
+        measured = ((longitude - self.origin[1]) * per_lon, (latitude - self.origin[0]) * per_lat)
+        q = self.ACCEL_NOISE ** 2
+        r = sigma * sigma
+
+        predicted = []
+        for axis in range(2):
+            pos, vel = self.x[axis]
+            pp, pv, vv = self.p[axis]
+            # Predict: x = F x, P = F P F' + Q (white acceleration)
+            pos += vel * dt
+            pp += dt * (2 * pv + dt * vv) + q * dt ** 4 / 4
+            pv += dt * vv + q * dt ** 3 / 2
+            vv += q * dt * dt
+            predicted.append((pos, vel, pp, pv, vv))
+
+        innovation = [measured[axis] - predicted[axis][0] for axis in range(2)]
+        if any(innov * innov > self.GATE_SIGMA ** 2 * (predicted[axis][2] + r)
+               for axis, innov in enumerate(innovation)):
+            self.rejected += 1
+            return None
+
+        for axis in range(2):
+            pos, vel, pp, pv, vv = predicted[axis]
+            s = pp + r
+            k_pos, k_vel = pp / s, pv / s
+            self.x[axis] = [pos + k_pos * innovation[axis], vel + k_vel * innovation[axis]]
+            self.p[axis] = [(1 - k_pos) * pp, (1 - k_pos) * pv, vv - k_vel * pv]
+        self.timestamp = timestamp
+
+        east, north = self.x[0][0], self.x[1][0]
+        return self.origin[0] + north / per_lat, self.origin[1] + east / per_lon
+
+    @property
+    def speed(self) -> Optional[float]:
+        """Smoothed ground speed in m/s"""
+        if self.origin is None:
+            return None
+        return math.hypot(self.x[0][1], self.x[1][1])
+
+
+class UnitTrack:
+    """
+    One unit's smoothed trail
+
+    Points are stored as int32 deltas from the previous point: microdegrees
+    for position and milliseconds for time, 12 bytes per point. Absolute
+    values are rebuilt with a cumulative sum when queried.
+    """
+
+    def __init__(self, unit_id: str, max_points: int = 86400):
+        self.unit_id = unit_id
+        self.max_points = max_points
+        self.kalman = PositionKalman()
+        self._deltas = np.zeros((1024, 3), dtype=np.int32)  # (ms, lat µdeg, lon µdeg)
+        self._size = 0
+        self._base: Optional[np.ndarray] = None   # Absolute first point (ms, µdeg, µdeg)
+        self._last: Optional[np.ndarray] = None   # Absolute newest point
+        self.fixes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add_fix(self, latitude: float, longitude: float, timestamp: float,
+                hdop: Optional[float] = None) -> bool:
+        """Smooth and store a fix; returns False for duplicates and outliers"""
+        if self.kalman.timestamp is not None and timestamp <= self.kalman.timestamp:
+            return False
+        smoothed = self.kalman.update(latitude, longitude, timestamp, hdop)
+        if smoothed is None:
+            return False
+
+        point = np.array([
+            int(round(timestamp * 1000)),
+            int(round(smoothed[0] * MICRODEGREES)),
+            int(round(smoothed[1] * MICRODEGREES))
+        ], dtype=np.int64)
+
+        if self._base is None:
+            self._base = point
+            delta = np.zeros(3, dtype=np.int64)
+        else:
+            delta = point - self._last
+        self._last = point
+
+        if self._size == len(self._deltas):
+            if self._size >= self.max_points:
+                self._drop_oldest(self._size // 4)
+            else:
+                grown = np.zeros((min(self._size * 2, self.max_points), 3), dtype=np.int32)
+                grown[:self._size] = self._deltas[:self._size]
+                self._deltas = grown
+        self._deltas[self._size] = delta
+        self._size += 1
+        self.fixes += 1
+        return True
+
+    def _drop_oldest(self, count: int):
+        """Forget the oldest points, moving the base to the new first point"""
+        absolute = self._absolute()
+        self._base = absolute[count].copy()
+        kept = self._size - count
+        self._deltas[1:kept] = self._deltas[count + 1:self._size]
+        self._deltas[0] = 0
+        self._size = kept
+
+    def _absolute(self) -> np.ndarray:
+        """Decode to absolute int64 (ms, µdeg lat, µdeg lon) rows"""
+        if self._size == 0:
+            return np.empty((0, 3), dtype=np.int64)
+        return self._base + np.cumsum(self._deltas[:self._size], axis=0, dtype=np.int64)
+
+    def since(self, since: Optional[float] = None, tolerance: float = 0.0) -> np.ndarray:
+        """
+        Absolute points newer than `since`, optionally simplified
+
+        Args:
+            since: Epoch seconds (None = whole trail)
+            tolerance: Douglas-Peucker tolerance in meters (0 = every point)
+
+        Returns:
+            (N, 3) int64 rows of (ms, µdeg lat, µdeg lon)
+        """
+        points = self._absolute()
+        if since is not None:
+            start = int(np.searchsorted(points[:, 0], int(since * 1000), side="right"))
+            points = points[start:]
+        if tolerance > 0 and len(points) > 2:
+            per_lat, per_lon = _meters_per_degree(points[0, 1] / MICRODEGREES)
+            planar = np.column_stack((
+                (points[:, 2] - points[0, 2]) * (per_lon / MICRODEGREES),
+                (points[:, 1] - points[0, 1]) * (per_lat / MICRODEGREES)
+            ))
+            points = points[simplify(planar, tolerance)]
+        return points
+
+
+class GPSTrackStore:
+    """Thread-safe map of unit id -> UnitTrack"""
+
+    def __init__(self, max_points: int = None):
+        self.max_points = max_points or config.TRACK_MAX_POINTS
+        self._tracks: Dict[str, UnitTrack] = {}
+        self._lock = threading.Lock()
+
+    def add_fix(self, unit_id: str, latitude: float, longitude: float, timestamp: float,
+                hdop: Optional[float] = None) -> bool:
+        """
+        Record a fix for a unit
+
+        Args:
+            unit_id: Ambulance / device identifier
+            latitude: Degrees
+            longitude: Degrees
+            timestamp: Epoch seconds of the fix
+            hdop: Horizontal dilution of precision (weights the fix)
+
+        Returns:
+            True if the fix was stored
+        """
+        try:
+            with self._lock:
+                track = self._tracks.get(unit_id)
+                if track is None:
+                    track = self._tracks[unit_id] = UnitTrack(unit_id, self.max_points)
+                return track.add_fix(latitude, longitude, timestamp, hdop)
+        except Exception as e:
+            log.error(f"Failed to record fix for {unit_id}: {e}")
+            return False
+
+    def units(self) -> List[str]:
+        with self._lock:
+            return list(self._tracks)
+
+    def get_track(self, unit_id: str, since: Optional[float] = None,
+                  tolerance: Optional[float] = None, encoding: str = "points") -> Optional[Dict[str, Any]]:
+        """
+        Get a unit's trail since a time
+
+        Args:
+            unit_id: Unit identifier
+            since: Epoch seconds (None = whole trail)
+            tolerance: Simplification tolerance in meters (None = config default)
+            encoding: "points" for [t, lat, lon] rows, "delta" for a base point
+                plus integer [ms, µdeg, µdeg] deltas (compact for transmission)
+
+        Returns:
+            Track dictionary, or None for an unknown unit
+        """
+        tolerance = config.TRACK_SIMPLIFY_TOLERANCE if tolerance is None else tolerance
+        with self._lock:
+            track = self._tracks.get(unit_id)
+            if track is None:
+                return None
+            stored = len(track)
+            speed = track.kalman.speed
+            points = track.since(since, tolerance)
+
+        result = {
+            "unit_id": unit_id,
+            "since": since,
+            "tolerance_m": tolerance,
+            "stored_points": stored,
+            "count": len(points),
+            "speed_kmh": round(speed * 3.6, 1) if speed is not None else None,
+            "encoding": encoding
+        }
+        if encoding == "delta":
+            result["base"] = points[0].tolist() if len(points) else None
+            result["deltas"] = np.diff(points, axis=0).tolist() if len(points) > 1 else []
+        else:
+            result["points"] = [
+                [t / 1000.0, lat / MICRODEGREES, lon / MICRODEGREES] for t, lat, lon in points.tolist()
+            ]
+        return result
+
+
+# Global instance
+gps_tracks = GPSTrackStore()
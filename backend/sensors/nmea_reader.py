@@ -0,0 +1,304 @@
+"""
+Background NMEA Reader
+A thread drains the GPS serial port continuously and parses GGA/RMC/VTG/GSA
+sentences incrementally, so callers only ever take a snapshot of the newest fix
+"""
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+from utils import log
+
+# Sentences that do not end within this many bytes are line noise
+MAX_SENTENCE_BYTES = 256
+
+# GSA fix type field
+FIX_TYPES = {1: "none", 2: "2d", 3: "3d"}
+
+
+def _checksum_ok(line: bytes) -> bool:
+    """Validate the optional *HH checksum of a sentence starting with $"""
+    star = line.rfind(b"*")
+    if star == -1:
+        return True
+    try:
+        expected = int(line[star + 1:star + 3], 16)
+    except ValueError:
+        return False
+    actual = 0
+    for byte in line[1:star]:
+        actual ^= byte
+    return actual == expected
+
+
+def _coordinate(value: str, hemisphere: str) -> Optional[float]:
+    """Convert NMEA ddmm.mmmm / dddmm.mmmm plus hemisphere to signed degrees"""
+    if not value:
+        return None
+    dot = value.find(".")
+    split = (dot if dot != -1 else len(value)) - 2
+    degrees = float(value[:split]) + float(value[split:]) / 60.0
+    return -degrees if hemisphere in ("S", "W") else degrees
+
+
+def _float(value: str) -> Optional[float]:
+    return float(value) if value else None
+
+
+def _int(value: str) -> Optional[int]:
+    return int(value) if value else None
+
+
+class NMEAParser:
+    """
+    Incremental NMEA 0183 parser
+
+    Bytes are fed in whatever chunks the port delivers; complete sentences
+    are checksummed and folded into `state`, partial ones wait for the rest.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.state: Dict[str, Any] = {
+            "latitude": None,
+            "longitude": None,
+            "altitude": None,
+            "speed": None,          # knots
+            "speed_kmh": None,
+            "course": None,         # degrees true
+            "satellites": 0,
+            "fix_quality": 0,
+            "fix_type": "none",
+            "hdop": None,
+            "pdop": None,
+            "vdop": None,
+            "utc_time": None,
+            "fix_time": None,       # wall-clock time of the last valid position
+            "updated": None         # wall-clock time of the last parsed sentence
+        }
+        self.sentences = 0
+        self.errors = 0
+        self._handlers: Dict[str, Callable[[List[str]], bool]] = {
+            "GGA": self._parse_gga,
+            "RMC": self._parse_rmc,
+            "VTG": self._parse_vtg,
+            "GSA": self._parse_gsa
+        }
+
+    def feed(self, data: bytes) -> int:
+        """
+        Parse the complete sentences in a chunk of bytes
+
+        Args:
+            data: Raw bytes from the port
+
+        Returns:
+            Number of sentences that updated the state
+        """
+        self._buffer += data
+        applied = 0
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end == -1:
+                break
+            if self._parse_line(bytes(self._buffer[start:end]).strip()):
+                applied += 1
+            start = end + 1
+        del self._buffer[:start]
+
+        if len(self._buffer) > MAX_SENTENCE_BYTES:
+            # No newline in sight; keep only a possible sentence start
+            dollar = self._buffer.rfind(b"$")
+            del self._buffer[:dollar if dollar != -1 else len(self._buffer)]
+            self.errors += 1
+        return applied
+
+    def _parse_line(self, line: bytes) -> bool:
+        # Resync on the last sentence start (line noise or a mid-sentence connect)
+        dollar = line.rfind(b"$")
+        if dollar == -1 or len(line) - dollar < 7:
+            return False
+        line = line[dollar:]
+        if not _checksum_ok(line):
+            self.errors += 1
+            return False
+
+        star = line.rfind(b"*")
+        fields = line[1:star if star != -1 else len(line)].decode("ascii", errors="ignore").split(",")
+        handler = self._handlers.get(fields[0][-3:])
+        if handler is None:
+            return False
+
+        try:
+            applied = handler(fields)
+        except (ValueError, IndexError):
+            self.errors += 1
+            return False
+        if applied:
+            self.sentences += 1
+            self.state["updated"] = time.time()
+        return applied
+
+    def _set_position(self, latitude: Optional[float], longitude: Optional[float]):
+        if latitude is None or longitude is None:
+            return
+        self.state["latitude"] = latitude
+        self.state["longitude"] = longitude
+        self.state["fix_time"] = time.time()
+
+    def _parse_gga(self, f: List[str]) -> bool:
+        """$xxGGA,time,lat,N,lon,E,quality,sats,hdop,alt,M,..."""
+        quality = _int(f[6]) or 0
+        self.state["utc_time"] = f[1] or self.state["utc_time"]
+        self.state["fix_quality"] = quality
+        self.state["satellites"] = _int(f[7]) or 0
+        self.state["hdop"] = _float(f[8])
+        if quality > 0:
+            self._set_position(_coordinate(f[2], f[3]), _coordinate(f[4], f[5]))
+            self.state["altitude"] = _float(f[9])
+        return True
+
+    def _parse_rmc(self, f: List[str]) -> bool:
+        """$xxRMC,time,status,lat,N,lon,E,knots,course,date,..."""
+        self.state["utc_time"] = f[1] or self.state["utc_time"]
+        if f[2] != "A":
+            self.state["fix_quality"] = 0
+            return True
+        if not self.state["fix_quality"]:
+            self.state["fix_quality"] = 1
+        self._set_position(_coordinate(f[3], f[4]), _coordinate(f[5], f[6]))
+        speed = _float(f[7])
+        if speed is not None:
+            self.state["speed"] = speed
+            self.state["speed_kmh"] = speed * 1.852
+        self.state["course"] = _float(f[8])
+        return True
+
+    def _parse_vtg(self, f: List[str]) -> bool:
+        """$xxVTG,course,T,course,M,knots,N,kmh,K,mode"""
+        if len(f) > 9 and f[9] == "N":
+            return False  # Mode indicator: data not valid
+        self.state["course"] = _float(f[1])
+        self.state["speed"] = _float(f[5])
+        self.state["speed_kmh"] = _float(f[7])
+        return True
+
+    def _parse_gsa(self, f: List[str]) -> bool:
+        """$xxGSA,mode,fix type,12 x satellite id,pdop,hdop,vdop"""
+        self.state["fix_type"] = FIX_TYPES.get(_int(f[2]) or 1, "none")
+        self.state["pdop"] = _float(f[15])
+        self.state["hdop"] = _float(f[16])
+        self.state["vdop"] = _float(f[17])
+        return True
+
+
+class NMEAReader:
+    """
+    Serial port reader thread keeping the freshest GPS state
+
+    The port is reopened with backoff after errors, so unplugging the
+    receiver only costs the fix while it is gone.
+    """
+
+    RECONNECT_DELAYS = (1.0, 2.0, 5.0, 10.0)
+
+    def __init__(self, open_port: Callable[[], Any], name: str = "gps"):
+        """
+        Initialize reader (not started)
+
+        Args:
+            open_port: Returns an open port with read(n) and close(); read
+                must time out (e.g. serial.Serial(..., timeout=1))
+            name: Thread name
+        """
+        self.open_port = open_port
+        self.name = name
+        self.parser = NMEAParser()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._port = None
+        self.bytes_read = 0
+        self.reconnects = 0
+        self.error: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Open the port and start the reader thread"""
+        if self.is_running:
+            return
+        # Fail fast on a bad port so the caller can fall back to simulation
+        self._port = self.open_port()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-reader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the reader thread and close the port"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._close_port()
+
+    def _close_port(self):
+        if self._port is not None:
+            try:
+                self._port.close()
+            except Exception:
+                pass
+            self._port = None
+
+    def _run(self):
+        """Read and parse until stopped, reopening the port after errors"""
+        failures = 0
+        while not self._stop_event.is_set():
+            try:
+                if self._port is None:
+                    self._port = self.open_port()
+                    self.reconnects += 1
+                    log.info(f"{self.name} port reopened")
+
+                waiting = getattr(self._port, "in_waiting", 0)
+                chunk = self._port.read(waiting or 1)
+                if not chunk:
+                    continue
+
+                self.bytes_read += len(chunk)
+                with self._lock:
+                    self.parser.feed(chunk)
+                failures = 0
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                self._close_port()
+                delay = self.RECONNECT_DELAYS[min(failures, len(self.RECONNECT_DELAYS) - 1)]
+                failures += 1
+                log.error(f"{self.name} read failed ({e}); retrying in {delay:.0f}s")
+                self._stop_event.wait(delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the freshest GPS state without touching the port
+
+        Returns:
+            Parser state plus fix_age (seconds since the last valid position)
+        """
+        with self._lock:
+            state = dict(self.parser.state)
+        state["fix_age"] = time.time() - state["fix_time"] if state["fix_time"] else None
+        return state
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get reader counters"""
+        return {
+            "running": self.is_running,
+            "bytes_read": self.bytes_read,
+            "sentences": self.parser.sentences,
+            "errors": self.parser.errors,
+            "reconnects": self.reconnects,
+            "error": self.error
+        }
@@ -0,0 +1,260 @@
+"""
+Streaming QRS Detection
+Pan-Tompkins over sample blocks: the filter chain carries its state between
+blocks, so beats, heart rate and RR variability update as samples arrive
+"""
+from typing import Any, Deque, Dict, List, Optional
+from collections import deque
+import numpy as np
+from scipy.signal import butter, lfilter, lfilter_zi
+
+
+class QRSDetector:
+    """
+    Incremental Pan-Tompkins QRS detector
+
+    Band-pass (5-15 Hz) -> derivative -> squaring -> moving-window
+    integration, then adaptive signal/noise thresholds with search-back.
+    Memory is bounded: filter states plus the last RR_HISTORY intervals.
+    """
+
+    LEARNING_SECONDS = 2.0     # Threshold initialization period
+    SETTLE_SECONDS = 0.3       # Ignore peaks while filters settle after a gap
+    REFRACTORY_SECONDS = 0.2   # No second QRS within this time
+    INTEGRATION_SECONDS = 0.15
+    MAX_RR_SECONDS = 3.0       # Longer gaps are dropouts, not RR intervals
+    RR_HISTORY = 32
+    HR_BEATS = 8               # RR intervals averaged for heart rate
+    IRREGULAR_RMSSD_RATIO = 0.12  # RMSSD / mean RR above this = irregular
+
+    def __init__(self, sample_rate: int = 200):
+        """
+        Initialize detector
+
+        Args:
+            sample_rate: ECG sampling rate in Hz
+        """
+        self.sample_rate = sample_rate
+
+        self._bp_b, self._bp_a = butter(2, [5, 15], btype="bandpass", fs=sample_rate)
+        self._bp_zi_unit = lfilter_zi(self._bp_b, self._bp_a)
+        self._deriv_b = np.array([1.0, 2.0, 0.0, -2.0, -1.0]) * (sample_rate / 8.0)
+        window = max(1, int(round(self.INTEGRATION_SECONDS * sample_rate)))
+        self._mwi_b = np.full(window, 1.0 / window)
+
+        self._learning_samples = int(self.LEARNING_SECONDS * sample_rate)
+        self._settle = int(self.SETTLE_SECONDS * sample_rate)
+        self._refractory = int(self.REFRACTORY_SECONDS * sample_rate)
+        self._max_rr = int(self.MAX_RR_SECONDS * sample_rate)
+
+        self.rr_intervals: Deque[float] = deque(maxlen=self.RR_HISTORY)
+        self.reset()
+
+    def reset(self):
+        """Forget all state, including learned thresholds and RR history"""
+        self.spki = 0.0
+        self.npki = 0.0
+        self._learned = False
+        self._learn_max = 0.0
+        self._learn_sum = 0.0
+        self._learn_count = 0
+        self.rr_intervals.clear()
+        self.beats = 0
+        self._start_segment(0)
+
+    def _start_segment(self, index: int):
+        """Restart filters and beat timing at a discontinuity"""
+        self._bp_zi: Optional[np.ndarray] = None
+        self._deriv_zi = np.zeros(len(self._deriv_b) - 1)
+        self._mwi_zi = np.zeros(len(self._mwi_b) - 1)
+        self._tail = np.empty(0)
+        self._index = index
+        self._segment_start = index
+        self._last_beat: Optional[int] = None
+        self._noise_peak: Optional[tuple] = None
+        self._pending: Optional[tuple] = None
+
+    def process(self, block: np.ndarray, gap: bool = False) -> List[int]:
+        """
+        Feed the next block of raw samples
+
+        Args:
+            block: 1-D raw ECG samples
+            gap: True if samples were lost since the previous block
+
+        Returns:
+            Absolute sample indices of QRS complexes detected in this call
+        """
+        block = np.asarray(block, dtype=np.float64)
+        if gap:
+            self._start_segment(self._index)
+        if block.size == 0:
+            return []
+
+        if self._bp_zi is None:
+            # Start the band-pass in steady state for the first sample (no step transient)
+            self._bp_zi = self._bp_zi_unit * block[0]
+
+        filtered, self._bp_zi = lfilter(self._bp_b, self._bp_a, block, zi=self._bp_zi)
+        derivative, self._deriv_zi = lfilter(self._deriv_b, 1.0, filtered, zi=self._deriv_zi)
+        np.square(derivative, out=derivative)
+        integrated, self._mwi_zi = lfilter(self._mwi_b, 1.0, derivative, zi=self._mwi_zi)
+
+        if not self._learned:
+            self._learn(integrated)
+
+        # Local maxima; the last sample waits for its right neighbour in the next block
+        y = np.concatenate((self._tail, integrated))
+        offset = self._index - self._tail.size
+        peaks = np.flatnonzero((y[1:-1] > y[:-2]) & (y[1:-1] >= y[2:])) + 1
+        self._tail = y[-2:]
+        self._index += block.size
+
+        # Only the tallest peak within a refractory period is classified, so
+        # a ripple on the rising edge cannot become the beat's fiducial point
+        beats = []
+        for i in peaks:
+            index = offset + int(i)
+            if not self._learned or index - self._segment_start < self._settle:
+                continue
+            if self._pending is not None and index - self._pending[0] < self._refractory:
+                if y[i] > self._pending[1]:
+                    self._pending = (index, float(y[i]))
+                continue
+            if self._pending is not None:
+                beats.extend(self._classify_peak(*self._pending))
+            self._pending = (index, float(y[i]))
+
+        if self._pending is not None and self._index - self._pending[0] >= self._refractory:
+            beats.extend(self._classify_peak(*self._pending))
+            self._pending = None
+
+        # Asystole or lead-off: the retained intervals no longer describe the heart
+        if self.no_beat and self.rr_intervals:
+            self.rr_intervals.clear()
+        return beats
+
+    def _learn(self, integrated: np.ndarray):
+        """Initialize thresholds from the first LEARNING_SECONDS of signal"""
+        take = integrated[:max(0, self._learning_samples - self._learn_count)]
+        if take.size:
+            self._learn_max = max(self._learn_max, float(take.max()))
+            self._learn_sum += float(take.sum())
+            self._learn_count += take.size
+        if self._learn_count >= self._learning_samples:
+            self.spki = 0.25 * self._learn_max
+            self.npki = 0.5 * self._learn_sum / self._learn_count
+            self._learned = True
+
+    def _classify_peak(self, index: int, value: float) -> List[int]:
+        """Run one integrated-signal peak through the adaptive thresholds"""
+        if self._last_beat is not None and index - self._last_beat < self._refractory:
+            return []
+
+        beats = []
+        threshold = self.npki + 0.25 * (self.spki - self.npki)
+
+        # Search back for a missed beat when this gap is far longer than usual
+        rr_average = self._rr_average_samples()
+        if (
+            rr_average and self._noise_peak is not None
+            and index - self._last_beat > 1.66 * rr_average
+            and self._noise_peak[1] > 0.5 * threshold
+        ):
+            missed, missed_value = self._noise_peak
+            self.spki = 0.25 * missed_value + 0.75 * self.spki
+            self._accept_beat(missed)
+            beats.append(missed)
+            threshold = self.npki + 0.25 * (self.spki - self.npki)
+            if index - missed < self._refractory:
+                return beats
+
+        if value > threshold:
+            self.spki = 0.125 * value + 0.875 * self.spki
+            self._accept_beat(index)
+            beats.append(index)
+        else:
+            self.npki = 0.125 * value + 0.875 * self.npki
+            if self._noise_peak is None or value > self._noise_peak[1]:
+                self._noise_peak = (index, value)
+
+        return beats
+
+    def _accept_beat(self, index: int):
+        if self._last_beat is not None:
+            rr = index - self._last_beat
+            if rr <= self._max_rr:
+                self.rr_intervals.append(rr / self.sample_rate)
+        self._last_beat = index
+        self._noise_peak = None
+        self.beats += 1
+
+    def _rr_average_samples(self) -> Optional[float]:
+        if self._last_beat is None or not self.rr_intervals:
+            return None
+        recent = list(self.rr_intervals)[-self.HR_BEATS:]
+        return sum(recent) / len(recent) * self.sample_rate
+
+    @property
+    def seconds_since_beat(self) -> float:
+        """Seconds of signal since the last beat (or since the segment started)"""
+        reference = self._last_beat if self._last_beat is not None else self._segment_start
+        return (self._index - reference) / self.sample_rate
+
+    @property
+    def no_beat(self) -> bool:
+        """No QRS for longer than MAX_RR_SECONDS of signal"""
+        return self.seconds_since_beat > self.MAX_RR_SECONDS
+
+    @property
+    def heart_rate(self) -> Optional[int]:
+        """Beats per minute over the last HR_BEATS intervals (None without recent beats)"""
+        if self.no_beat or len(self.rr_intervals) < 2:
+            return None
+        recent = list(self.rr_intervals)[-self.HR_BEATS:]
+        return int(round(60.0 / (sum(recent) / len(recent))))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get heart rate, RR variability and rhythm class
+
+        Returns:
+            Dictionary with heart_rate, rhythm, RR statistics, signal_quality
+            and no_beat (no QRS for over MAX_RR_SECONDS: heart_rate is None
+            and rhythm "unknown", never the last rate)
+        """
+        rr = np.fromiter(self.rr_intervals, dtype=np.float64)
+        heart_rate = self.heart_rate
+
+        sdnn = rmssd = None
+        irregular = False
+        if rr.size >= 2:
+            sdnn = float(rr.std())
+            rmssd = float(np.sqrt(np.mean(np.diff(rr) ** 2)))
+            irregular = rr.size >= self.HR_BEATS and rmssd / rr.mean() > self.IRREGULAR_RMSSD_RATIO
+
+        if heart_rate is None:
+            rhythm = "unknown"
+        elif irregular:
+            rhythm = "irregular"
+        elif heart_rate > 100:
+            rhythm = "sinus_tachycardia"
+        elif heart_rate < 60:
+            rhythm = "sinus_bradycardia"
+        else:
+            rhythm = "normal"
+
+        quality = (self.spki - self.npki) / self.spki if self.spki > 0 else 0.0
+
+        return {
+            "heart_rate": heart_rate,
+            "rhythm": rhythm,
+            "irregular": irregular,
+            "rr_mean_ms": round(float(rr.mean()) * 1000, 1) if rr.size else None,
+            "sdnn_ms": round(sdnn * 1000, 1) if sdnn is not None else None,
+            "rmssd_ms": round(rmssd * 1000, 1) if rmssd is not None else None,
+            "beats": self.beats,
+            "no_beat": self.no_beat,
+            "seconds_since_beat": round(self.seconds_since_beat, 1),
+            "signal_quality": round(min(1.0, max(0.0, quality)), 2)
+        }
@@ -0,0 +1,208 @@
+"""
+Per-Sensor Refresh Scheduler
+Reads each sensor concurrently at its own cadence into a cache, so callers
+take a consistent snapshot instead of paying for every sensor on each request
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from utils import log
+
+
+class SensorSchedule(NamedTuple):
+    """How often a sensor is worth reading and what one read costs"""
+    reader: str        # Method name on the owning suite
+    interval: float    # Seconds between refreshes
+    cost: float        # Typical seconds one read blocks
+
+
+class RefreshScheduler:
+    """
+    Cache of sensor values refreshed on per-sensor deadlines
+
+    One scheduler thread hands due reads to a small worker pool, expensive
+    reads first, so a slow sensor (a cuff inflating, a gas heater warming)
+    only ever delays itself. A sensor is never read twice at once.
+    """
+
+    def __init__(
+        self,
+        readers: Dict[str, Tuple[Callable[[], Any], SensorSchedule]],
+        workers: int = 4,
+        name: str = "refresh"
+    ):
+        """
+        Initialize scheduler (not started)
+
+        Args:
+            readers: key -> (read callable, schedule)
+            workers: Concurrent reads
+            name: Thread name prefix
+        """
+        self.readers = readers
+        self.workers = max(1, workers)
+        self.name = name
+
+        self._cache: Dict[str, Tuple[Any, float]] = {}  # key -> (value, monotonic read time)
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._next_due: Dict[str, float] = {}
+        self._in_flight: set = set()
+        self._stats = {key: {"reads": 0, "errors": 0, "last_duration": None} for key in readers}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the scheduler thread; every sensor is due immediately"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        now = time.monotonic()
+        self._next_due = {key: now for key in self.readers}
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-read")
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-scheduler", daemon=True)
+        self._thread.start()
+        log.info(f"{self.name} scheduler started for {len(self.readers)} sensors ({self.workers} workers)")
+
+    def stop(self):
+        """Stop scheduling; reads already running finish in the background"""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _run(self):
+        """Submit due reads, then sleep until the next one is due"""
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            with self._cond:
+                due = [key for key, at in self._next_due.items() if at <= now and key not in self._in_flight]
+                due.sort(key=lambda key: self.readers[key][1].cost, reverse=True)
+                self._in_flight.update(due)
+                waiting = [at for key, at in self._next_due.items() if key not in self._in_flight]
+
+            for key in due:
+                try:
+                    self._executor.submit(self._refresh, key)
+                except RuntimeError:
+                    return  # Executor shut down
+
+            delay = min(waiting) - time.monotonic() if waiting else 1.0
+            self._wake.wait(min(max(delay, 0.001), 1.0))
+            self._wake.clear()
+
+    def _read(self, key: str) -> Optional[Any]:
+        """
+        Read one sensor into the cache, counting reads and errors
+
+        Returns:
+            The reading, or None if the reader raised
+        """
+        started = time.monotonic()
+        try:
+            value = self.readers[key][0]()
+            with self._cond:
+                self._cache[key] = (value, time.monotonic())
+                self._stats[key]["reads"] += 1
+            return value
+        except Exception as e:
+            with self._cond:
+                self._stats[key]["errors"] += 1
+            log.error(f"{self.name}: failed to read {key}: {e}")
+            return None
+        finally:
+            with self._cond:
+                self._stats[key]["last_duration"] = time.monotonic() - started
+
+    def _refresh(self, key: str):
+        """Scheduled read of one sensor"""
+        schedule = self.readers[key][1]
+        started = time.monotonic()
+        try:
+            self._read(key)
+        finally:
+            finished = time.monotonic()
+            with self._cond:
+                # Next read one interval after this one started; resync if it overran
+                self._next_due[key] = max(started + schedule.interval, finished)
+                self._in_flight.discard(key)
+                self._cond.notify_all()
+            self._wake.set()
+
+    def wait_filled(self, timeout: float) -> List[str]:
+        """
+        Wait until every sensor has a cached value
+
+        Returns:
+            Keys still missing after the timeout
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._cache) == len(self.readers), timeout=timeout)
+            return [key for key in self.readers if key not in self._cache]
+
+    def read_now(self, key: str) -> Optional[Any]:
+        """
+        Read a sensor on the caller's thread and cache the value
+
+        Errors are logged and counted like those of scheduled reads.
+
+        Returns:
+            The reading, or None if a scheduled read of it is still running
+            or the reader raised
+        """
+        with self._cond:
+            if key in self._in_flight:
+                return None
+            self._in_flight.add(key)
+        try:
+            return self._read(key)
+        finally:
+            with self._cond:
+                self._in_flight.discard(key)
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Tuple[Any, float]]:
+        """
+        Get every cached value at one instant
+
+        Returns:
+            key -> (value, age in seconds)
+        """
+        with self._cond:
+            now = time.monotonic()
+            return {
+                key: (self._cache[key][0], now - self._cache[key][1])
+                for key in self.readers if key in self._cache
+            }
+
+    def is_stale(self, key: str, age: float) -> bool:
+        """A value is stale once a refresh is a full interval overdue"""
+        schedule = self.readers[key][1]
+        return age > 2 * schedule.interval + schedule.cost
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get per-sensor cadence, cost and read statistics"""
+        snapshot = self.snapshot()
+        with self._cond:
+            return {
+                key: {
+                    "interval": schedule.interval,
+                    "cost": schedule.cost,
+                    "reads": self._stats[key]["reads"],
+                    "errors": self._stats[key]["errors"],
+                    "last_duration_ms": round(self._stats[key]["last_duration"] * 1000, 2)
+                    if self._stats[key]["last_duration"] is not None else None,
+                    "age_seconds": round(snapshot[key][1], 3) if key in snapshot else None
+                }
+                for key, (_, schedule) in self.readers.items()
+            }
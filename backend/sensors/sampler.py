@@ -0,0 +1,156 @@
+"""
+Background Sensor Sampler
+Polls each sensor at its native rate into a fixed-size ring buffer so
+API endpoints read the latest value without touching the hardware
+"""
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime
+import threading
+import time
+from utils import log
+
+
+class ReadingRingBuffer:
+    """
+    Preallocated ring of (timestamp, value) slots
+
+    Writers serialize on a lock; readers never lock. A slot is replaced with
+    a single tuple assignment and the write counter is bumped afterwards, so
+    a reader always sees a complete (timestamp, value) pair.
+    """
+
+    def __init__(self, capacity: int = 256):
+        """
+        Initialize ring buffer
+
+        Args:
+            capacity: Number of readings kept per sensor
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        self.capacity = capacity
+        self._slots: List[Optional[Tuple[datetime, Any]]] = [None] * capacity
+        self._count = 0
+        self._write_lock = threading.Lock()
+
+    def append(self, value: Any, timestamp: Optional[datetime] = None):
+        """Store a reading, overwriting the oldest slot when full"""
+        timestamp = timestamp or datetime.now()
+        with self._write_lock:
+            self._slots[self._count % self.capacity] = (timestamp, value)
+            self._count += 1
+
+    def latest(self) -> Optional[Tuple[datetime, Any]]:
+        """Get the newest (timestamp, value) pair"""
+        count = self._count
+        if count == 0:
+            return None
+        return self._slots[(count - 1) % self.capacity]
+
+    def window(self, size: Optional[int] = None) -> List[Tuple[datetime, Any]]:
+        """
+        Get the newest readings, oldest first
+
+        Args:
+            size: Number of readings (defaults to everything buffered)
+        """
+        count = self._count
+        available = min(count, self.capacity)
+        size = available if size is None else max(0, min(size, available))
+        return [self._slots[i % self.capacity] for i in range(count - size, count)]
+
+    def since(self, timestamp: datetime) -> List[Tuple[datetime, Any]]:
+        """Get buffered readings newer than timestamp, oldest first"""
+        return [entry for entry in self.window() if entry[0] > timestamp]
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total_writes(self) -> int:
+        """Number of readings ever written"""
+        return self._count
+
+
+class SensorSampler:
+    """Background service that keeps every sensor's ring buffer fresh"""
+
+    def __init__(self, sensors: List[Any]):
+        """
+        Initialize sampler
+
+        Args:
+            sensors: BaseSensor instances to poll
+        """
+        self.sensors = sensors
+        self._threads: Dict[str, threading.Thread] = {}
+        self._stop_event = threading.Event()
+        self._errors: Dict[str, int] = {sensor.name: 0 for sensor in sensors}
+
+    @property
+    def is_running(self) -> bool:
+        """Whether sampling threads are active"""
+        return any(thread.is_alive() for thread in self._threads.values())
+
+    def start(self):
+        """Start one sampling thread per enabled sensor"""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._threads = {}
+        for sensor in self.sensors:
+            if not sensor.is_ready():
+                continue
+            thread = threading.Thread(
+                target=self._run,
+                args=(sensor,),
+                name=f"sampler-{sensor.name}",
+                daemon=True
+            )
+            self._threads[sensor.name] = thread
+            thread.start()
+
+        log.info(f"Sensor sampler started for: {list(self._threads.keys())}")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop sampling threads"""
+        self._stop_event.set()
+        for thread in self._threads.values():
+            thread.join(timeout=timeout)
+        self._threads = {}
+        log.info("Sensor sampler stopped")
+
+    def _run(self, sensor: Any):
+        """Poll one sensor on a fixed schedule until stopped"""
+        next_deadline = time.monotonic()
+
+        while not self._stop_event.is_set():
+            try:
+                if sensor.read() is None:
+                    self._errors[sensor.name] += 1
+            except Exception as e:
+                self._errors[sensor.name] += 1
+                log.error(f"Sampler failed to read {sensor.name}: {e}")
+
+            next_deadline += sensor.sample_interval
+            delay = next_deadline - time.monotonic()
+            if delay < 0:
+                # Read overran its slot - resync instead of bursting to catch up
+                next_deadline = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get per-sensor sampling statistics"""
+        status = {}
+        for sensor in self.sensors:
+            thread = self._threads.get(sensor.name)
+            status[sensor.name] = {
+                "running": bool(thread and thread.is_alive()),
+                "sample_interval": sensor.sample_interval,
+                "samples": sensor.buffer.total_writes,
+                "errors": self._errors.get(sensor.name, 0),
+                "age_seconds": sensor.get_reading_age()
+            }
+        return status
@@ -0,0 +1,291 @@
+"""
+Sensor Owner
+The one process that opens the sensor hardware when the API runs several
+workers. It samples every sensor and publishes the readings to shared
+memory rings; workers (SENSOR_MODE=shared) read them through SharedSensor
+views and never touch the serial/I2C devices themselves.
+
+Usage:
+    python -m sensors.sensor_owner
+"""
+from typing import Dict, Any, Optional, List
+import os
+import signal
+import threading
+import time
+from sensors.base_sensor import BaseSensor
+from sensors.ecg_sensor import ECGSensor
+from sensors.spo2_sensor import SpO2Sensor
+from sensors.temp_sensor import TemperatureSensor
+from sensors.gps_module import GPSModule
+from sensors.gps_track import gps_tracks
+from sensors.sampler import SensorSampler
+from sensors.session_recorder import SessionPlayer, session_recorder
+from sensors.shared_ring import SharedReadingRing, SharedRingReader
+from sensors.advanced_sensors import advanced_sensors
+from utils.shared_state import shared_state
+from utils import log, config
+
+OWNER_NAMESPACE = "sensor_owner"
+CALIBRATION_TIMEOUT = 30.0  # seconds a worker waits for the owner to calibrate
+
+
+def segment_name(stream: str) -> str:
+    """Shared memory segment carrying one sensor's readings"""
+    return f"{config.SHARED_SENSOR_PREFIX}-{stream.lower()}"
+
+
+def describe_sensors(ecg_sensor, spo2_sensor, temp_sensor, gps_module) -> Dict[str, Any]:
+    """Status of the four vital/GPS sensors as reported by /api/status"""
+    return {
+        "ecg": {
+            "enabled": ecg_sensor.enabled,
+            "ready": ecg_sensor.is_ready(),
+            "simulated": getattr(ecg_sensor, 'is_simulated', False),
+            "acquisition": ecg_sensor.get_acquisition_status()
+        },
+        "spo2": {
+            "enabled": spo2_sensor.enabled,
+            "ready": spo2_sensor.is_ready(),
+            "simulated": getattr(spo2_sensor, 'is_simulated', False)
+        },
+        "temperature": {
+            "enabled": temp_sensor.enabled,
+            "ready": temp_sensor.is_ready(),
+            "simulated": getattr(temp_sensor, 'is_simulated', False)
+        },
+        "gps": {
+            "enabled": gps_module.enabled,
+            "ready": gps_module.is_ready(),
+            "has_fix": gps_module.has_fix(),
+            "simulated": getattr(gps_module, 'is_simulated', False),
+            "reader": gps_module.get_reader_status()
+        }
+    }
+
+
+def request_calibration(timeout: float = CALIBRATION_TIMEOUT) -> Dict[str, bool]:
+    """
+    Ask the owner process to calibrate its sensors and wait for the results
+
+    Returns:
+        Results by sensor key (all False if the owner did not answer in time)
+    """
+    requested = time.time()
+    shared_state.set(OWNER_NAMESPACE, "calibrate_request", requested)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        calibration = shared_state.get(OWNER_NAMESPACE, "calibration")
+        if calibration and calibration.get("requested", 0) >= requested:
+            return calibration["results"]
+        time.sleep(0.2)
+    log.error("Sensor owner did not answer the calibration request")
+    return {"ecg": False, "spo2": False, "temperature": False, "gps": False}
+
+
+class SharedSensor(BaseSensor):
+    """
+    A sensor as an API worker sees it: the readings the owner publishes
+
+    read() returns the newest published reading; the hardware stays with
+    the owner process.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name, enabled=True)
+        self.buffer = SharedRingReader(segment_name(name), config.SENSOR_BUFFER_SIZE)
+
+    @property
+    def sample_interval(self) -> float:
+        """The owner's sampling period once attached (staleness checks use it)"""
+        return self.buffer.sample_interval or self._sample_interval
+
+    @sample_interval.setter
+    def sample_interval(self, value: float):
+        self._sample_interval = value
+
+    def is_ready(self) -> bool:
+        return self.enabled and self.buffer.attached
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        return self.last_reading
+
+    def calibrate(self) -> bool:
+        return request_calibration().get(self.name.lower(), False)
+
+
+class SharedGPSModule(SharedSensor):
+    """
+    GPS as an API worker sees it
+
+    Also feeds the worker's own track store from the published fixes, so
+    every worker serves the same breadcrumb trail.
+    """
+
+    # Pure functions of the last reading, shared with the hardware class
+    get_location_string = GPSModule.get_location_string
+    get_google_maps_url = GPSModule.get_google_maps_url
+    has_fix = GPSModule.has_fix
+
+    def __init__(self, name: str = "GPS"):
+        super().__init__(name)
+        self._position = 0
+        self._stop_event = threading.Event()
+        self._follower: Optional[threading.Thread] = None
+
+    def start_following(self):
+        """Start copying published fixes into gps_tracks"""
+        if self._follower is not None and self._follower.is_alive():
+            return
+        self._stop_event.clear()
+        self._follower = threading.Thread(target=self._follow, name="gps-track-follower", daemon=True)
+        self._follower.start()
+
+    def stop_following(self):
+        self._stop_event.set()
+        if self._follower is not None:
+            self._follower.join(timeout=5.0)
+            self._follower = None
+
+    def _follow(self):
+        while not self._stop_event.is_set():
+            try:
+                fixes, self._position = self.buffer.read_from(self._position)
+                status = shared_state.get(OWNER_NAMESPACE, "status") if fixes else None
+                # Random simulated positions would only draw noise as a trail
+                if status and not status["sensors"]["gps"]["simulated"]:
+                    for _, fix in fixes:
+                        gps_tracks.add_fix(config.UNIT_ID, fix["latitude"], fix["longitude"],
+                                           fix["timestamp"], fix.get("hdop"))
+            except Exception as e:
+                log.error(f"GPS track follower failed: {e}")
+            self._stop_event.wait(self.sample_interval)
+
+
+def shared_sensor_views() -> List[SharedSensor]:
+    """ECG, SpO2, temperature and GPS views for an API worker"""
+    return [SharedSensor("ECG"), SharedSensor("SpO2"), SharedSensor("Temperature"), SharedGPSModule()]
+
+
+class SensorOwner:
+    """Samples every sensor and publishes readings and status for the workers"""
+
+    def __init__(self):
+        """Open the hardware and create one shared ring per sensor"""
+        self.ecg_sensor = ECGSensor()
+        self.spo2_sensor = SpO2Sensor()
+        self.temp_sensor = TemperatureSensor()
+        self.gps_module = GPSModule()
+        self.sensors = [self.ecg_sensor, self.spo2_sensor, self.temp_sensor, self.gps_module]
+
+        # Sensors write straight into the shared rings through their buffer
+        self.rings: Dict[str, SharedReadingRing] = {}
+        for sensor in self.sensors:
+            sensor.buffer = SharedReadingRing.create(
+                segment_name(sensor.name), config.SENSOR_BUFFER_SIZE,
+                config.SHARED_SLOT_BYTES, sensor.sample_interval
+            )
+            self.rings[sensor.name] = sensor.buffer
+        self.rings[advanced_sensors.name] = SharedReadingRing.create(
+            segment_name(advanced_sensors.name), config.SENSOR_BUFFER_SIZE,
+            config.SHARED_ADVANCED_SLOT_BYTES, config.SHARED_ADVANCED_INTERVAL
+        )
+
+        self.session_player: Optional[SessionPlayer] = None
+        if config.SESSION_REPLAY_PATH:
+            self._attach_replay(config.SESSION_REPLAY_PATH)
+
+        self.sampler = SensorSampler(self.sensors)
+        self.started = time.time()
+        self._stop_event = threading.Event()
+        log.info(f"Sensor owner {os.getpid()} publishing {list(self.rings)}")
+
+    def _attach_replay(self, path: str):
+        """Replay a recorded session behind every sensor's read()"""
+        try:
+            self.session_player = SessionPlayer.open(
+                path, speed=config.SESSION_REPLAY_SPEED, loop=config.SESSION_REPLAY_LOOP
+            )
+            for sensor in self.sensors + [advanced_sensors]:
+                self.session_player.attach(sensor)
+        except Exception as e:
+            log.error(f"Failed to open sensor session {path}: {e}")
+            self.session_player = None
+
+    def run(self):
+        """Sample and publish until stop() is called"""
+        if config.SESSION_RECORD_PATH and self.session_player is None:
+            session_recorder.start(config.SESSION_RECORD_PATH)
+        self.sampler.start()
+
+        next_status = 0.0
+        while not self._stop_event.is_set():
+            self._publish_advanced()
+            if time.monotonic() >= next_status:
+                self._publish_status()
+                self._serve_calibration()
+                shared_state.purge_expired()
+                next_status = time.monotonic() + config.SENSOR_OWNER_STATUS_INTERVAL
+            self._stop_event.wait(config.SHARED_ADVANCED_INTERVAL)
+
+        self._shutdown()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _publish_advanced(self):
+        try:
+            self.rings[advanced_sensors.name].append(advanced_sensors.read_all_sensors())
+        except Exception as e:
+            log.error(f"Failed to publish advanced sensors: {e}")
+
+    def _publish_status(self):
+        try:
+            shared_state.set(OWNER_NAMESPACE, "status", {
+                "pid": os.getpid(),
+                "started": self.started,
+                "sensors": describe_sensors(*self.sensors),
+                "sampler": self.sampler.get_status(),
+                "advanced": advanced_sensors.get_schedule_status(),
+                "dropped_oversized": {name: ring.oversized for name, ring in self.rings.items() if ring.oversized}
+            })
+        except Exception as e:
+            log.error(f"Failed to publish sensor owner status: {e}")
+
+    def _serve_calibration(self):
+        """Calibrate when a worker asked since the last answer"""
+        requested = shared_state.get(OWNER_NAMESPACE, "calibrate_request")
+        answered = shared_state.get(OWNER_NAMESPACE, "calibration") or {}
+        if requested is None or answered.get("requested", 0) >= requested:
+            return
+        log.info("Calibrating all sensors...")
+        results = {
+            "ecg": self.ecg_sensor.calibrate(),
+            "spo2": self.spo2_sensor.calibrate(),
+            "temperature": self.temp_sensor.calibrate(),
+            "gps": self.gps_module.calibrate()
+        }
+        log.info(f"Calibration results: {results}")
+        shared_state.set(OWNER_NAMESPACE, "calibration", {"requested": requested, "results": results})
+
+    def _shutdown(self):
+        self.sampler.stop()
+        advanced_sensors.stop()
+        session_recorder.stop()
+        self.ecg_sensor.stop_acquisition()
+        self.gps_module.stop_reader()
+        shared_state.delete(OWNER_NAMESPACE, "status")
+        for ring in self.rings.values():
+            ring.close()
+        log.info("Sensor owner stopped")
+
+
+def main():
+    owner = SensorOwner()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: owner.stop())
+    owner.run()
+
+
+if __name__ == "__main__":
+    main()
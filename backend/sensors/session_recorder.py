@@ -0,0 +1,527 @@
+"""
+Sensor Session Recording and Replay
+Captures sensor readings to a compact binary file (fixed-width float64
+columns in chunks, plus an index) and replays them behind BaseSensor.read()
+at real time, N times faster, or as fast as the consumer reads
+
+File layout:
+    header   MAGIC + uint64 offset of the INDX chunk (0 while recording)
+    chunks   tag(4) + uint32 aux + uint64 payload length + payload
+               SCHM  JSON schema of one stream: field names and kinds
+               STRS  JSON strings appended to a stream's string table
+               DATA  aux = schema id; uint64 count, float64 timestamps[count],
+                     then one float64[count] column per schema field
+               INDX  JSON copy of all metadata plus the DATA chunk table
+An unfinished file (crash, power loss) has no INDX; the reader then
+rebuilds the index by hopping over chunk headers.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+import json
+import math
+import mmap
+import struct
+import threading
+import time
+import numpy as np
+from utils import log
+
+MAGIC = b"SRSESS\x00\x01"
+HEADER = struct.Struct("<8sQ")
+CHUNK = struct.Struct("<4sIQ")
+COUNT = struct.Struct("<Q")
+
+# Field kinds: float, int, bool, string (code into the stream's string table)
+KIND_FLOAT, KIND_INT, KIND_BOOL, KIND_STRING = "f", "i", "b", "s"
+
+
+def _flatten(value: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Nested dict -> {"a.b": scalar}; lists and other objects are not recorded"""
+    out = {} if out is None else out
+    for key, item in value.items():
+        name = f"{prefix}{key}"
+        if isinstance(item, dict):
+            _flatten(item, f"{name}.", out)
+        elif item is None or isinstance(item, (bool, int, float, str, np.generic)):
+            out[name] = item.item() if isinstance(item, np.generic) else item
+    return out
+
+
+def _kind(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return KIND_BOOL
+    if isinstance(value, int):
+        return KIND_INT
+    if isinstance(value, float):
+        return KIND_FLOAT
+    return KIND_STRING
+
+
+def _unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for key, value in flat.items():
+        node = out
+        parts = key.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return out
+
+
+class _StreamWriter:
+    """Per-stream schemas, string table and the rows waiting for the next chunk"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.schemas: Dict[Tuple[str, ...], List[int]] = {}
+        self.kinds: Dict[int, List[str]] = {}
+        self.strings: Dict[str, int] = {}
+        self.schema_id: Optional[int] = None
+        self.rows: List[List[float]] = []
+        self.times: List[float] = []
+        self.records = 0
+
+
+class SessionRecorder:
+    """
+    Appends sensor readings to a session file
+
+    Readings are buffered per stream and written as one DATA chunk every
+    CHUNK_RECORDS readings or FLUSH_SECONDS, so recording costs a dict
+    flatten per reading on the caller's thread.
+    """
+
+    CHUNK_RECORDS = 256
+    FLUSH_SECONDS = 5.0
+
+    def __init__(self):
+        self.path: Optional[Path] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._streams: Dict[str, _StreamWriter] = {}
+        self._schema_meta: List[Dict[str, Any]] = []
+        self._chunks: List[List[Any]] = []
+        self._last_flush = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def start(self, path: str) -> bool:
+        """
+        Start recording to a new file
+
+        Args:
+            path: Session file to create (overwritten if it exists)
+
+        Returns:
+            True if recording started
+        """
+        with self._lock:
+            if self._file is not None:
+                return False
+            try:
+                self.path = Path(path)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "wb")
+                self._file.write(HEADER.pack(MAGIC, 0))
+            except Exception as e:
+                log.error(f"Failed to start session recording at {path}: {e}")
+                self._file = None
+                return False
+            self._streams = {}
+            self._schema_meta = []
+            self._chunks = []
+            self._last_flush = time.monotonic()
+        log.info(f"Recording sensor session to {self.path}")
+        return True
+
+    def record(self, stream: str, reading: Dict[str, Any], timestamp: Optional[float] = None):
+        """
+        Record one reading
+
+        Args:
+            stream: Sensor / stream name
+            reading: Reading dict (nested dicts allowed)
+            timestamp: Epoch seconds (defaults to now)
+        """
+        if self._file is None or not isinstance(reading, dict):
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        flat = _flatten(reading)
+
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                writer = self._streams.get(stream)
+                if writer is None:
+                    writer = self._streams[stream] = _StreamWriter(stream)
+
+                schema_id = self._schema_for(writer, flat)
+                if schema_id != writer.schema_id:
+                    self._flush_stream(writer)
+                    writer.schema_id = schema_id
+
+                row = []
+                for (key, value), kind in zip(flat.items(), writer.kinds[schema_id]):
+                    if value is None:
+                        row.append(math.nan)
+                    elif kind == KIND_STRING:
+                        row.append(float(self._string_code(writer, str(value))))
+                    else:
+                        row.append(float(value))
+                writer.rows.append(row)
+                writer.times.append(timestamp)
+
+                if len(writer.rows) >= self.CHUNK_RECORDS:
+                    self._flush_stream(writer)
+                elif time.monotonic() - self._last_flush >= self.FLUSH_SECONDS:
+                    self._flush_all()
+            except Exception as e:
+                log.error(f"Failed to record {stream} reading: {e}")
+
+    def stop(self) -> Optional[Path]:
+        """Flush buffered readings, write the index and close the file"""
+        with self._lock:
+            if self._file is None:
+                return None
+            try:
+                self._flush_all()
+                index_offset = self._file.tell()
+                index = {
+                    "schemas": self._schema_meta,
+                    "strings": {name: list(w.strings) for name, w in self._streams.items()},
+                    "chunks": self._chunks
+                }
+                self._write_chunk(b"INDX", 0, json.dumps(index).encode())
+                self._file.seek(0)
+                self._file.write(HEADER.pack(MAGIC, index_offset))
+            except Exception as e:
+                log.error(f"Failed to finalize session recording: {e}")
+            finally:
+                self._file.close()
+                self._file = None
+            records = sum(w.records for w in self._streams.values())
+        log.info(f"Session recording saved to {self.path} ({records} readings)")
+        return self.path
+
+    def _schema_for(self, writer: _StreamWriter, flat: Dict[str, Any]) -> int:
+        """Id of the schema matching these fields, registering a new one if needed"""
+        keys = tuple(flat)
+        candidates = writer.schemas.setdefault(keys, [])
+        if writer.schema_id in candidates:
+            candidates = [writer.schema_id] + candidates
+        for schema_id in candidates:
+            if self._compatible(writer.kinds[schema_id], flat):
+                return schema_id
+
+        kinds = [_kind(value) or KIND_FLOAT for value in flat.values()]
+        schema_id = len(self._schema_meta)
+        candidates.append(schema_id)
+        writer.kinds[schema_id] = kinds
+        meta = {"id": schema_id, "stream": writer.name, "fields": [list(pair) for pair in zip(keys, kinds)]}
+        self._schema_meta.append(meta)
+        self._write_chunk(b"SCHM", schema_id, json.dumps(meta).encode())
+        return schema_id
+
+    @staticmethod
+    def _compatible(kinds: List[str], flat: Dict[str, Any]) -> bool:
+        """None fits any column and ints fit float columns; anything else needs a new schema"""
+        for value, kind in zip(flat.values(), kinds):
+            actual = _kind(value)
+            if actual is not None and actual != kind and not (actual == KIND_INT and kind == KIND_FLOAT):
+                return False
+        return True
+
+    def _string_code(self, writer: _StreamWriter, value: str) -> int:
+        code = writer.strings.get(value)
+        if code is None:
+            code = writer.strings[value] = len(writer.strings)
+            self._write_chunk(b"STRS", 0, json.dumps({"stream": writer.name, "values": [value]}).encode())
+        return code
+
+    def _flush_all(self):
+        for writer in self._streams.values():
+            self._flush_stream(writer)
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def _flush_stream(self, writer: _StreamWriter):
+        if not writer.rows:
+            return
+        count = len(writer.rows)
+        times = np.asarray(writer.times, dtype=np.float64)
+        columns = np.asarray(writer.rows, dtype=np.float64).reshape(count, -1).T  # column-major
+        payload = COUNT.pack(count) + times.tobytes() + np.ascontiguousarray(columns).tobytes()
+        offset = self._write_chunk(b"DATA", writer.schema_id, payload)
+        self._chunks.append([writer.schema_id, offset, count, float(times[0]), float(times[-1])])
+        writer.records += count
+        writer.rows = []
+        writer.times = []
+
+    def _write_chunk(self, tag: bytes, aux: int, payload: bytes) -> int:
+        """Write a chunk and return the offset of its payload"""
+        self._file.write(CHUNK.pack(tag, aux, len(payload)))
+        offset = self._file.tell()
+        self._file.write(payload)
+        return offset
+
+
+class RecordedStream:
+    """One stream of a session: timestamps plus zero-copy column views per chunk"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.strings: List[str] = []
+        self._chunks: List[Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray]] = []
+        self._starts = np.zeros(1, dtype=np.int64)
+        self.timestamps = np.empty(0, dtype=np.float64)
+
+    def _finish(self):
+        counts = [len(times) for _, times, _ in self._chunks]
+        self._starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.timestamps = (np.concatenate([times for _, times, _ in self._chunks])
+                           if self._chunks else np.empty(0, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Decode record `index` back into a reading dict"""
+        chunk = int(np.searchsorted(self._starts, index, side="right")) - 1
+        fields, _, columns = self._chunks[chunk]
+        row = columns[:, index - self._starts[chunk]]
+
+        flat = {}
+        for (key, kind), value in zip(fields, row.tolist()):
+            if value != value:  # NaN
+                flat[key] = None
+            elif kind == KIND_INT:
+                flat[key] = int(value)
+            elif kind == KIND_BOOL:
+                flat[key] = bool(value)
+            elif kind == KIND_STRING:
+                flat[key] = self.strings[int(value)]
+            else:
+                flat[key] = value
+        return _unflatten(flat)
+
+    def column(self, key: str) -> np.ndarray:
+        """All values of one numeric field across the stream (NaN where absent)"""
+        parts = []
+        for fields, times, columns in self._chunks:
+            names = [name for name, _ in fields]
+            parts.append(columns[names.index(key)] if key in names else np.full(len(times), np.nan))
+        return np.concatenate(parts) if parts else np.empty(0)
+
+
+class SessionReader:
+    """Memory-mapped read access to a session file"""
+
+    def __init__(self, path: str):
+        """
+        Open a session file
+
+        Args:
+            path: Session file written by SessionRecorder
+        """
+        self.path = Path(path)
+        self._handle = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a sensor session file")
+
+        self.complete = index_offset > 0
+        if self.complete:
+            tag, _, length = CHUNK.unpack_from(self._mmap, index_offset)
+            index = json.loads(self._mmap[index_offset + CHUNK.size:index_offset + CHUNK.size + length])
+        else:
+            index = self._scan()
+            log.warning(f"{self.path} was not finalized; index rebuilt from {len(index['chunks'])} chunks")
+
+        schemas = {meta["id"]: meta for meta in index["schemas"]}
+        self.streams: Dict[str, RecordedStream] = {}
+        for meta in index["schemas"]:
+            self.streams.setdefault(meta["stream"], RecordedStream(meta["stream"]))
+        for name, values in index["strings"].items():
+            if name in self.streams:
+                self.streams[name].strings = values
+
+        for schema_id, offset, count, _, _ in index["chunks"]:
+            meta = schemas[schema_id]
+            fields = [tuple(pair) for pair in meta["fields"]]
+            base = offset + COUNT.size
+            times = np.frombuffer(self._mmap, dtype=np.float64, count=count, offset=base)
+            columns = np.frombuffer(
+                self._mmap, dtype=np.float64, count=count * len(fields), offset=base + count * 8
+            ).reshape(len(fields), count)
+            self.streams[meta["stream"]]._chunks.append((fields, times, columns))
+
+        for stream in self.streams.values():
+            stream._finish()
+
+    def _scan(self) -> Dict[str, Any]:
+        """Rebuild the index of an unfinished file from its chunk headers"""
+        index = {"schemas": [], "strings": {}, "chunks": []}
+        position = HEADER.size
+        size = len(self._mmap)
+        while position + CHUNK.size <= size:
+            tag, aux, length = CHUNK.unpack_from(self._mmap, position)
+            payload = position + CHUNK.size
+            if payload + length > size:
+                break  # Torn final write
+            if tag == b"SCHM":
+                index["schemas"].append(json.loads(self._mmap[payload:payload + length]))
+            elif tag == b"STRS":
+                entry = json.loads(self._mmap[payload:payload + length])
+                index["strings"].setdefault(entry["stream"], []).extend(entry["values"])
+            elif tag == b"DATA":
+                (count,) = COUNT.unpack_from(self._mmap, payload)
+                times = np.frombuffer(self._mmap, dtype=np.float64, count=count, offset=payload + COUNT.size)
+                index["chunks"].append([aux, payload, count, float(times[0]), float(times[-1])])
+            position = payload + length
+        return index
+
+    @property
+    def start_time(self) -> Optional[float]:
+        starts = [s.timestamps[0] for s in self.streams.values() if len(s)]
+        return float(min(starts)) if starts else None
+
+    @property
+    def end_time(self) -> Optional[float]:
+        ends = [s.timestamps[-1] for s in self.streams.values() if len(s)]
+        return float(max(ends)) if ends else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Stream names, record counts and duration"""
+        start, end = self.start_time, self.end_time
+        return {
+            "path": str(self.path),
+            "complete": self.complete,
+            "bytes": len(self._mmap),
+            "duration": round(end - start, 3) if start is not None else 0.0,
+            "streams": {name: len(stream) for name, stream in self.streams.items()}
+        }
+
+    def close(self):
+        # Drop the chunk views before unmapping
+        self.streams = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A caller still holds a column view; the map closes with it
+        self._handle.close()
+
+
+class SessionPlayer:
+    """
+    Shared replay clock for every stream of a session
+
+    speed 1.0 replays in real time, N replays N times faster, and 0 hands
+    out the next record on every read regardless of time.
+    """
+
+    def __init__(self, reader: SessionReader, speed: float = 1.0, loop: bool = True):
+        """
+        Initialize player
+
+        Args:
+            reader: Open session
+            speed: Playback rate (0 = as fast as possible)
+            loop: Start over at the end instead of running dry
+        """
+        self.reader = reader
+        self.speed = speed
+        self.loop = loop
+        self.origin = reader.start_time or 0.0
+        self.duration = max((reader.end_time or 0.0) - self.origin, 1e-6)
+        self._started = time.monotonic()
+
+    @classmethod
+    def open(cls, path: str, speed: float = 1.0, loop: bool = True) -> "SessionPlayer":
+        return cls(SessionReader(path), speed, loop)
+
+    def restart(self):
+        self._started = time.monotonic()
+
+    def session_time(self) -> Optional[float]:
+        """Recorded time now being replayed, or None once a non-looping replay ends"""
+        elapsed = (time.monotonic() - self._started) * self.speed
+        if elapsed > self.duration:
+            if not self.loop:
+                return None
+            elapsed %= self.duration
+        return self.origin + elapsed
+
+    def cursor(self, stream: str) -> Optional["ReplayCursor"]:
+        """Cursor over one recorded stream (None if the session lacks it)"""
+        recorded = self.reader.streams.get(stream)
+        return ReplayCursor(self, recorded) if recorded is not None and len(recorded) else None
+
+    def attach(self, sensor: Any) -> bool:
+        """
+        Replay a stream behind sensor.read()
+
+        Args:
+            sensor: Object with `name` and a `replay` attribute (BaseSensor)
+
+        Returns:
+            True if the session has a stream for this sensor
+        """
+        cursor = self.cursor(sensor.name)
+        sensor.replay = cursor
+        if cursor is not None:
+            # The recording stands in for the hardware, so read even if disabled in config
+            sensor.enabled = True
+            log.info(f"{sensor.name} replaying {len(cursor.stream)} recorded readings "
+                     f"({'max' if not self.speed else f'{self.speed:g}x'} speed)")
+        return cursor is not None
+
+
+class ReplayCursor:
+    """Position of one consumer within a recorded stream"""
+
+    def __init__(self, player: SessionPlayer, stream: RecordedStream):
+        self.player = player
+        self.stream = stream
+        self.position = -1
+
+    def next(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the reading the sensor would produce now
+
+        Returns:
+            Reading dict, or None before the stream's first record or after
+            a non-looping session ends
+        """
+        count = len(self.stream)
+        if not self.player.speed:
+            self.position += 1
+            if self.position >= count:
+                if not self.player.loop:
+                    return None
+                self.position = 0
+            index = self.position
+        else:
+            now = self.player.session_time()
+            if now is None:
+                return None
+            index = int(np.searchsorted(self.stream.timestamps, now, side="right")) - 1
+            if index < 0:
+                return None
+            self.position = index
+
+        # Decoded fresh each time, so consumers may annotate the dict
+        return self.stream.record(index)
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.player.loop and self.position >= len(self.stream) - 1
+
+
+# Global instance
+session_recorder = SessionRecorder()
@@ -0,0 +1,313 @@
+"""
+Shared Reading Ring
+The ReadingRingBuffer laid out in a named shared memory segment, so the
+sensor owner process publishes readings that every API worker reads
+without opening the hardware
+"""
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+from multiprocessing import shared_memory, resource_tracker
+import os
+import struct
+import threading
+import time
+from utils import log
+from utils.json_helpers import dumps_bytes, loads_bytes
+
+MAGIC = b"SRR1"
+HEADER_SIZE = 64
+# magic, capacity, slot bytes, owner pid, sample interval - fixed at creation
+LAYOUT = struct.Struct("<4sII4xqd")
+COUNT = struct.Struct("<Q")  # readings ever written, at COUNT_OFFSET
+COUNT_OFFSET = 40
+SEQ = struct.Struct("<Q")  # per-slot sequence: odd while being written
+SLOT_META = struct.Struct("<dI4x")  # timestamp, payload length
+SLOT_HEADER = SEQ.size + SLOT_META.size
+
+
+class SharedReadingRing:
+    """
+    Fixed ring of JSON-encoded (timestamp, value) slots in shared memory
+
+    One writer process, any number of reader processes, no locks between
+    them. Reading n is written into slot n % capacity under a sequence
+    number that is odd while the slot is being filled and 2n + 2 once
+    complete; the write counter is bumped afterwards. A reader copies the
+    slot and keeps it only if the sequence read before and after the copy
+    is the one expected for that reading - anything else means the slot was
+    overwritten meanwhile, and that reading is skipped.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self.owner = owner
+        magic, self.capacity, self.slot_size, self.owner_pid, self.sample_interval = LAYOUT.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory segment {shm.name} is not a reading ring")
+        self._stride = SLOT_HEADER + self.slot_size
+        self._write_lock = threading.Lock()
+        self._decoded: Tuple[int, Optional[Tuple[datetime, Any]]] = (-1, None)
+        self.oversized = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @classmethod
+    def create(cls, name: str, capacity: int, slot_size: int, sample_interval: float) -> "SharedReadingRing":
+        """
+        Create the segment as its writer, replacing one left by a dead owner
+
+        Args:
+            name: Segment name
+            capacity: Number of readings kept
+            slot_size: Largest encoded reading in bytes
+            sample_interval: Writer's sampling period in seconds, for readers' staleness checks
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity * (SLOT_HEADER + slot_size))
+        shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        LAYOUT.pack_into(shm.buf, 0, MAGIC, capacity, slot_size, os.getpid(), sample_interval)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedReadingRing":
+        """
+        Open an existing segment as a reader
+
+        Raises:
+            FileNotFoundError: No owner has created the segment yet
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        # Python < 3.13 tracks attached segments too and would unlink the
+        # owner's segment when this reader exits
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(shm, owner=False)
+
+    def _offset(self, index: int) -> int:
+        return HEADER_SIZE + (index % self.capacity) * self._stride
+
+    def append(self, value: Any, timestamp: Optional[datetime] = None):
+        """Store a reading, overwriting the oldest slot when full"""
+        timestamp = timestamp or datetime.now()
+        payload = dumps_bytes(value)
+        if len(payload) > self.slot_size:
+            self.oversized += 1
+            log.error(f"Reading for {self.name} is {len(payload)} bytes, slot holds {self.slot_size} - dropped")
+            return
+
+        with self._write_lock:
+            count = COUNT.unpack_from(self._buf, COUNT_OFFSET)[0]
+            offset = self._offset(count)
+            SEQ.pack_into(self._buf, offset, 2 * count + 1)
+            SLOT_META.pack_into(self._buf, offset + SEQ.size, timestamp.timestamp(), len(payload))
+            start = offset + SLOT_HEADER
+            self._buf[start:start + len(payload)] = payload
+            SEQ.pack_into(self._buf, offset, 2 * count + 2)
+            COUNT.pack_into(self._buf, COUNT_OFFSET, count + 1)
+
+    def _read(self, index: int) -> Optional[Tuple[datetime, Any]]:
+        """Reading number `index`, or None if it has been overwritten"""
+        cached_index, cached = self._decoded
+        if cached_index == index:
+            return cached
+
+        offset = self._offset(index)
+        expected = 2 * index + 2
+        if SEQ.unpack_from(self._buf, offset)[0] != expected:
+            return None
+        timestamp, length = SLOT_META.unpack_from(self._buf, offset + SEQ.size)
+        start = offset + SLOT_HEADER
+        payload = bytes(self._buf[start:start + min(length, self.slot_size)])
+        if SEQ.unpack_from(self._buf, offset)[0] != expected:
+            return None
+        try:
+            entry = (datetime.fromtimestamp(timestamp), loads_bytes(payload))
+        except ValueError:
+            return None  # Torn copy
+        self._decoded = (index, entry)
+        return entry
+
+    @property
+    def total_writes(self) -> int:
+        """Number of readings ever written"""
+        return COUNT.unpack_from(self._buf, COUNT_OFFSET)[0]
+
+    def latest(self) -> Optional[Tuple[datetime, Any]]:
+        """Get the newest (timestamp, value) pair"""
+        for _ in range(3):
+            count = self.total_writes
+            if count == 0:
+                return None
+            entry = self._read(count - 1)
+            if entry is not None:
+                return entry
+        return None
+
+    def window(self, size: Optional[int] = None) -> List[Tuple[datetime, Any]]:
+        """
+        Get the newest readings, oldest first
+
+        Args:
+            size: Number of readings (defaults to everything buffered)
+        """
+        count = self.total_writes
+        available = min(count, self.capacity)
+        size = available if size is None else max(0, min(size, available))
+        entries = (self._read(i) for i in range(count - size, count))
+        return [entry for entry in entries if entry is not None]
+
+    def since(self, timestamp: datetime) -> List[Tuple[datetime, Any]]:
+        """Get buffered readings newer than timestamp, oldest first"""
+        return [entry for entry in self.window() if entry[0] > timestamp]
+
+    def read_from(self, position: int) -> Tuple[List[Tuple[datetime, Any]], int]:
+        """
+        Readings written since `position` (a previous total_writes)
+
+        Returns:
+            (readings still buffered, oldest first; new position)
+        """
+        count = self.total_writes
+        if position > count:
+            position = 0  # A restarted owner counts from zero again
+        start = max(position, count - self.capacity)
+        entries = (self._read(i) for i in range(start, count))
+        return [entry for entry in entries if entry is not None], count
+
+    def __len__(self) -> int:
+        return min(self.total_writes, self.capacity)
+
+    def owner_alive(self) -> bool:
+        """Whether the process that created the segment still exists"""
+        try:
+            os.kill(self.owner_pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def close(self):
+        """Unmap the segment; the owner also removes it"""
+        self._buf = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedRingReader:
+    """
+    Reader that attaches to a published ring when it appears
+
+    Stands in for a sensor's ring buffer in API workers. Until the owner has
+    created the segment it reads as empty; when the owner restarts (a new
+    segment under the same name) it reattaches.
+    """
+
+    def __init__(self, name: str, capacity: int, retry_interval: float = 1.0):
+        """
+        Args:
+            name: Segment name
+            capacity: Expected ring size, reported while detached
+            retry_interval: Seconds between attach attempts and owner checks
+        """
+        self.name = name
+        self.capacity = capacity
+        self.retry_interval = retry_interval
+        self._ring: Optional[SharedReadingRing] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def ring(self) -> Optional[SharedReadingRing]:
+        """The attached ring, (re)attaching at most once per retry interval"""
+        now = time.monotonic()
+        if now - self._checked < self.retry_interval:
+            return self._ring
+        with self._lock:
+            if now - self._checked < self.retry_interval:
+                return self._ring
+            self._checked = now
+            ring = self._ring
+            if ring is not None and ring.owner_alive():
+                return ring
+            try:
+                fresh = SharedReadingRing.attach(self.name)
+            except FileNotFoundError:
+                return ring  # Keep serving the last data until an owner appears
+            except Exception as e:
+                log.error(f"Failed to attach shared ring {self.name}: {e}")
+                return ring
+            if ring is not None and fresh.owner_pid == ring.owner_pid:
+                fresh.close()  # Same (dead) owner's segment, nothing newer yet
+                return ring
+            if ring is not None:
+                ring.close()
+            log.info(f"Attached shared ring {self.name} (owner pid {fresh.owner_pid})")
+            self._ring = fresh
+            return fresh
+
+    @property
+    def attached(self) -> bool:
+        """Attached to a ring whose owner is still running"""
+        ring = self.ring()
+        return ring is not None and ring.owner_alive()
+
+    @property
+    def sample_interval(self) -> Optional[float]:
+        ring = self.ring()
+        return ring.sample_interval if ring is not None else None
+
+    @property
+    def owner_pid(self) -> Optional[int]:
+        ring = self.ring()
+        return ring.owner_pid if ring is not None else None
+
+    def latest(self) -> Optional[Tuple[datetime, Any]]:
+        ring = self.ring()
+        return ring.latest() if ring is not None else None
+
+    def window(self, size: Optional[int] = None) -> List[Tuple[datetime, Any]]:
+        ring = self.ring()
+        return ring.window(size) if ring is not None else []
+
+    def since(self, timestamp: datetime) -> List[Tuple[datetime, Any]]:
+        ring = self.ring()
+        return ring.since(timestamp) if ring is not None else []
+
+    def read_from(self, position: int) -> Tuple[List[Tuple[datetime, Any]], int]:
+        ring = self.ring()
+        return ring.read_from(position) if ring is not None else ([], position)
+
+    def append(self, value: Any, timestamp: Optional[datetime] = None):
+        raise RuntimeError(f"{self.name} is published by the sensor owner process")
+
+    @property
+    def total_writes(self) -> int:
+        ring = self.ring()
+        return ring.total_writes if ring is not None else 0
+
+    def __len__(self) -> int:
+        ring = self.ring()
+        return len(ring) if ring is not None else 0
+
+    def close(self):
+        with self._lock:
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
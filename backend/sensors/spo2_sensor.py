@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional
 import time
 import random
 from sensors.base_sensor import BaseSensor
+from sensors.spo2_estimator import SpO2Estimator, PPGReplaySource, read_fifo_burst
 from utils import log, config
 
 # Try to import MAX30102 library
@@ -31,10 +32,15 @@ class SpO2Sensor(BaseSensor):
             enabled = config.ENABLE_SPO2_SENSOR
         
         super().__init__("SpO2", enabled)
+        self.sample_interval = 0.5  # Drain the 32-sample FIFO well before it overflows
         self.is_simulated = not HAS_MAX30102
         self.sensor = None
+        self.estimator = SpO2Estimator(config.SPO2_SAMPLE_RATE)
+        self.overflows = 0
         
-        if self.enabled and HAS_MAX30102:
+        if self.enabled and config.SPO2_REPLAY_FIXTURE:
+            self._init_replay(config.SPO2_REPLAY_FIXTURE)
+        elif self.enabled and HAS_MAX30102:
             self._init_sensor()
     
     def _init_sensor(self):
@@ -48,6 +54,37 @@ class SpO2Sensor(BaseSensor):
             self.enabled = False
             self.is_simulated = True
     
+    def _init_replay(self, path: str):
+        """Replay a recorded red/IR fixture instead of the hardware"""
+        try:
+            self.sensor = PPGReplaySource(path)
+            self.estimator = SpO2Estimator(self.sensor.sample_rate)
+            self.is_simulated = False
+            log.info(f"SpO2 sensor replaying {path}")
+        except Exception as e:
+            log.error(f"Failed to load SpO2 replay fixture {path}: {e}")
+            self.is_simulated = True
+    
+    def _read_burst(self) -> tuple:
+        """
+        Read the samples collected since the last call
+        
+        Returns:
+            Tuple of (red, ir) sample sequences
+        """
+        bus = getattr(self.sensor, "bus", None)
+        if bus is not None:
+            # Drain the FIFO with block transfers instead of per-sample reads
+            red, ir, overflow = read_fifo_burst(bus, self.sensor.address)
+            if overflow:
+                # Samples are missing, so the window no longer holds a continuous trace
+                self.overflows += overflow
+                self.estimator.reset()
+            return red, ir
+        
+        amount = max(1, int(round(self.sample_interval * self.estimator.sample_rate)))
+        return self.sensor.read_sequential(amount)
+    
     def read(self) -> Optional[Dict[str, Any]]:
         """
         Read SpO2 and heart rate data
@@ -57,6 +94,8 @@ class SpO2Sensor(BaseSensor):
         """
         if not self.is_ready():
             return None
+        if self.replay is not None:
+            return self._read_replay()
         
         try:
             if self.is_simulated:
@@ -66,9 +105,15 @@ class SpO2Sensor(BaseSensor):
                 confidence = random.uniform(0.8, 1.0)
             else:
                 # Read from actual sensor
-                red, ir = self.sensor.read_sequential()
-                spo2, heart_rate = self._calculate_spo2_hr(red, ir)
-                confidence = self._calculate_confidence(red, ir)
+                red, ir = self._read_burst()
+                self.estimator.push(red, ir)
+                estimate = self.estimator.estimate()
+                if estimate is None:
+                    # Still filling the window, or no finger on the sensor
+                    return None
+                spo2 = estimate["spo2"]
+                heart_rate = estimate["heart_rate"]
+                confidence = estimate["confidence"]
             
             reading = {
                 "spo2": spo2,
@@ -76,6 +121,8 @@ class SpO2Sensor(BaseSensor):
                 "confidence": confidence,
                 "unit": "%"
             }
+            if not self.is_simulated:
+                reading["perfusion_index"] = estimate["perfusion_index"]
             
             self._update_reading(reading)
             log.debug(f"SpO2 reading: {spo2}%, HR={heart_rate} bpm")
@@ -86,27 +133,6 @@ class SpO2Sensor(BaseSensor):
             log.error(f"Failed to read SpO2 sensor: {e}")
             return None
     
-    def _calculate_spo2_hr(self, red_data, ir_data) -> tuple:
-        """
-        Calculate SpO2 and heart rate from raw sensor data
-        
-        Args:
-            red_data: Red LED sensor data
-            ir_data: Infrared LED sensor data
-            
-        Returns:
-            Tuple of (spo2, heart_rate)
-        """
-        # Simplified calculation - in production use proper algorithms
-        # like the one from Maxim Integrated
-        spo2 = 97  # Placeholder
-        heart_rate = 75  # Placeholder
-        return spo2, heart_rate
-    
-    def _calculate_confidence(self, red_data, ir_data) -> float:
-        """Calculate reading confidence based on signal quality"""
-        return 0.9  # Placeholder
-    
     def calibrate(self) -> bool:
         """Calibrate SpO2 sensor"""
         log.info("Calibrating SpO2 sensor...")
@@ -117,6 +143,7 @@ class SpO2Sensor(BaseSensor):
                 self.sensor.shutdown()
                 time.sleep(0.5)
                 self.sensor.setup()
+                self.estimator.reset()
                 log.info("SpO2 calibration complete")
                 return True
             except Exception as e:
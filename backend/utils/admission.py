@@ -0,0 +1,130 @@
+"""
+Admission control for offloaded work
+Priority-ordered execution slots shared by the heavy pipeline stages, so a
+burst of low-priority work cannot delay an emergency assessment
+"""
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+# Priority classes, most urgent first
+PRIORITY_CLASSES = {"critical": 0, "normal": 1, "low": 2}
+
+
+class Overloaded(RuntimeError):
+    """A call was shed instead of queued"""
+
+    def __init__(self, stage: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"Stage {stage} overloaded: {reason}")
+        self.stage = stage
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Fixed number of execution slots handed out by priority
+
+    Waiters are served most urgent first, FIFO within a class. The last
+    `reserved` free slots only go to critical work, so an assessment finds a
+    slot even while chat and PDF calls occupy everything else.
+    """
+
+    def __init__(self, slots: int, reserved: int = 1):
+        """
+        Args:
+            slots: Concurrent admitted calls
+            reserved: Slots kept free for critical calls
+        """
+        self.slots = max(1, slots)
+        self.reserved = max(0, min(reserved, self.slots - 1))
+        self.in_use = 0
+        self._waiters: List[list] = []  # heap of [priority, seq, future]
+        self._seq = itertools.count()
+
+    def _can_take(self, priority: int) -> bool:
+        free = self.slots - self.in_use
+        return free > (0 if priority == 0 else self.reserved)
+
+    def _waiting_ahead(self, priority: int) -> bool:
+        return any(not future.done() and p <= priority for p, _, future in self._waiters)
+
+    def would_wait(self, priority: int) -> bool:
+        """True if a call of this priority cannot start right now"""
+        return self._waiting_ahead(priority) or not self._can_take(priority)
+
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int, timeout: Optional[float] = None):
+        """
+        Wait for a slot
+
+        Raises:
+            asyncio.TimeoutError: No slot within timeout
+        """
+        if not self._waiting_ahead(priority) and self._can_take(priority):
+            self.in_use += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), future])
+        try:
+            await asyncio.wait_for(future, timeout) if timeout else await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release()  # Granted just as the wait gave up
+            else:
+                future.cancel()
+                self._grant()  # A slot may be usable by someone behind us
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._grant()
+
+    def _grant(self):
+        """Hand free slots to the most urgent waiters"""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_take(priority):
+                break
+            heapq.heappop(self._waiters)
+            self.in_use += 1
+            future.set_result(None)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "reserved_critical": self.reserved,
+            "in_use": self.in_use,
+            "waiting": self.waiting()
+        }
+
+
+class WaitStats:
+    """Queue-wait times of the most recent calls, in seconds"""
+
+    def __init__(self, size: int = 1024):
+        self._waits = deque(maxlen=size)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self._waits.append(seconds)
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, all-time max and recent p50/p95/p99 in milliseconds"""
+        result = {"count": self.count, "max_ms": round(self.max * 1000, 2)}
+        if self._waits:
+            p50, p95, p99 = np.percentile(np.fromiter(self._waits, dtype=np.float64), [50, 95, 99]) * 1000
+            result.update(p50_ms=round(p50, 2), p95_ms=round(p95, 2), p99_ms=round(p99, 2))
+        return result
@@ -28,10 +28,31 @@ class Config:
     DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/smart_rescuer.db")
     
     # AI Models
+    ENABLE_AI = os.getenv("ENABLE_AI", "True").lower() == "true"
     AI_MODEL_PATH = Path(os.getenv("AI_MODEL_PATH", BASE_DIR / "ai_engine" / "models"))
     INJURY_MODEL_NAME = os.getenv("INJURY_MODEL_NAME", "injury_detector.tflite")
     SEVERITY_MODEL_NAME = os.getenv("SEVERITY_MODEL_NAME", "severity_scorer.onnx")
     CHATBOT_MODEL_NAME = os.getenv("CHATBOT_MODEL_NAME", "medalpaca")
+    CHAT_HISTORY_MAX = int(os.getenv("CHAT_HISTORY_MAX", "40"))  # messages kept per chat session
+    CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "86400"))  # seconds an idle chat session is kept
+    
+    # Rule-based fallback works on thumbnails at most this many pixels per side
+    RULE_BASED_MAX_SIDE = int(os.getenv("RULE_BASED_MAX_SIDE", "320"))
+    
+    # Inference result cache (empty disk path keeps it in memory only)
+    INFERENCE_CACHE_ENABLED = os.getenv("INFERENCE_CACHE_ENABLED", "True").lower() == "true"
+    INFERENCE_CACHE_MAX_BYTES = int(os.getenv("INFERENCE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    INFERENCE_CACHE_TTL = float(os.getenv("INFERENCE_CACHE_TTL", "3600"))  # seconds
+    INFERENCE_CACHE_DISK_PATH = os.getenv("INFERENCE_CACHE_DISK_PATH", "")
+    
+    # Inference pool and batching
+    INTERPRETER_POOL_SIZE = int(os.getenv("INTERPRETER_POOL_SIZE", str(max(1, (os.cpu_count() or 2) // 2))))
+    INTERPRETER_NUM_THREADS = int(os.getenv("INTERPRETER_NUM_THREADS", "2"))
+    INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "True").lower() == "true"
+    INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "8"))
+    INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+    BATCH_DECODE_WORKERS = int(os.getenv("BATCH_DECODE_WORKERS", str(min(4, os.cpu_count() or 1))))  # photos decoded in parallel
+    TRIAGE_MAX_PATIENTS = int(os.getenv("TRIAGE_MAX_PATIENTS", "64"))  # patients per batch triage request
     
     # Sensors
     ENABLE_ECG_SENSOR = os.getenv("ENABLE_ECG_SENSOR", "False").lower() == "true"
@@ -39,13 +60,87 @@ class Config:
     ENABLE_TEMP_SENSOR = os.getenv("ENABLE_TEMP_SENSOR", "False").lower() == "true"
     ENABLE_GPS = os.getenv("ENABLE_GPS", "False").lower() == "true"
     
+    # Sensor Acquisition
+    CONCURRENT_SENSOR_READS = os.getenv("CONCURRENT_SENSOR_READS", "True").lower() == "true"
+    SENSOR_READ_TIMEOUT = float(os.getenv("SENSOR_READ_TIMEOUT", "2.0"))  # seconds
+    ECG_BLOCK_SIZE = int(os.getenv("ECG_BLOCK_SIZE", "40"))  # samples per acquisition block
+    ECG_ACQUISITION_BUFFERS = int(os.getenv("ECG_ACQUISITION_BUFFERS", "16"))  # blocks kept for readers
+    SPO2_SAMPLE_RATE = float(os.getenv("SPO2_SAMPLE_RATE", "25"))  # FIFO output rate in Hz
+    SPO2_REPLAY_FIXTURE = os.getenv("SPO2_REPLAY_FIXTURE", "")  # recorded red/IR .npz instead of hardware
+    ENABLE_BACKGROUND_SAMPLER = os.getenv("ENABLE_BACKGROUND_SAMPLER", "True").lower() == "true"
+    SENSOR_SAMPLE_INTERVAL = float(os.getenv("SENSOR_SAMPLE_INTERVAL", "1.0"))  # seconds
+    SENSOR_BUFFER_SIZE = int(os.getenv("SENSOR_BUFFER_SIZE", "256"))  # readings per sensor
+    ENABLE_ADVANCED_SCHEDULER = os.getenv("ENABLE_ADVANCED_SCHEDULER", "True").lower() == "true"
+    ADVANCED_SENSOR_WORKERS = int(os.getenv("ADVANCED_SENSOR_WORKERS", "4"))  # concurrent suite reads
+    SESSION_RECORD_PATH = os.getenv("SESSION_RECORD_PATH", "")  # record sensor readings to this file
+    SESSION_REPLAY_PATH = os.getenv("SESSION_REPLAY_PATH", "")  # replay a recorded session instead of hardware
+    SESSION_REPLAY_SPEED = float(os.getenv("SESSION_REPLAY_SPEED", "1.0"))  # 0 = as fast as possible
+    SESSION_REPLAY_LOOP = os.getenv("SESSION_REPLAY_LOOP", "True").lower() == "true"
+    
+    # Multi-worker deployments - one sensor owner process publishes readings to shared memory
+    SENSOR_MODE = os.getenv("SENSOR_MODE", "local").lower()  # local = this process owns the sensors; shared = read the owner's
+    SHARED_SENSOR_PREFIX = os.getenv("SHARED_SENSOR_PREFIX", "smart-rescuer")  # shared memory segment names
+    SHARED_SLOT_BYTES = int(os.getenv("SHARED_SLOT_BYTES", "2048"))  # largest encoded vital/GPS reading
+    SHARED_ADVANCED_SLOT_BYTES = int(os.getenv("SHARED_ADVANCED_SLOT_BYTES", "8192"))  # largest advanced suite snapshot
+    SHARED_ADVANCED_INTERVAL = float(os.getenv("SHARED_ADVANCED_INTERVAL", "0.5"))  # seconds between suite snapshots
+    SENSOR_OWNER_STATUS_INTERVAL = float(os.getenv("SENSOR_OWNER_STATUS_INTERVAL", "2.0"))  # seconds
+    SHARED_STATE_PATH = Path(os.getenv("SHARED_STATE_PATH") or BASE_DIR / "shared_state.db")  # state shared by workers
+    
+    # Concurrency - blocking work offloaded from the event loop
+    STAGE_CONCURRENCY = {
+        "assessment": int(os.getenv("STAGE_LIMIT_ASSESSMENT", "2")),
+        "sensors": int(os.getenv("STAGE_LIMIT_SENSORS", "2")),
+        "dispatch": int(os.getenv("STAGE_LIMIT_DISPATCH", "4")),
+        "pdf": int(os.getenv("STAGE_LIMIT_PDF", "2")),
+        "chat": int(os.getenv("STAGE_LIMIT_CHAT", "2")),
+        "io": int(os.getenv("STAGE_LIMIT_IO", "2")),
+    }
+    PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "2"))  # 0 = threads only
+    
+    # Admission control - prioritized stages share ADMISSION_SLOTS, the most urgent first
+    STAGE_PRIORITY = {
+        "assessment": os.getenv("STAGE_PRIORITY_ASSESSMENT", "critical"),
+        "chat": os.getenv("STAGE_PRIORITY_CHAT", "low"),
+        "pdf": os.getenv("STAGE_PRIORITY_PDF", "low"),
+    }
+    STAGE_QUEUE_LIMITS = {  # calls allowed to wait before new ones are shed (0 = unbounded)
+        "chat": int(os.getenv("STAGE_QUEUE_CHAT", "8")),
+        "pdf": int(os.getenv("STAGE_QUEUE_PDF", "4")),
+    }
+    PRIORITY_MAX_WAIT = {  # seconds a call may wait for a slot before it is shed (0 = no limit)
+        "critical": float(os.getenv("MAX_WAIT_CRITICAL", "0")),
+        "normal": float(os.getenv("MAX_WAIT_NORMAL", "10")),
+        "low": float(os.getenv("MAX_WAIT_LOW", "3")),
+    }
+    ADMISSION_SLOTS = int(os.getenv("ADMISSION_SLOTS", str(max(2, os.cpu_count() or 2))))  # 0 = disabled
+    ADMISSION_RESERVED = int(os.getenv("ADMISSION_RESERVED", "1"))  # slots only critical work may take
+    
+    # Live Stream
+    LIVE_STREAM_INTERVAL = float(os.getenv("LIVE_STREAM_INTERVAL", "1.0"))  # seconds
+    
+    # Early-warning trend scoring over sampled vitals
+    TREND_WINDOW = float(os.getenv("TREND_WINDOW", "120"))  # seconds of history
+    TREND_HORIZON = float(os.getenv("TREND_HORIZON", "300"))  # seconds projected ahead
+    TREND_MIN_SAMPLES = int(os.getenv("TREND_MIN_SAMPLES", "5"))
+    
     # GPS Settings
     GPS_PORT = os.getenv("GPS_PORT", "/dev/ttyUSB0")
     GPS_BAUDRATE = int(os.getenv("GPS_BAUDRATE", "9600"))
+    GPS_FIX_TIMEOUT = float(os.getenv("GPS_FIX_TIMEOUT", "10.0"))  # seconds before a fix counts as lost
+    UNIT_ID = os.getenv("UNIT_ID", "unit-1")  # this ambulance's id in GPS tracks
+    TRACK_MAX_POINTS = int(os.getenv("TRACK_MAX_POINTS", "86400"))  # smoothed fixes kept per unit
+    TRACK_SIMPLIFY_TOLERANCE = float(os.getenv("TRACK_SIMPLIFY_TOLERANCE", "10.0"))  # meters
     
     # Emergency Services
     EMS_API_ENDPOINT = os.getenv("EMS_API_ENDPOINT", "")
     EMS_API_KEY = os.getenv("EMS_API_KEY", "")
+    DISPATCH_OUTBOX_PATH = Path(os.getenv("DISPATCH_OUTBOX_PATH") or BASE_DIR / "dispatch_outbox.db")  # durable EMS queue
+    DISPATCH_BATCH_SIZE = int(os.getenv("DISPATCH_BATCH_SIZE", "16"))  # queued messages sent per pass
+    DISPATCH_CONCURRENCY = int(os.getenv("DISPATCH_CONCURRENCY", "4"))  # keep-alive connections to the EMS
+    DISPATCH_TIMEOUT = float(os.getenv("DISPATCH_TIMEOUT", "10.0"))  # seconds per request
+    DISPATCH_RETRY_BASE = float(os.getenv("DISPATCH_RETRY_BASE", "2.0"))  # first retry delay, doubled per attempt
+    DISPATCH_RETRY_MAX = float(os.getenv("DISPATCH_RETRY_MAX", "300.0"))  # longest retry delay
+    DISPATCH_POLL_INTERVAL = float(os.getenv("DISPATCH_POLL_INTERVAL", "1.0"))  # seconds; picks up other workers' reports
     
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
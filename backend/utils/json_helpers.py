@@ -3,9 +3,18 @@ JSON Helper Utilities
 Handles conversion of special types (numpy, etc.) to JSON-serializable formats
 """
 import json
+from pathlib import Path
 import numpy as np
 from typing import Any
 
+# orjson serializes numpy arrays and scalars natively in one pass
+try:
+    import orjson
+    HAS_ORJSON = True
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    HAS_ORJSON = False
+
 
 class NumpyEncoder(json.JSONEncoder):
     """Custom JSON encoder for numpy types"""
@@ -19,10 +28,53 @@ class NumpyEncoder(json.JSONEncoder):
         return super(NumpyEncoder, self).default(obj)
 
 
+def _orjson_default(obj: Any) -> Any:
+    """Types orjson does not handle natively (non-contiguous or exotic-dtype arrays, sets, paths)"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes in a single pass, numpy types included
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+        
+    Returns:
+        JSON bytes
+    """
+    if HAS_ORJSON:
+        options = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_orjson_default, option=options)
+    return json.dumps(
+        obj, cls=NumpyEncoder, ensure_ascii=False, indent=2 if indent else None,
+        separators=None if indent else (",", ":")
+    ).encode("utf-8")
+
+
+def loads_bytes(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes (as written by dumps_bytes)"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def convert_numpy_types(obj: Any) -> Any:
     """
     Recursively convert numpy types to native Python types
     
+    Prefer dumps_bytes when the result is only going to be serialized; it
+    handles numpy types without rebuilding every container.
+    
     Args:
         obj: Object that may contain numpy types
         
@@ -46,6 +98,8 @@ def safe_json_dumps(obj: Any, **kwargs) -> str:
     """
     Safely convert object to JSON string, handling numpy types
     
+    Non-ASCII text is written as-is unless ensure_ascii=True is passed.
+    
     Args:
         obj: Object to convert
         **kwargs: Additional arguments for json.dumps
@@ -53,4 +107,11 @@ def safe_json_dumps(obj: Any, **kwargs) -> str:
     Returns:
         JSON string
     """
-    return json.dumps(obj, cls=NumpyEncoder, **kwargs)
+    # orjson covers compact or 2-space output without ASCII escaping; anything else uses json
+    indent = kwargs.pop("indent", None)
+    ensure_ascii = kwargs.pop("ensure_ascii", False)
+    sort_keys = kwargs.pop("sort_keys", False)
+    if HAS_ORJSON and not kwargs and not ensure_ascii and indent in (None, 2):
+        options = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=_orjson_default, option=options).decode("utf-8")
+    return json.dumps(obj, cls=NumpyEncoder, indent=indent, ensure_ascii=ensure_ascii, sort_keys=sort_keys, **kwargs)
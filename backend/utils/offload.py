@@ -0,0 +1,201 @@
+"""
+Offloading of blocking work from the asyncio event loop
+Runs sync code on bounded thread/process pools with per-stage concurrency
+limits, priority admission for the heavy stages and load shedding
+"""
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from .admission import AdmissionController, Overloaded, WaitStats, PRIORITY_CLASSES
+from .config import config
+from .logger import log
+
+
+class StageExecutor:
+    """Run blocking calls off the event loop, limited per pipeline stage"""
+
+    def __init__(
+        self,
+        stage_limits: Dict[str, int],
+        process_workers: int = 0,
+        stage_priority: Optional[Dict[str, str]] = None,
+        queue_limits: Optional[Dict[str, int]] = None,
+        max_wait: Optional[Dict[str, float]] = None,
+        admission_slots: int = 0,
+        reserved_slots: int = 1
+    ):
+        """
+        Initialize stage executor
+
+        Args:
+            stage_limits: Maximum concurrent calls per stage name
+            process_workers: Size of the process pool (0 runs everything on threads)
+            stage_priority: Stage -> priority class ("critical", "normal", "low");
+                only these stages compete for the shared admission slots
+            queue_limits: Stage -> calls allowed to wait before new ones are shed (0 = unbounded)
+            max_wait: Priority class -> seconds a call may wait before it is shed (0 = no limit)
+            admission_slots: Slots shared by prioritized stages (0 = no admission control)
+            reserved_slots: Slots only critical stages may take
+        """
+        self.stage_limits = dict(stage_limits)
+        self.process_workers = process_workers
+        self.stage_priority = {
+            stage: PRIORITY_CLASSES[name] for stage, name in (stage_priority or {}).items()
+        }
+        self.queue_limits = dict(queue_limits or {})
+        self.max_wait = {PRIORITY_CLASSES[name]: seconds for name, seconds in (max_wait or {}).items()}
+        self.admission = AdmissionController(admission_slots, reserved_slots) if admission_slots > 0 else None
+
+        # Enough threads for every stage to reach its limit at once
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=max(1, sum(self.stage_limits.values())),
+            thread_name_prefix="offload"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # Created lazily so they bind to the running event loop
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._active: Dict[str, int] = {stage: 0 for stage in self.stage_limits}
+        self._waiting: Dict[str, int] = {stage: 0 for stage in self.stage_limits}
+        self._wait_stats: Dict[str, WaitStats] = {stage: WaitStats() for stage in self.stage_limits}
+        self._shed: Dict[str, int] = {stage: 0 for stage in self.stage_limits}
+        self._degraded: Dict[str, int] = {stage: 0 for stage in self.stage_limits}
+
+    def _get_semaphore(self, stage: str) -> asyncio.Semaphore:
+        if stage not in self.stage_limits:
+            raise KeyError(f"Unknown offload stage: {stage}")
+        if stage not in self._semaphores:
+            self._semaphores[stage] = asyncio.Semaphore(self.stage_limits[stage])
+        return self._semaphores[stage]
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        if self._process_pool is None:
+            # spawn: never fork a process that already runs sampler threads
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+
+    def _priority(self, stage: str) -> Optional[int]:
+        return self.stage_priority.get(stage) if self.admission is not None else None
+
+    def under_pressure(self, stage: str) -> bool:
+        """
+        True if the shared admission slots would make this stage wait
+
+        Endpoints check this to degrade low-priority work (cheaper answer,
+        cached result) instead of queueing it behind more urgent calls.
+        Stages without a priority class are never under pressure.
+        """
+        priority = self._priority(stage)
+        return priority is not None and self.admission.would_wait(priority)
+
+    def record_degraded(self, stage: str):
+        """Count a call served in degraded form because of load"""
+        self._degraded[stage] += 1
+
+    async def _admit(self, stage: str, priority: Optional[int]):
+        """Take the stage semaphore, then an admission slot for prioritized stages"""
+        semaphore = self._get_semaphore(stage)
+        await semaphore.acquire()
+        if priority is None:
+            return
+        try:
+            await self.admission.acquire(priority)
+        except BaseException:
+            semaphore.release()
+            raise
+
+    async def run(self, stage: str, func: Callable, *args, use_process: bool = False, **kwargs) -> Any:
+        """
+        Run a blocking callable within a stage's concurrency limit
+
+        Args:
+            stage: Stage name from stage_limits
+            func: Blocking callable (must be picklable when use_process is set)
+            use_process: Run on the process pool for CPU-bound work
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            Overloaded: The stage's queue is full or the call waited too long
+        """
+        self._get_semaphore(stage)  # Validates the stage name
+        priority = self._priority(stage)
+
+        queue_limit = self.queue_limits.get(stage, 0)
+        if queue_limit and self._waiting[stage] >= queue_limit:
+            self._shed[stage] += 1
+            raise Overloaded(stage, f"{self._waiting[stage]} calls already queued")
+
+        timeout = self.max_wait.get(priority) if priority is not None else None
+        queued_at = time.perf_counter()
+        self._waiting[stage] += 1
+        try:
+            if timeout:
+                await asyncio.wait_for(self._admit(stage, priority), timeout)
+            else:
+                await self._admit(stage, priority)
+        except asyncio.TimeoutError:
+            self._shed[stage] += 1
+            raise Overloaded(stage, f"no capacity within {timeout:g}s", retry_after=timeout)
+        finally:
+            self._waiting[stage] -= 1
+        self._wait_stats[stage].record(time.perf_counter() - queued_at)
+
+        self._active[stage] += 1
+        try:
+            executor = (self._get_process_pool() if use_process else None) or self._thread_pool
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self._active[stage] -= 1
+            if priority is not None:
+                self.admission.release()
+            self._semaphores[stage].release()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get per-stage load, queue-wait times and shedding, plus shared admission slots"""
+        names = {value: name for name, value in PRIORITY_CLASSES.items()}
+        return {
+            "stages": {
+                stage: {
+                    "limit": limit,
+                    "active": self._active[stage],
+                    "waiting": self._waiting[stage],
+                    "priority": names.get(self.stage_priority.get(stage)),
+                    "queue_limit": self.queue_limits.get(stage, 0),
+                    "queue_wait": self._wait_stats[stage].summary(),
+                    "shed": self._shed[stage],
+                    "degraded": self._degraded[stage]
+                }
+                for stage, limit in self.stage_limits.items()
+            },
+            "admission": self.admission.get_status() if self.admission is not None else None
+        }
+
+    def shutdown(self):
+        """Shut down worker pools"""
+        self._thread_pool.shutdown(wait=False)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+        log.info("Offload pools shut down")
+
+
+# Global instance
+offload = StageExecutor(
+    stage_limits=config.STAGE_CONCURRENCY,
+    process_workers=config.PROCESS_POOL_WORKERS,
+    stage_priority=config.STAGE_PRIORITY,
+    queue_limits=config.STAGE_QUEUE_LIMITS,
+    max_wait=config.PRIORITY_MAX_WAIT,
+    admission_slots=config.ADMISSION_SLOTS,
+    reserved_slots=config.ADMISSION_RESERVED
+)
@@ -0,0 +1,142 @@
+"""
+Shared State Store
+Small SQLite (WAL) key/value store for state every API worker process must
+see the same way - chat sessions, the sensor owner's status
+"""
+from typing import Any, List, Optional
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from utils import config
+from utils.json_helpers import dumps_bytes, loads_bytes
+
+
+class SharedStateStore:
+    """
+    JSON values by (namespace, key), with optional expiry
+
+    Each process opens its own connection; WAL lets readers run alongside a
+    writer, and read-modify-write updates run in an immediate transaction so
+    two workers appending to the same key never lose an item.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Initialize the store; the file is opened (or created) on first use
+
+        Args:
+            path: SQLite file
+        """
+        self.path = Path(path or config.SHARED_STATE_PATH)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (lock held)"""
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value BLOB NOT NULL, "
+                "updated REAL NOT NULL, "
+                "expires REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db = db
+        return self._db
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Get a value (default when missing or expired)"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires IS NULL OR expires > ?)",
+                (namespace, key, time.time())
+            ).fetchone()
+        return loads_bytes(row[0]) if row else default
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value
+
+        Args:
+            namespace: Owner of the key (e.g. "chat")
+            key: Key within the namespace
+            value: JSON-serializable value (numpy types allowed)
+            ttl: Seconds until the value expires (None = never)
+        """
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, updated, expires) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, dumps_bytes(value), now, now + ttl if ttl else None)
+            )
+
+    def append(self, namespace: str, key: str, items: List[Any],
+               max_items: Optional[int] = None, ttl: Optional[float] = None) -> List[Any]:
+        """
+        Append to a list value atomically across processes
+
+        Args:
+            items: Items to add
+            max_items: Keep only the newest this many
+            ttl: Seconds until the list expires, renewed on every append
+
+        Returns:
+            The stored list
+        """
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires IS NULL OR expires > ?)",
+                    (namespace, key, now)
+                ).fetchone()
+                values = (loads_bytes(row[0]) if row else []) + list(items)
+                if max_items:
+                    values = values[-max_items:]
+                db.execute(
+                    "INSERT OR REPLACE INTO state (namespace, key, value, updated, expires) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, dumps_bytes(values), now, now + ttl if ttl else None)
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return values
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def updated_at(self, namespace: str, key: str) -> Optional[float]:
+        """Unix time the value was last written (None when missing)"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT updated FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def purge_expired(self) -> int:
+        """Drop expired values; returns how many were removed"""
+        with self._lock:
+            return self._connection().execute(
+                "DELETE FROM state WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Global instance
+shared_state = SharedStateStore()
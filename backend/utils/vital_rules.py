@@ -0,0 +1,250 @@
+"""
+Vital Sign Threshold Rules
+One declarative table of clinical thresholds, compiled once into sorted
+band arrays and evaluated once per reading into shared flags
+"""
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+from bisect import bisect_left, bisect_right
+import math
+import numpy as np
+
+
+class VitalRule(NamedTuple):
+    """One threshold: the rule fires when `vital op threshold` holds"""
+    name: str
+    vital: str
+    op: str                       # "<" or ">"
+    threshold: float
+    level: str                    # One of LEVELS
+    status: Optional[str] = None  # Sensor status label when this is the worst labelled rule
+
+
+# Severity order of rule levels
+LEVELS = ["normal", "abnormal", "warning", "critical", "extreme"]
+
+VITAL_RULES = [
+    # Heart rate (bpm)
+    VitalRule("hr_extreme_low", "heart_rate", "<", 40, "extreme"),
+    VitalRule("hr_critical_low", "heart_rate", "<", 50, "critical"),
+    VitalRule("hr_low", "heart_rate", "<", 60, "abnormal", "low"),
+    VitalRule("hr_high", "heart_rate", ">", 100, "abnormal", "high"),
+    VitalRule("hr_critical_high", "heart_rate", ">", 120, "critical"),
+    VitalRule("hr_extreme_high", "heart_rate", ">", 140, "extreme"),
+
+    # SpO2 (%)
+    VitalRule("spo2_extreme", "spo2", "<", 85, "extreme"),
+    VitalRule("spo2_critical", "spo2", "<", 90, "critical", "critical"),
+    VitalRule("spo2_low", "spo2", "<", 95, "abnormal", "low"),
+
+    # Body temperature (°C)
+    VitalRule("temp_extreme_low", "body_temperature", "<", 34.5, "extreme"),
+    VitalRule("temp_critical_low", "body_temperature", "<", 35, "critical"),
+    VitalRule("temp_low", "body_temperature", "<", 36.1, "abnormal", "low"),
+    VitalRule("temp_high", "body_temperature", ">", 37.5, "abnormal", "high"),
+    VitalRule("temp_elevated", "body_temperature", ">", 38, "abnormal"),
+    VitalRule("temp_fever", "body_temperature", ">", 38.5, "warning"),
+    VitalRule("temp_critical_high", "body_temperature", ">", 39, "critical"),
+    VitalRule("temp_extreme_high", "body_temperature", ">", 39.5, "extreme"),
+]
+
+# Advanced sensor suite reading -> vital it carries
+READING_FIELDS = {
+    "heart_rate": "pulse",
+    "spo2": "spo2",
+    "body_temperature": "temperature"
+}
+
+# Key the evaluated flag names are attached under
+FLAGS_KEY = "flags"
+
+
+class VitalFlags:
+    """Rules that fired for one reading"""
+
+    __slots__ = ("names", "_rules")
+
+    def __init__(self, names: FrozenSet[str], rules: "CompiledVitalRules"):
+        self.names = names
+        self._rules = rules
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def any(self, *names: str) -> bool:
+        """True if any of the named rules fired"""
+        return any(name in self.names for name in names)
+
+    def level(self, vital: str) -> str:
+        """Worst level fired for a vital, or 'normal'"""
+        rank = 0
+        for name in self.names:
+            rule = self._rules.rules[name]
+            if rule.vital == vital:
+                rank = max(rank, LEVELS.index(rule.level))
+        return LEVELS[rank]
+
+    def is_critical(self, vital: str) -> bool:
+        """True if a critical or extreme rule fired for a vital"""
+        return LEVELS.index(self.level(vital)) >= LEVELS.index("critical")
+
+    def status(self, vital: str) -> str:
+        """Sensor status label of the worst labelled rule fired for a vital"""
+        best = None
+        for name in self.names:
+            rule = self._rules.rules[name]
+            if rule.vital == vital and rule.status is not None:
+                if best is None or LEVELS.index(rule.level) > LEVELS.index(best.level):
+                    best = rule
+        return best.status if best is not None else "normal"
+
+    def to_list(self) -> List[str]:
+        """Sorted rule names, for attaching to JSON payloads"""
+        return sorted(self.names)
+
+
+class CompiledVitalRules:
+    """Rule table compiled into per-vital sorted threshold arrays"""
+
+    def __init__(self, rules: Iterable[VitalRule]):
+        """
+        Compile rules
+
+        Args:
+            rules: Declarative rule table
+        """
+        self.rules: Dict[str, VitalRule] = {rule.name: rule for rule in rules}
+
+        # vital -> (below thresholds, names, above thresholds, names), ascending
+        self._bands: Dict[str, tuple] = {}
+        for vital in dict.fromkeys(rule.vital for rule in self.rules.values()):
+            below = sorted(
+                (r for r in self.rules.values() if r.vital == vital and r.op == "<"),
+                key=lambda r: r.threshold
+            )
+            above = sorted(
+                (r for r in self.rules.values() if r.vital == vital and r.op == ">"),
+                key=lambda r: r.threshold
+            )
+            self._bands[vital] = (
+                tuple(float(r.threshold) for r in below), tuple(r.name for r in below),
+                tuple(float(r.threshold) for r in above), tuple(r.name for r in above)
+            )
+
+    @property
+    def vitals(self) -> List[str]:
+        """Vitals the table has rules for"""
+        return list(self._bands)
+
+    def _fired(self, vital: str, value: Any) -> tuple:
+        """Names of the rules a single value fires"""
+        bands = self._bands.get(vital)
+        if bands is None or value is None:
+            return ()
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return ()
+        if math.isnan(value):
+            return ()
+
+        below, below_names, above, above_names = bands
+        # value < t holds for every threshold above it, value > t for every one below
+        return below_names[bisect_right(below, value):] + above_names[:bisect_left(above, value)]
+
+    def evaluate(self, values: Dict[str, Any]) -> VitalFlags:
+        """
+        Evaluate every rule for one reading
+
+        Args:
+            values: Vital name -> value (missing, None and NaN are skipped)
+
+        Returns:
+            Fired rules
+        """
+        fired: List[str] = []
+        for vital in self._bands:
+            fired.extend(self._fired(vital, values.get(vital)))
+        return VitalFlags(frozenset(fired), self)
+
+    def status(self, vital: str, value: Any) -> str:
+        """Sensor status label ('normal', 'low', 'high', 'critical') for one value"""
+        return VitalFlags(frozenset(self._fired(vital, value)), self).status(vital)
+
+    def level(self, vital: str, value: Any) -> str:
+        """Worst level (one of LEVELS) a single value reaches"""
+        return VitalFlags(frozenset(self._fired(vital, value)), self).level(vital)
+
+    def level_ranks(self, vital: str, values: np.ndarray) -> np.ndarray:
+        """
+        Worst level per value over a column, as indexes into LEVELS
+
+        Args:
+            vital: Vital name
+            values: Float array, NaN for not measured (rank 0)
+
+        Returns:
+            Int array of LEVELS indexes
+        """
+        values = np.asarray(values, dtype=np.float64)
+        ranks = np.zeros(values.shape, dtype=np.int64)
+        for name, mask in self.masks(vital, values).items():
+            np.maximum(ranks, np.where(mask, LEVELS.index(self.rules[name].level), 0), out=ranks)
+        return ranks
+
+    def masks(self, vital: str, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a vital's rules over a column of values
+
+        Args:
+            vital: Vital name
+            values: Float array, NaN for not measured
+
+        Returns:
+            Rule name -> boolean mask
+        """
+        values = np.asarray(values, dtype=np.float64)
+        measured = ~np.isnan(values)
+        below, below_names, above, above_names = self._bands[vital]
+
+        masks = {}
+        below_index = np.searchsorted(below, values, side="right")
+        for k, name in enumerate(below_names):
+            masks[name] = measured & (below_index <= k)
+        above_index = np.searchsorted(above, values, side="left")
+        for k, name in enumerate(above_names):
+            masks[name] = measured & (above_index > k)
+        return masks
+
+
+def readings_to_vitals(readings: Dict[str, Any]) -> Dict[str, Any]:
+    """Pull rule inputs out of advanced sensor suite readings"""
+    vitals = {}
+    for vital, field in READING_FIELDS.items():
+        reading = readings.get(field)
+        if isinstance(reading, dict) and reading.get("status") != "unknown":
+            vitals[vital] = reading.get("value")
+    return vitals
+
+
+def _attached_flags(payload: Dict[str, Any]) -> Optional[VitalFlags]:
+    """Rebuild flags attached under FLAGS_KEY, ignoring names the table does not know"""
+    names = payload.get(FLAGS_KEY)
+    if not isinstance(names, (list, tuple, set, frozenset)):
+        return None
+    return VitalFlags(frozenset(n for n in names if n in vital_rules.rules), vital_rules)
+
+
+def flags_for(vital_signs: Dict[str, Any]) -> VitalFlags:
+    """Flags for a vital signs dict, reusing the ones attached when it was collected"""
+    attached = _attached_flags(vital_signs)
+    return attached if attached is not None else vital_rules.evaluate(vital_signs)
+
+
+def flags_for_readings(readings: Dict[str, Any]) -> VitalFlags:
+    """Flags for advanced sensor suite readings, reusing attached ones"""
+    attached = _attached_flags(readings)
+    return attached if attached is not None else vital_rules.evaluate(readings_to_vitals(readings))
+
+
+# Global instance
+vital_rules = CompiledVitalRules(VITAL_RULES)
@@ -11,6 +11,8 @@ export default function Chat() {
     ]);
     const [inputMessage, setInputMessage] = useState('');
     const [isLoading, setIsLoading] = useState(false);
+    // Issued by the backend with the first reply; keeps this conversation separate
+    const [sessionId, setSessionId] = useState(null);
     const messagesEndRef = useRef(null);
 
     const scrollToBottom = () => {
@@ -32,7 +34,10 @@ export default function Chat() {
         setIsLoading(true);
 
         try {
-            const response = await apiService.sendChatMessage(userMessage, false);
+            const response = await apiService.sendChatMessage(userMessage, false, sessionId);
+            if (response.data.session_id) {
+                setSessionId(response.data.session_id);
+            }
 
             // Add bot response
             setMessages(prev => [...prev, {
@@ -62,7 +67,10 @@ export default function Chat() {
 
     const handleClearChat = async () => {
         try {
-            await apiService.sendChatMessage('', true); // Reset history
+            if (sessionId) {
+                await apiService.sendChatMessage('', true, sessionId); // Reset history
+            }
+            setSessionId(null);
             setMessages([{
                 role: 'assistant',
                 content: 'تم مسح المحادثة. كيف يمكنني مساعدتك؟'
@@ -6,47 +6,85 @@ export default function LiveStream() {
     const [isStreaming, setIsStreaming] = useState(false);
     const [liveData, setLiveData] = useState(null);
     const [alerts, setAlerts] = useState([]);
-    const intervalRef = useRef(null);
+    const socketRef = useRef(null);
 
     const startStream = () => {
         setIsStreaming(true);
-        fetchLiveData(); // First fetch
 
-        // Fetch every 2 seconds
-        intervalRef.current = setInterval(fetchLiveData, 2000);
+        // Server pushes a snapshot first, then deltas
+        const socket = apiService.openLiveSocket();
+        socket.onmessage = (event) => applyFrame(JSON.parse(event.data));
+        socket.onerror = (error) => console.error('Live stream error:', error);
+        socket.onclose = () => setIsStreaming(false);
+        socketRef.current = socket;
     };
 
     const stopStream = () => {
         setIsStreaming(false);
-        if (intervalRef.current) {
-            clearInterval(intervalRef.current);
+        if (socketRef.current) {
+            socketRef.current.close();
+            socketRef.current = null;
         }
     };
 
-    const fetchLiveData = async () => {
-        try {
-            const response = await apiService.getLiveStream();
-            setLiveData(response.data);
-
-            // Add new alerts to the list
-            if (response.data.instant_alerts && response.data.instant_alerts.length > 0) {
-                setAlerts(prev => [
-                    ...response.data.instant_alerts.map(alert => ({
-                        ...alert,
-                        timestamp: new Date().toLocaleTimeString()
-                    })),
-                    ...prev
-                ].slice(0, 10)); // Keep last 10 alerts
-            }
-        } catch (error) {
-            console.error('Live stream error:', error);
+    const applyFrame = (frame) => {
+        let raised = [];
+
+        if (frame.type === 'snapshot') {
+            setLiveData(frame);
+            raised = frame.instant_alerts || [];
+        } else {
+            setLiveData(prev => {
+                if (!prev) return prev;
+
+                const vitalSigns = { ...prev.vital_signs, ...(frame.vital_signs || {}) };
+                (frame.removed || []).forEach(key => delete vitalSigns[key]);
+
+                let instantAlerts = prev.instant_alerts || [];
+                if (frame.alerts) {
+                    const updated = frame.alerts.updated || [];
+                    const changed = new Set([
+                        ...frame.alerts.cleared,
+                        ...frame.alerts.raised.map(alert => alert.message),
+                        ...updated.map(alert => alert.message)
+                    ]);
+                    instantAlerts = [
+                        ...instantAlerts.filter(alert => !changed.has(alert.message)),
+                        ...updated,
+                        ...frame.alerts.raised
+                    ];
+                }
+
+                return {
+                    ...prev,
+                    timestamp: frame.timestamp,
+                    vital_signs: vitalSigns,
+                    // Present keys (even null) replace the previous value
+                    severity: 'severity' in frame ? frame.severity : prev.severity,
+                    trend: 'trend' in frame ? frame.trend : prev.trend,
+                    location: 'location' in frame ? frame.location : prev.location,
+                    instant_alerts: instantAlerts
+                };
+            });
+            raised = frame.alerts ? frame.alerts.raised : [];
+        }
+
+        // Add new alerts to the list
+        if (raised.length > 0) {
+            setAlerts(prev => [
+                ...raised.map(alert => ({
+                    ...alert,
+                    timestamp: new Date().toLocaleTimeString()
+                })),
+                ...prev
+            ].slice(0, 10)); // Keep last 10 alerts
         }
     };
 
     useEffect(() => {
         return () => {
-            if (intervalRef.current) {
-                clearInterval(intervalRef.current);
+            if (socketRef.current) {
+                socketRef.current.close();
             }
         };
     }, []);
@@ -183,6 +221,14 @@ export default function LiveStream() {
                         >
                             {liveData.severity?.severity_level?.toUpperCase() || 'NORMAL'}
                         </div>
+                        {liveData.trend?.deteriorating && (
+                            <div
+                                className="severity-trend"
+                                style={{ color: getSeverityColor(liveData.trend.level) }}
+                            >
+                                ↘ تدهور متوقع: {liveData.trend.score.toFixed(1)} / 10
+                            </div>
+                        )}
                     </div>
 
                     {/* GPS Location */}
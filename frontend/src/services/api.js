@@ -33,8 +33,8 @@ export const apiService = {
     },
 
     // Chatbot
-    sendChatMessage: (message, resetHistory = false) =>
-        api.post('/api/chat', { message, reset_history: resetHistory }),
+    sendChatMessage: (message, resetHistory = false, sessionId = null) =>
+        api.post('/api/chat', { message, reset_history: resetHistory, session_id: sessionId }),
 
     // Sensors
     calibrateSensors: () => api.post('/api/sensors/calibrate'),
@@ -43,6 +43,7 @@ export const apiService = {
 
     // Live Stream - Real-time monitoring
     getLiveStream: () => api.get('/api/live/stream'),
+    openLiveSocket: () => new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/api/live/ws`),
 
     // Download PDF Report
     downloadReport: async (data) => {
@@ -0,0 +1,147 @@
+"""
+Benchmark - assessment response serialization
+Compares the old response path (convert_numpy_types on assessment and report,
+then stdlib json in JSONResponse) with NumpyJSONResponse, and the report file
+writer (json.dump + NumpyEncoder vs dumps_bytes), on assessment-shaped
+payloads full of numpy scalars and arrays.
+
+Usage:
+    python scripts/benchmark_json.py --injuries 5 --iterations 2000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.responses import JSONResponse
+from api.responses import NumpyJSONResponse
+from utils.json_helpers import convert_numpy_types, dumps_bytes, NumpyEncoder, HAS_ORJSON
+
+INJURY_TYPES = ["laceration", "burn", "fracture", "bruise", "bleeding"]
+
+
+def build_payload(injuries: int, trend_samples: int, seed: int = 0):
+    """Assessment + report shaped like perform_emergency_assessment / generate_ems_report output"""
+    rng = np.random.default_rng(seed)
+    detections = [
+        {
+            "type": INJURY_TYPES[i % len(INJURY_TYPES)],
+            "confidence": np.float32(rng.uniform(0.5, 1.0)),
+            "bbox": rng.integers(0, 640, 4),
+            "area": np.int64(rng.integers(100, 40000)),
+            "severity_weight": np.float64(rng.uniform(1, 10)),
+            "location": "upper body" if i % 2 else "lower body"
+        }
+        for i in range(injuries)
+    ]
+    vital_signs = {
+        "heart_rate": np.int64(rng.integers(50, 140)),
+        "spo2": np.int64(rng.integers(85, 100)),
+        "body_temperature": np.float64(rng.uniform(35, 40)),
+        "ambient_temperature": np.float64(rng.uniform(15, 35)),
+        "rhythm": "sinus_tachycardia",
+        "flags": ["hr_high", "spo2_low"]
+    }
+    severity = {
+        "total_score": np.float64(rng.uniform(0, 10)),
+        "severity_level": "severe",
+        "component_scores": {
+            "injury_score": np.float64(6.2), "vital_signs_score": np.float64(5.5), "consciousness_score": np.int64(0)
+        },
+        "critical_factors": ["تسارع نبض القلب: 128 bpm", "انخفاض الأكسجين: 89%"],
+        "requires_immediate_attention": np.bool_(True)
+    }
+    trend = {
+        "score": np.float64(7.1), "level": "severe", "deteriorating": True,
+        "history": rng.normal(100, 10, trend_samples)
+    }
+    assessment = {
+        "timestamp": "2026-10-17T12:00:00",
+        "injuries": detections,
+        "vital_signs": vital_signs,
+        "severity": severity,
+        "trend": trend,
+        "location": {"latitude": np.float64(24.7136), "longitude": np.float64(46.6753), "altitude": np.float64(612.4)},
+        "requires_ems": True,
+        "processing_time": np.float64(0.82)
+    }
+    report = {
+        "report_id": "EMS-20261017-120000",
+        "patient_status": {"severity": severity, "vital_signs": vital_signs},
+        "injuries": detections,
+        "recommendations": ["ضغط مباشر على الجرح", "مراقبة العلامات الحيوية", "Keep airway open"] * 3,
+        "location": assessment["location"],
+        "ems_priority": np.int64(1)
+    }
+    return assessment, report
+
+
+def old_response(assessment, report):
+    return JSONResponse(content={
+        "assessment": convert_numpy_types(assessment),
+        "report": convert_numpy_types(report)
+    }).body
+
+
+def new_response(assessment, report):
+    return NumpyJSONResponse(content={"assessment": assessment, "report": report}).body
+
+
+def old_report_file(report):
+    return json.dumps(report, ensure_ascii=False, indent=2, cls=NumpyEncoder).encode("utf-8")
+
+
+def new_report_file(report):
+    return dumps_bytes(report, indent=True)
+
+
+def same_content(a, b) -> bool:
+    """Equal after parsing; floats compared at float32 precision, since orjson
+    writes float32 scalars in their shortest float32 form"""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same_content(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(map(same_content, a, b))
+    if isinstance(a, float) and isinstance(b, (int, float)):
+        return np.float32(a) == np.float32(b)
+    return a == b
+
+
+def bench(func, args, iterations):
+    func(*args)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = func(*args)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6, len(body), body
+
+
+def main(args):
+    assessment, report = build_payload(args.injuries, args.trend_samples)
+    print(f"Payload: {args.injuries} injuries, {args.trend_samples}-sample trend history; "
+          f"orjson {'available' if HAS_ORJSON else 'NOT installed (stdlib fallback)'}")
+
+    for label, old, new, call_args in (
+        ("API response", old_response, new_response, (assessment, report)),
+        ("Report file", old_report_file, new_report_file, (report,)),
+    ):
+        old_us, old_size, old_body = bench(old, call_args, args.iterations)
+        new_us, new_size, new_body = bench(new, call_args, args.iterations)
+        same = same_content(json.loads(old_body), json.loads(new_body))
+        print(f"{label:<13} old {old_us:8.1f} us ({old_size} B)   new {new_us:8.1f} us ({new_size} B)   "
+              f"{old_us / new_us:5.1f}x faster   same content: {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assessment JSON serialization benchmark")
+    parser.add_argument("--injuries", type=int, default=5)
+    parser.add_argument("--trend-samples", type=int, default=120, help="Length of a numpy array in the payload")
+    parser.add_argument("--iterations", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,98 @@
+"""
+Benchmark - injury image preprocessing
+Compares the original pipeline (full decode, resize, cvtColor, astype/255,
+expand_dims) against reduced JPEG decode + fused normalize into a
+preallocated input buffer, on synthetic 12MP phone photos.
+
+Usage:
+    python scripts/benchmark_preprocessing.py --runs 20 --size 224
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from ai_engine.image_preprocessing import load_image, resize_for_model, normalize_into
+
+
+def make_phone_photo(path: Path, width: int = 4000, height: int = 3000):
+    """Write a 12MP JPEG with skin-like gradients, noise and a red patch"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[..., 0] = (120 + 40 * np.sin(x / 400)).astype(np.uint8)
+    image[..., 1] = (150 + 30 * np.cos(y / 300)).astype(np.uint8)
+    image[..., 2] = (200 + 20 * np.sin((x + y) / 500)).astype(np.uint8)
+    image = cv2.add(image, rng.integers(0, 25, image.shape, dtype=np.uint8))
+    cv2.circle(image, (width // 2, height // 2), height // 6, (30, 30, 180), -1)
+    cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, 92])
+
+
+def legacy_pipeline(path: str, size: int) -> np.ndarray:
+    image = cv2.imread(path)
+    processed = cv2.resize(image, (size, size))
+    processed = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
+    processed = processed.astype(np.float32) / 255.0
+    return np.expand_dims(processed, axis=0)
+
+
+def fused_pipeline(path: str, size: int, input_buffer: np.ndarray) -> np.ndarray:
+    image = load_image(path, (size, size))
+    normalize_into(resize_for_model(image, (size, size)), input_buffer[0])
+    return input_buffer
+
+
+def measure(label, func, runs):
+    func()  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    print(f"{label:<10} median={timings[len(timings) // 2]:8.1f}ms "
+          f"p95={timings[int(len(timings) * 0.95) - 1]:8.1f}ms "
+          f"peak_alloc={peak / 1e6:8.1f}MB")
+    return timings[len(timings) // 2]
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        photo = Path(tmp) / "phone_12mp.jpg"
+        make_phone_photo(photo)
+        print(f"Test photo: 4000x3000 JPEG, {photo.stat().st_size / 1e6:.1f}MB")
+        print(f"Model input: {args.size}x{args.size}x3 float32, {args.runs} runs")
+        print()
+
+        input_buffer = np.empty((1, args.size, args.size, 3), dtype=np.float32)
+
+        legacy = measure("legacy", lambda: legacy_pipeline(str(photo), args.size), args.runs)
+        fused = measure("fused", lambda: fused_pipeline(str(photo), args.size, input_buffer), args.runs)
+
+        expected = legacy_pipeline(str(photo), args.size)
+        actual = fused_pipeline(str(photo), args.size, input_buffer)
+        print()
+        print(f"speedup: {legacy / fused:.1f}x, "
+              f"mean abs diff vs legacy: {np.abs(expected - actual).mean():.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Injury preprocessing benchmark")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--size", type=int, default=224, help="Model input edge length")
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+"""
+Benchmark - streaming QRS detection
+Feeds an ECG waveform to QRSDetector in acquisition-sized blocks and reports
+throughput (samples/sec), detection accuracy and the resulting HR/rhythm.
+
+Uses a recorded waveform when given (.npy, or .csv/.txt with one sample per
+line or the signal in the last column), otherwise synthesizes one with
+baseline wander, mains hum and noise (sinus or irregular rhythm).
+
+Usage:
+    python scripts/benchmark_qrs.py --seconds 600 --block 40
+    python scripts/benchmark_qrs.py --input recording.csv --rate 360
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from sensors.qrs_detector import QRSDetector
+
+
+# (offset from R peak in s, amplitude in mV, width in s) for P, Q, R, S, T
+_WAVES = [(-0.20, 0.12, 0.025), (-0.03, -0.12, 0.010), (0.0, 1.0, 0.010),
+          (0.03, -0.25, 0.010), (0.25, 0.30, 0.050)]
+
+
+def synthesize_ecg(seconds: float, rate: int, heart_rate: float = 75,
+                   irregular: bool = False, seed: int = 0):
+    """Build an ECG-like trace and the sample indices of its R peaks"""
+    rng = np.random.default_rng(seed)
+    mean_rr = 60.0 / heart_rate
+
+    r_times = []
+    t = 0.5
+    while t < seconds - 0.5:
+        r_times.append(t)
+        if irregular:
+            t += mean_rr * rng.uniform(0.6, 1.4)
+        else:
+            t += mean_rr * (1 + 0.03 * np.sin(2 * np.pi * 0.25 * t)) + rng.normal(0, 0.01)
+
+    n = int(seconds * rate)
+    time_axis = np.arange(n) / rate
+    signal = np.zeros(n)
+    for r in r_times:
+        lo = max(0, int((r - 0.35) * rate))
+        hi = min(n, int((r + 0.45) * rate))
+        segment = time_axis[lo:hi]
+        for offset, amplitude, width in _WAVES:
+            signal[lo:hi] += amplitude * np.exp(-((segment - r - offset) ** 2) / (2 * width ** 2))
+
+    signal += 0.2 * np.sin(2 * np.pi * 0.3 * time_axis)   # Baseline wander
+    signal += 0.05 * np.sin(2 * np.pi * 50 * time_axis)   # Mains hum
+    signal += rng.normal(0, 0.03, n)
+    return signal, np.round(np.array(r_times) * rate).astype(int)
+
+
+def load_waveform(path: Path) -> np.ndarray:
+    if path.suffix == ".npy":
+        return np.load(path).astype(np.float64).ravel()
+    data = np.loadtxt(path, delimiter="," if path.suffix == ".csv" else None, ndmin=2)
+    return data[:, -1].astype(np.float64)
+
+
+def score_detections(detected, truth, rate: int, tolerance: float = 0.15):
+    """Sensitivity and positive predictivity with a matching window"""
+    detected = np.asarray(detected)
+    if not len(detected) or not len(truth):
+        return 0.0, 0.0
+    nearest = np.abs(detected[:, None] - truth[None, :]).min(axis=1)
+    true_positive = int((nearest <= tolerance * rate).sum())
+    return true_positive / len(truth), true_positive / len(detected)
+
+
+def main(args):
+    if args.input:
+        signal = load_waveform(Path(args.input))
+        truth = None
+        print(f"Recording: {args.input}, {signal.size} samples at {args.rate} Hz")
+    else:
+        signal, truth = synthesize_ecg(args.seconds, args.rate, args.heart_rate, args.irregular)
+        kind = "irregular" if args.irregular else "sinus"
+        print(f"Synthetic {kind} ECG: {args.seconds:.0f}s at {args.rate} Hz, {args.heart_rate:.0f} bpm, {len(truth)} beats")
+
+    detector = QRSDetector(args.rate)
+    blocks = [signal[i:i + args.block] for i in range(0, signal.size, args.block)]
+
+    detected = []
+    start = time.perf_counter()
+    for block in blocks:
+        detected.extend(detector.process(block))
+    elapsed = time.perf_counter() - start
+
+    throughput = signal.size / elapsed
+    print(f"Block size: {args.block} samples ({args.block / args.rate * 1000:.0f} ms)")
+    print(f"Throughput: {throughput:,.0f} samples/sec "
+          f"({throughput / args.rate:,.0f}x real time, {elapsed / len(blocks) * 1e6:.1f} us/block)")
+
+    if truth is not None:
+        # Filter group delay shifts detections late; compare after removing the median lag
+        detected_arr = np.asarray(detected)
+        if detected_arr.size:
+            lag = int(np.median(detected_arr - truth[np.abs(detected_arr[:, None] - truth[None, :]).argmin(axis=1)]))
+            sensitivity, predictivity = score_detections(detected_arr - lag, truth, args.rate)
+            print(f"Detected {len(detected)} beats (lag {lag / args.rate * 1000:.0f} ms): "
+                  f"sensitivity {sensitivity:.3f}, positive predictivity {predictivity:.3f}")
+
+    metrics = detector.get_metrics()
+    print(f"HR {metrics['heart_rate']} bpm, rhythm {metrics['rhythm']}, "
+          f"SDNN {metrics['sdnn_ms']} ms, RMSSD {metrics['rmssd_ms']} ms, quality {metrics['signal_quality']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming QRS detection benchmark")
+    parser.add_argument("--input", help="Recorded waveform (.npy/.csv/.txt)")
+    parser.add_argument("--rate", type=int, default=200, help="Sample rate in Hz")
+    parser.add_argument("--seconds", type=float, default=600, help="Synthetic trace length")
+    parser.add_argument("--heart-rate", type=float, default=75, help="Synthetic mean heart rate")
+    parser.add_argument("--irregular", action="store_true", help="Synthesize an irregular rhythm")
+    parser.add_argument("--block", type=int, default=40, help="Samples per processed block")
+    main(parser.parse_args())
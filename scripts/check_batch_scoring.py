@@ -0,0 +1,95 @@
+"""
+Check - batch vs scalar severity scoring
+Scores random patients (unmeasured vitals, every rhythm, injuries,
+unconscious patients, int and float readings) with
+SeverityScorer.calculate_score one at a time and with
+calculate_scores_batch in one pass, and reports any patient whose score,
+level, breakdown or critical factors differ.
+
+Usage:
+    python scripts/check_batch_scoring.py --patients 5000 --seed 0
+"""
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from ai_engine.severity_scorer import SeverityScorer
+
+INJURY_TYPES = ["bleeding", "fracture", "burn", "cut", "swelling", "bruise", "unknown"]
+
+
+def build_patients(count: int, seed: int):
+    """Random patients as calculate_score arguments"""
+    rng = np.random.default_rng(seed)
+    rhythms = SeverityScorer.RHYTHM_CODES + ["unclassified"]
+    patients = []
+    for _ in range(count):
+        vital_signs = {}
+        if rng.random() > 0.1:
+            hr = rng.uniform(25, 190)
+            # Band edges, and ints like the sensors return
+            vital_signs["heart_rate"] = int(hr) if rng.random() < 0.5 else float(rng.choice([40, 50, 60, 100, 120, 150, hr]))
+        if rng.random() > 0.1:
+            spo2 = rng.uniform(70, 100)
+            vital_signs["spo2"] = int(spo2) if rng.random() < 0.5 else float(rng.choice([85, 90, 95, spo2]))
+        if rng.random() > 0.1:
+            vital_signs["body_temperature"] = round(float(rng.uniform(33, 41)), 1)
+        if rng.random() > 0.2:
+            vital_signs["rhythm"] = str(rng.choice(rhythms))
+        injuries = [
+            {
+                "type": str(rng.choice(INJURY_TYPES)),
+                "confidence": float(rng.uniform(0.3, 1.0)),
+                "severity": str(rng.choice(["low", "medium", "high"]))
+            }
+            for _ in range(rng.integers(0, 3))
+        ]
+        patients.append((injuries, vital_signs, bool(rng.random() > 0.1)))
+    return patients
+
+
+def column(patients, key):
+    return [vitals.get(key, math.nan) for _, vitals, _ in patients]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check batch severity scoring against the scalar path")
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scorer = SeverityScorer()
+    patients = build_patients(args.patients, args.seed)
+
+    scalar = [scorer.calculate_score(*patient) for patient in patients]
+    batch = scorer.calculate_scores_batch(
+        heart_rate=column(patients, "heart_rate"),
+        spo2=column(patients, "spo2"),
+        body_temperature=column(patients, "body_temperature"),
+        rhythm=[vitals.get("rhythm") for _, vitals, _ in patients],
+        patient_conscious=[conscious for _, _, conscious in patients],
+        injuries=[injuries for injuries, _, _ in patients]
+    )
+
+    mismatches = 0
+    for i, (expected, actual) in enumerate(zip(scalar, batch)):
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"Patient {i}: {patients[i][1]}")
+                print(f"  scalar: {expected}")
+                print(f"  batch:  {actual}")
+
+    print(f"{len(patients)} patients, {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Check - sensor stats reach /api/status
+Calls the endpoint in-process and fails if the SensorStatus response model
+dropped the ECG acquisition or GPS NMEA reader block that
+describe_sensors() reports.
+
+Usage:
+    python scripts/check_status_fields.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+from api.main import app
+
+# Sensor -> keys its status must carry (values may be None when simulated)
+EXPECTED = {
+    "ecg": ["acquisition"],
+    "gps": ["reader"]
+}
+
+
+def main():
+    with TestClient(app) as client:
+        response = client.get("/api/status")
+
+    if response.status_code != 200:
+        print(f"/api/status returned {response.status_code}: {response.text}")
+        sys.exit(1)
+
+    sensors = response.json()["sensors"]
+    missing = [
+        f"{sensor}.{key}"
+        for sensor, keys in EXPECTED.items()
+        for key in keys
+        if key not in sensors.get(sensor, {})
+    ]
+    for sensor, keys in EXPECTED.items():
+        print(f"{sensor}: " + ", ".join(f"{key}={sensors.get(sensor, {}).get(key)}" for key in keys))
+
+    if missing:
+        print(f"Missing from /api/status: {', '.join(missing)}")
+        sys.exit(1)
+    print("All sensor stats present")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+EMS stand-in server - a local endpoint for exercising the dispatch outbox
+Accepts reports and location updates like the EMS API, counting deliveries,
+duplicate idempotency keys and TCP connections (keep-alive reuse), and can
+simulate an outage, slow responses or random server errors.
+
+Point the backend at it:
+    EMS_API_ENDPOINT=http://127.0.0.1:8090/v1/report EMS_API_KEY=test
+
+Usage:
+    python scripts/ems_stub_server.py --port 8090
+    python scripts/ems_stub_server.py --outage 30 --error-rate 0.2 --latency 0.3
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class EMSStub:
+    """Counters shared by all handler threads"""
+
+    def __init__(self, outage: float, error_rate: float, latency: float):
+        self.outage_until = time.monotonic() + outage
+        self.error_rate = error_rate
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.keys = set()
+
+
+def make_handler(stub: EMSStub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep connections open between requests
+
+        def setup(self):
+            super().setup()
+            with stub.lock:
+                stub.counts["connections"] += 1
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(stub.latency)
+
+            if time.monotonic() < stub.outage_until or random.random() < stub.error_rate:
+                with stub.lock:
+                    stub.counts["errors"] += 1
+                return self._reply(503, {"error": "unavailable"})
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._reply(401, {"error": "unauthorized"})
+            try:
+                message = json.loads(body)
+            except ValueError:
+                return self._reply(400, {"error": "invalid json"})
+
+            key = self.headers.get("Idempotency-Key")
+            kind = "locations" if self.path.endswith("/location") else "reports"
+            with stub.lock:
+                if key in stub.keys:
+                    stub.counts["duplicates"] += 1
+                else:
+                    stub.keys.add(key)
+                    stub.counts[kind] += 1
+            self._reply(201, {"received": message.get("report_id"), "key": key})
+
+        def _reply(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(args):
+    stub = EMSStub(args.outage, args.error_rate, args.latency)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(stub))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"EMS stand-in on http://{args.host}:{args.port}/v1/report "
+          f"(outage {args.outage}s, error rate {args.error_rate:.0%}, latency {args.latency}s)")
+    try:
+        while True:
+            time.sleep(args.report_every)
+            with stub.lock:
+                print(dict(stub.counts), flush=True)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the EMS API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--outage", type=float, default=0.0, help="Answer 503 for the first N seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between counter printouts")
+    main(parser.parse_args())
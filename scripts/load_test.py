@@ -0,0 +1,127 @@
+"""
+Load test - probe latency while heavy endpoints are saturated
+Probes /health (or an emergency assessment) at a fixed rate, first idle and
+then while PDF, chat and assessment requests are hammered concurrently, and
+prints p50/p95/p99. With --probe assess only low-priority chat and PDF
+traffic is hammered, to check the assessment SLO under admission control.
+
+Usage:
+    python scripts/load_test.py --url http://localhost:8000 --duration 20 --concurrency 16
+    python scripts/load_test.py --probe assess --interval 0.5
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    print("[ERROR] aiohttp required: pip install aiohttp")
+    sys.exit(1)
+
+
+SAMPLE_ASSESSMENT = {
+    "assessment": {
+        "vital_signs": {"heart_rate": 128, "spo2": 91, "body_temperature": 38.4, "rhythm": "irregular"},
+        "injuries": [{"type": "bleeding", "confidence": 0.82, "severity": "high"}],
+        "severity": {"total_score": 6.8, "severity_level": "severe"},
+        "location": {"latitude": 24.7136, "longitude": 46.6753}
+    },
+    "patient_image_path": None
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+PROBES = {
+    "health": ("GET", "/health", {}),
+    "assess": ("POST", "/api/emergency/assess", {"data": {"patient_conscious": "true"}}),
+}
+
+
+async def probe(session, base_url, name, duration, interval):
+    """Call the probe endpoint every interval seconds and collect latencies (ms)"""
+    method, path, kwargs = PROBES[name]
+    latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        async with session.request(method, f"{base_url}{path}", **kwargs) as response:
+            await response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def hammer(session, base_url, deadline, counters, low_priority_only=False):
+    """Keep one heavy request in flight until deadline"""
+    requests_cycle = [
+        ("POST", "/api/emergency/download-report", {"json": SAMPLE_ASSESSMENT}),
+        ("POST", "/api/chat", {"json": {"message": "chest pain and difficulty breathing"}}),
+    ]
+    if not low_priority_only:
+        requests_cycle.append(("POST", "/api/emergency/assess", {"data": {"patient_conscious": "true"}}))
+    i = 0
+    while time.monotonic() < deadline:
+        method, path, kwargs = requests_cycle[i % len(requests_cycle)]
+        i += 1
+        try:
+            async with session.request(method, f"{base_url}{path}", **kwargs) as response:
+                await response.read()
+                if response.status == 503:
+                    counters["shed"] += 1
+                else:
+                    counters["ok" if response.status < 500 else "failed"] += 1
+        except aiohttp.ClientError:
+            counters["failed"] += 1
+
+
+def report(label, latencies):
+    print(f"{label:<12} n={len(latencies):<5} "
+          f"p50={percentile(latencies, 50):7.1f}ms "
+          f"p95={percentile(latencies, 95):7.1f}ms "
+          f"p99={percentile(latencies, 99):7.1f}ms "
+          f"mean={statistics.mean(latencies) if latencies else float('nan'):7.1f}ms")
+
+
+async def main(args):
+    timeout = aiohttp.ClientTimeout(total=300)
+    connector = aiohttp.TCPConnector(limit=args.concurrency + 4)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        print(f"Baseline: probing {args.probe} for {args.duration}s (idle server)...")
+        idle = await probe(session, args.url, args.probe, args.duration, args.interval)
+
+        print(f"Load: {args.concurrency} concurrent heavy requests for {args.duration}s...")
+        counters = {"ok": 0, "failed": 0, "shed": 0}
+        deadline = time.monotonic() + args.duration
+        workers = [asyncio.create_task(hammer(session, args.url, deadline, counters, args.probe == "assess"))
+                   for _ in range(args.concurrency)]
+        loaded = await probe(session, args.url, args.probe, args.duration, args.interval)
+        await asyncio.gather(*workers)
+
+    print()
+    print("=" * 70)
+    print(f"{PROBES[args.probe][1]} latency")
+    print("=" * 70)
+    report("idle", idle)
+    report("saturated", loaded)
+    print(f"heavy requests: {counters['ok']} ok, {counters['shed']} shed (503), {counters['failed']} failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Smart Rescuer /health latency under load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per phase")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent heavy requests")
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between probes")
+    parser.add_argument("--probe", choices=sorted(PROBES), default="health", help="Endpoint whose latency is measured")
+    asyncio.run(main(parser.parse_args()))
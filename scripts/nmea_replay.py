@@ -0,0 +1,116 @@
+"""
+NMEA replayer - a fake GPS receiver on a pseudo-terminal
+Streams a recorded NMEA log (or a synthesized ambulance track) through a pty
+so GPSModule's reader thread can be exercised without hardware.
+
+Point the backend at the printed device:
+    GPS_PORT=/dev/pts/N ENABLE_GPS=True
+
+Usage:
+    python scripts/nmea_replay.py --rate 1
+    python scripts/nmea_replay.py --input drive.nmea --rate 10 --chunk 7
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import tty
+from datetime import datetime, timezone
+from functools import reduce
+
+
+def with_checksum(body: str) -> bytes:
+    checksum = reduce(lambda acc, c: acc ^ ord(c), body, 0)
+    return f"${body}*{checksum:02X}\r\n".encode("ascii")
+
+
+def nmea_coordinate(value: float, degree_digits: int, hemispheres: str) -> str:
+    hemisphere = hemispheres[0] if value >= 0 else hemispheres[1]
+    value = abs(value)
+    degrees = int(value)
+    minutes = (value - degrees) * 60
+    return f"{degrees:0{degree_digits}d}{minutes:07.4f},{hemisphere}"
+
+
+def synthesize_epochs(start_lat: float = 24.7136, start_lon: float = 46.6753):
+    """Endless 1 Hz epochs (GGA, GSA, RMC, VTG) of a vehicle circling at ~40 km/h"""
+    radius_deg = 0.005
+    epoch = 0
+    while True:
+        angle = epoch * 0.02
+        lat = start_lat + radius_deg * math.sin(angle)
+        lon = start_lon + radius_deg * math.cos(angle) / math.cos(math.radians(start_lat))
+        course = (math.degrees(-angle) % 360)
+        knots = 21.6
+        now = datetime.now(timezone.utc)
+        hhmmss = now.strftime("%H%M%S.00")
+        date = now.strftime("%d%m%y")
+        lat_s = nmea_coordinate(lat, 2, "NS")
+        lon_s = nmea_coordinate(lon, 3, "EW")
+        yield [
+            with_checksum(f"GPGGA,{hhmmss},{lat_s},{lon_s},1,09,0.9,612.4,M,-18.0,M,,"),
+            with_checksum("GPGSA,A,3,02,05,07,09,13,16,20,26,29,,,,1.6,0.9,1.3"),
+            with_checksum(f"GPRMC,{hhmmss},A,{lat_s},{lon_s},{knots:.1f},{course:.1f},{date},,,A"),
+            with_checksum(f"GPVTG,{course:.1f},T,,M,{knots:.1f},N,{knots * 1.852:.1f},K,A"),
+        ]
+        epoch += 1
+
+
+def recorded_epochs(path: str, loop: bool):
+    """Group a recorded log into epochs, starting a new one at every GGA"""
+    while True:
+        epoch = []
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith(b"$"):
+                    continue
+                if line[3:6] == b"GGA" and epoch:
+                    yield epoch
+                    epoch = []
+                epoch.append(line + b"\r\n")
+        if epoch:
+            yield epoch
+        if not loop:
+            return
+
+
+def main(args):
+    master, slave = os.openpty()
+    tty.setraw(slave)  # No echo or newline translation
+    print(f"Fake GPS on {os.ttyname(slave)} ({args.rate:g} epochs/sec) - Ctrl+C to stop", flush=True)
+
+    epochs = recorded_epochs(args.input, not args.once) if args.input else synthesize_epochs()
+    period = 1.0 / args.rate
+    next_deadline = time.monotonic()
+    sent = 0
+    try:
+        for epoch in epochs:
+            data = b"".join(epoch)
+            # Deliver in small pieces so sentences straddle reads, like a real UART
+            for i in range(0, len(data), args.chunk):
+                os.write(master, data[i:i + args.chunk])
+            sent += 1
+            if args.verbose:
+                print(f"epoch {sent}: {len(epoch)} sentences", flush=True)
+            next_deadline += period
+            time.sleep(max(0.0, next_deadline - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+    print(f"Sent {sent} epochs")
+
+
+if __name__ == "__main__":
+    if not hasattr(os, "openpty"):
+        sys.exit("Pseudo-terminals need a POSIX system")
+    parser = argparse.ArgumentParser(description="Replay NMEA sentences over a pseudo-terminal")
+    parser.add_argument("--input", help="Recorded NMEA log (one sentence per line)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Epochs per second")
+    parser.add_argument("--chunk", type=int, default=16, help="Bytes per write")
+    parser.add_argument("--once", action="store_true", help="Stop at the end of the log instead of looping")
+    parser.add_argument("--verbose", action="store_true")
+    main(parser.parse_args())
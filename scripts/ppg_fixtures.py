@@ -0,0 +1,148 @@
+"""
+PPG fixtures - raw MAX3010x red/IR traces for CPU-only SpO2 testing
+
+generate: writes deterministic synthetic traces with known SpO2/HR into
+          backend/sensors/fixtures/ppg/ (npz: red, ir, sample_rate, spo2, heart_rate)
+replay:   streams every fixture through SpO2Estimator in FIFO-sized bursts and
+          reports the estimates against ground truth plus CPU time per estimate
+
+Point SPO2_REPLAY_FIXTURE at any fixture to run SpO2Sensor on it.
+
+Usage:
+    python scripts/ppg_fixtures.py generate
+    python scripts/ppg_fixtures.py replay --burst 25
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from sensors.spo2_estimator import SpO2Estimator, PPGReplaySource, CALIBRATION
+
+FIXTURE_DIR = backend_dir / 'sensors' / 'fixtures' / 'ppg'
+SAMPLE_RATE = 25.0  # MAX30102 at 100 sps with 4-sample averaging
+
+# name: (spo2, heart_rate, IR perfusion %, motion artifacts, finger present)
+FIXTURES = {
+    "normal_spo2_97_hr_72": (97, 72, 2.0, False, True),
+    "hypoxia_spo2_86_hr_112": (86, 112, 1.5, False, True),
+    "bradycardia_spo2_95_hr_48": (95, 48, 2.0, False, True),
+    "low_perfusion_spo2_96_hr_80": (96, 80, 0.15, False, True),
+    "motion_artifact_spo2_97_hr_75": (97, 75, 2.0, True, True),
+    "no_finger": (0, 0, 0.0, False, False),
+}
+
+
+def ratio_for_spo2(spo2: float) -> float:
+    """Invert the calibration curve on its decreasing (physiological) branch"""
+    a, b, c = CALIBRATION
+    roots = np.roots([a, b, c - spo2])
+    return float(roots[np.isreal(roots)].real.max())
+
+
+def pulse_shape(seconds: float, heart_rate: float, rng) -> np.ndarray:
+    """Unit-variance blood volume pulse: systolic peak plus dicrotic wave"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    shape = np.zeros_like(t)
+    beat = 0.2
+    while beat < seconds:
+        shape += np.exp(-((t - beat - 0.12) ** 2) / (2 * 0.05 ** 2))
+        shape += 0.4 * np.exp(-((t - beat - 0.35) ** 2) / (2 * 0.07 ** 2))
+        beat += 60.0 / heart_rate * (1 + rng.normal(0, 0.02))
+    shape -= shape.mean()
+    return shape / shape.std()
+
+
+def synthesize(spo2, heart_rate, perfusion, motion, finger, seconds=30.0, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+
+    if not finger:
+        ambient = 1500 + rng.normal(0, 40, n)
+        return ambient.astype(np.int32), (ambient * 1.2).astype(np.int32)
+
+    ir_dc, red_dc = 120000.0, 95000.0
+    ir_ratio = perfusion / 100.0
+    red_ratio = ratio_for_spo2(spo2) * ir_ratio
+
+    shape = pulse_shape(seconds, heart_rate, rng)
+    drift = 1 + 0.01 * np.sin(2 * np.pi * 0.25 * t)  # Respiration
+    ir = ir_dc * drift * (1 - ir_ratio * shape)
+    red = red_dc * drift * (1 - red_ratio * shape)
+
+    if motion:
+        for start in rng.integers(0, n - 25, 4):
+            burst = rng.normal(0, 0.03, 25)
+            ir[start:start + 25] *= 1 + burst
+            red[start:start + 25] *= 1 + rng.normal(0, 0.03, 25)
+
+    ir += rng.normal(0, 30, n)
+    red += rng.normal(0, 30, n)
+    return np.clip(red, 0, 0x3FFFF).astype(np.int32), np.clip(ir, 0, 0x3FFFF).astype(np.int32)
+
+
+def generate(args):
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    for seed, (name, (spo2, heart_rate, perfusion, motion, finger)) in enumerate(FIXTURES.items()):
+        red, ir = synthesize(spo2, heart_rate, perfusion, motion, finger, args.seconds, seed)
+        path = FIXTURE_DIR / f"{name}.npz"
+        np.savez_compressed(
+            path, red=red, ir=ir, sample_rate=SAMPLE_RATE,
+            spo2=spo2, heart_rate=heart_rate, finger=finger
+        )
+        print(f"wrote {path.relative_to(backend_dir.parent)} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+def replay(args):
+    paths = sorted(FIXTURE_DIR.glob("*.npz"))
+    if not paths:
+        print("No fixtures - run 'generate' first")
+        return
+
+    print(f"{'fixture':<32} {'truth':>10} {'estimate':>12} {'conf':>5} {'us/est':>7}")
+    for path in paths:
+        source = PPGReplaySource(path)
+        estimator = SpO2Estimator(source.sample_rate)
+        bursts = int(source.red.size / args.burst)
+
+        estimates, elapsed = [], 0.0
+        for _ in range(bursts):
+            red, ir = source.read_sequential(args.burst)
+            start = time.perf_counter()
+            estimator.push(red, ir)
+            estimate = estimator.estimate()
+            elapsed += time.perf_counter() - start
+            if estimate is not None:
+                estimates.append(estimate)
+
+        truth = f"{source.metadata['spo2']}%/{source.metadata['heart_rate']}"
+        if estimates:
+            spo2 = np.median([e["spo2"] for e in estimates])
+            rates = [e["heart_rate"] for e in estimates if e["heart_rate"]]
+            heart_rate = np.median(rates) if rates else float("nan")
+            confidence = np.mean([e["confidence"] for e in estimates])
+            result = f"{spo2:.0f}%/{heart_rate:.0f}"
+        else:
+            result, confidence = "no reading", 0.0
+        print(f"{path.stem:<32} {truth:>10} {result:>12} {confidence:>5.2f} {elapsed / bursts * 1e6:>7.1f}")
+
+    period = args.burst / SAMPLE_RATE
+    print(f"\nOne estimate per {period:.1f}s burst; CPU share = us/est / {period * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PPG fixture generator and replayer")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate")
+    gen.add_argument("--seconds", type=float, default=30.0)
+    rep = sub.add_parser("replay")
+    rep.add_argument("--burst", type=int, default=25, help="Samples per FIFO burst")
+    args = parser.parse_args()
+    generate(args) if args.command == "generate" else replay(args)
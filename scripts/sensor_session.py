@@ -0,0 +1,151 @@
+"""
+Sensor sessions - record, inspect and replay sensor readings
+
+record: samples every sensor (real hardware where present) into a session file
+info:   prints the streams, record counts and duration of a session
+replay: drives DataFusionEngine from a session and reports pipeline throughput
+        plus a severity digest; --save/--compare turn it into a regression check
+
+Usage:
+    python scripts/sensor_session.py record --seconds 600 --out sessions/drive.srs
+    python scripts/sensor_session.py info sessions/drive.srs
+    python scripts/sensor_session.py replay sessions/drive.srs --speed 0
+    python scripts/sensor_session.py replay sessions/drive.srs --speed 0 --compare baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+
+def record(args):
+    from sensors import ECGSensor, SpO2Sensor, TemperatureSensor, GPSModule, SensorSampler
+    from sensors.advanced_sensors import advanced_sensors
+    from sensors.session_recorder import session_recorder
+
+    sensors = [ECGSensor(enabled=True), SpO2Sensor(enabled=True), TemperatureSensor(enabled=True), GPSModule(enabled=True)]
+    for sensor in sensors:
+        sensor.sample_interval = min(sensor.sample_interval, args.interval)
+    sampler = SensorSampler(sensors)
+
+    session_recorder.start(args.out)
+    sampler.start()
+    deadline = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < deadline:
+            advanced_sensors.read_all_sensors()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        for sensor in sensors:
+            getattr(sensor, "stop_acquisition", lambda: None)()
+            getattr(sensor, "stop_reader", lambda: None)()
+        session_recorder.stop()
+    info(argparse.Namespace(path=args.out))
+
+
+def info(args):
+    from sensors.session_recorder import SessionReader
+
+    reader = SessionReader(args.path)
+    summary = reader.summary()
+    reader.close()
+    print(f"{summary['path']}: {summary['bytes'] / 1024:.1f} KB, {summary['duration']:.1f}s, "
+          f"{'complete' if summary['complete'] else 'UNFINISHED (index rebuilt)'}")
+    for name, count in summary["streams"].items():
+        print(f"  {name:<12} {count:>8} readings")
+
+
+def replay(args):
+    # Configure the engine before its modules read the environment
+    os.environ["SESSION_REPLAY_PATH"] = str(Path(args.path).resolve())
+    os.environ["SESSION_REPLAY_SPEED"] = str(args.speed)
+    os.environ["SESSION_REPLAY_LOOP"] = "False"
+    os.environ["CONCURRENT_SENSOR_READS"] = "False"
+
+    from core.data_fusion import DataFusionEngine
+
+    engine = DataFusionEngine()
+    player = engine.session_player
+    if player is None:
+        sys.exit(f"Could not open {args.path}")
+    cursors = [c for c in (s.replay for s in (engine.ecg_sensor, engine.spo2_sensor, engine.temp_sensor)) if c]
+    if not cursors:
+        sys.exit("Session has no vital sign streams")
+
+    tick = 1.0 / args.speed if args.speed else 0.0
+    severities = Counter()
+    trends = Counter()
+    scores = []
+    start = time.perf_counter()
+    while not all(c.exhausted for c in cursors):
+        if args.limit and len(scores) >= args.limit:
+            break
+        vital_signs = engine._collect_vital_signs()
+        if args.speed:
+            session_time = player.session_time()
+            if session_time is None:
+                break
+        else:
+            session_time = max(float(c.stream.timestamps[max(c.position, 0)]) for c in cursors)
+
+        severity = engine.severity_scorer.calculate_score([], vital_signs)
+        trend = engine.trend_scorer.update(vital_signs, timestamp=session_time)
+        scores.append(severity["total_score"])
+        severities[severity["severity_level"]] += 1
+        trends["deteriorating" if trend["deteriorating"] else trend["level"]] += 1
+        if tick:
+            time.sleep(tick)
+    elapsed = time.perf_counter() - start
+
+    digest = {
+        "samples": len(scores),
+        "mean_score": round(sum(scores) / len(scores), 4) if scores else None,
+        "severity": dict(sorted(severities.items())),
+        "trend": dict(sorted(trends.items()))
+    }
+    print(f"Replayed {len(scores)} vital sign samples in {elapsed:.2f}s "
+          f"({len(scores) / elapsed if elapsed else 0:,.0f} samples/sec, {args.speed or 'max'} speed)")
+    print(json.dumps(digest, indent=2))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(digest, indent=2))
+        print(f"Saved digest to {args.save}")
+    if args.compare:
+        expected = json.loads(Path(args.compare).read_text())
+        if expected != digest:
+            print(f"MISMATCH against {args.compare}: expected {json.dumps(expected)}")
+            sys.exit(1)
+        print(f"Matches {args.compare}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sensor session recorder and replayer")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record")
+    rec.add_argument("--out", required=True, help="Session file to write")
+    rec.add_argument("--seconds", type=float, default=60.0)
+    rec.add_argument("--interval", type=float, default=1.0, help="Seconds between readings")
+
+    inf = sub.add_parser("info")
+    inf.add_argument("path")
+
+    rep = sub.add_parser("replay")
+    rep.add_argument("path")
+    rep.add_argument("--speed", type=float, default=0.0, help="1 = real time, N = N x, 0 = as fast as possible")
+    rep.add_argument("--limit", type=int, default=0, help="Stop after this many samples")
+    rep.add_argument("--save", help="Write the severity digest to this JSON file")
+    rep.add_argument("--compare", help="Fail unless the digest matches this JSON file")
+
+    args = parser.parse_args()
+    {"record": record, "info": info, "replay": replay}[args.command](args)